@@ -8,6 +8,12 @@ import discord
 from discord.ext import commands
 from discord.ext.commands import CommandError, Context
 
+from robocop_ng.helpers.attachment_cache import AttachmentCache
+from robocop_ng.helpers.invites import InviteRegistry
+from robocop_ng.helpers.join_pipeline import JoinPipeline
+from robocop_ng.helpers.log_sink import LogSink
+from robocop_ng.helpers.raid_detector import RaidDetector
+from robocop_ng.helpers.message_dispatcher import MessageDispatcher
 from robocop_ng.helpers.notifications import report_critical_error
 
 if len(sys.argv[1:]) != 1:
@@ -83,6 +89,12 @@ bot.config = config
 bot.script_name = script_name
 bot.state_dir = state_dir
 bot.wanted_jsons = wanted_jsons
+bot.attachment_cache = AttachmentCache(bot)
+bot.message_dispatcher = MessageDispatcher(bot)
+bot.log_sink = LogSink(bot)
+bot.invite_registry = InviteRegistry(bot)
+bot.raid_detector = RaidDetector(bot)
+bot.join_pipeline = JoinPipeline(bot)
 
 
 async def get_channel_safe(self, channel_id: int):
@@ -251,8 +263,17 @@ async def on_command_error(ctx: Context, error: CommandError):
         )
 
 
+@bot.event
+async def on_member_join(member):
+    # Cog steps run in order, after the member got their roles back
+    await bot.join_pipeline.run(member)
+
+
 @bot.event
 async def on_message(message):
+    # Cog handlers get every message, including those which aren't commands
+    bot.message_dispatcher.dispatch(message)
+
     if message.author.bot:
         return
 
@@ -0,0 +1,43 @@
+import argparse
+import timeit
+
+from robocop_ng.benchmarks.synthetic import make_log
+from robocop_ng.helpers.log_patterns import log_patterns
+from robocop_ng.helpers.ryujinx_log_analyser import LogAnalyser
+
+
+def run(number: int):
+    """
+    Times the calls which used to compile their patterns every time they were made.
+    """
+    log_text = make_log()
+    analyser = LogAnalyser(log_text)
+    filename = "Ryujinx_1.1.1200_2024-01-01_00-00-00.log"
+    error_line = "00:02:00.000 |E| Gpu PrintError: at Foo() in C:\\src\\Foo.cs:line 42"
+
+    cases = {
+        "LogAnalyser(log)": (lambda: LogAnalyser(log_text), number),
+        "get_ryujinx_version": (analyser.get_ryujinx_version, number * 5),
+        "normalise_error_line": (
+            lambda: LogAnalyser.normalise_error_line(error_line),
+            number * 5,
+        ),
+        # What LogFileReader.is_valid_log_name matches, the cog needs the bot's config to import
+        "log name patterns": (
+            lambda: (
+                log_patterns["ryujinx_log_name"].match(filename),
+                log_patterns["log_name"].match(filename),
+            ),
+            number * 5,
+        ),
+    }
+    for name, (call, count) in cases.items():
+        elapsed_time = timeit.timeit(call, number=count)
+        print(f"{name:<22} {elapsed_time / count * 1000 * 1000:>10.2f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+    run(args.number)
@@ -0,0 +1,101 @@
+import argparse
+import asyncio
+import random
+import re
+import time
+from types import SimpleNamespace
+
+from robocop_ng.benchmarks.synthetic import make_bot, make_support_message
+from robocop_ng.helpers.message_dispatcher import MessageDispatcher
+
+spy_channel = 100
+list_channel = 200
+welcome_channel = 300
+# The handlers of Logs, LogFileReader, Lists, Verification, RyujinxVerification and YubicoOTP
+handler_filters = {
+    "Logs": {"channels": [spy_channel], "ignore_bots": False},
+    "LogFileReader": {"requires_attachments": True},
+    "Lists": {"channels": [list_channel]},
+    "Verification": {"channels": [welcome_channel]},
+    "RyujinxVerification": {"channels": [welcome_channel]},
+    "YubicoOTP": {
+        "ignore_bots": False,
+        "content_pattern": re.compile("(cc|vv)[cbdefghijklnrtuv]{42}"),
+    },
+}
+
+
+def make_messages(count: int, seed: int) -> list[SimpleNamespace]:
+    rng = random.Random(seed)
+    channels = [1, 2, 3, 4, 5, 6, 7, 8, spy_channel, list_channel, welcome_channel]
+    return [
+        SimpleNamespace(
+            channel=SimpleNamespace(id=rng.choice(channels)),
+            content=make_support_message(rng, 2, 40),
+            attachments=[None] if rng.random() < 0.02 else [],
+            author=SimpleNamespace(bot=False),
+        )
+        for _ in range(count)
+    ]
+
+
+async def wait_for_tasks():
+    while len(asyncio.all_tasks()) > 1:
+        await asyncio.sleep(0)
+
+
+async def replay_listeners(dispatcher: MessageDispatcher, messages: list):
+    """
+    What discord.py did with an on_message listener per cog: a task per listener and message,
+    each checking on its own whether the message is for it.
+    """
+
+    async def listener(handler, message):
+        await dispatcher.bot.wait_until_ready()
+        if (
+            handler.channels is None or message.channel.id in handler.channels
+        ) and handler.accepts(message):
+            await handler.callback(message)
+
+    for message in messages:
+        for handler in dispatcher.handlers.values():
+            asyncio.create_task(listener(handler, message))
+    await wait_for_tasks()
+
+
+async def replay_dispatcher(dispatcher: MessageDispatcher, messages: list):
+    for message in messages:
+        dispatcher.dispatch(message)
+    await wait_for_tasks()
+
+
+def run(count: int, seed: int):
+    bot = make_bot()
+    handled = []
+
+    async def callback(message):
+        handled.append(message)
+
+    for name, filters in handler_filters.items():
+        bot.message_dispatcher.register(name, callback, **filters)
+    messages = make_messages(count, seed)
+
+    for name, replay in (
+        ("listeners", replay_listeners),
+        ("dispatcher", replay_dispatcher),
+    ):
+        handled.clear()
+        start_time = time.perf_counter()
+        asyncio.run(replay(bot.message_dispatcher, messages))
+        elapsed_time = time.perf_counter() - start_time
+        print(
+            f"{name:<11} {count / elapsed_time:>9.0f} msg/s, {len(handled)} handler calls"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=41)
+    args = parser.parse_args()
+    run(args.messages, args.seed)
@@ -0,0 +1,89 @@
+import argparse
+import datetime
+import random
+import time
+
+from robocop_ng.benchmarks.synthetic import make_bot, make_member
+from robocop_ng.helpers.raid_detector import RaidDetector
+
+name_words = (
+    "shadow blue pixel nova link mario zelda kirby sonic luna frost ember river storm"
+).split()
+
+
+def make_joins(
+    rng: random.Random, hours: float, raid_start: float, raid_size: int
+) -> list[tuple]:
+    """
+    Returns (time, member, invite code, is raider) joins: regular members about once a minute
+    and a raid of new accounts through one invite, 0.3 seconds apart.
+    """
+    start_time = datetime.datetime(2024, 1, 1)
+    joins = []
+    join_time = 0.0
+    while join_time < hours * 3600:
+        join_time += rng.expovariate(1 / 60)
+        name = rng.choice(name_words) + rng.choice(name_words) + str(rng.randint(0, 99))
+        member = make_member(
+            len(joins),
+            name,
+            start_time + datetime.timedelta(seconds=join_time),
+            datetime.timedelta(days=rng.randint(1, 3000)),
+        )
+        joins.append((join_time, member, rng.choice(["abc", "vanity", None]), False))
+    for i in range(raid_size):
+        join_time = raid_start + i * 0.3
+        member = make_member(
+            10**6 + i,
+            f"raider{rng.randint(0, 9999)}",
+            start_time + datetime.timedelta(seconds=join_time),
+            datetime.timedelta(minutes=rng.randint(16, 50)),
+        )
+        joins.append((join_time, member, "raidinv", True))
+    joins.sort(key=lambda x: x[0])
+    return joins
+
+
+def run(hours: float, raid_size: int, seed: int):
+    """
+    Replays the joins through RaidDetector.record_join with the default thresholds.
+    """
+    raid_start = hours * 3600 / 2
+    joins = make_joins(random.Random(seed), hours, raid_start, raid_size)
+    detector = RaidDetector(make_bot())
+    false_positives = 0
+    detection = None
+    raid_joins_until_detection = 0
+
+    start_time = time.perf_counter()
+    for join_time, member, invite_code, is_raider in joins:
+        if is_raider and detection is None:
+            raid_joins_until_detection += 1
+        reasons = detector.record_join(member, invite_code, now=join_time)
+        if len(reasons) > 0 and not is_raider and join_time < raid_start:
+            false_positives += 1
+        elif len(reasons) > 0 and detection is None:
+            detection = (join_time - raid_start, reasons)
+    elapsed_time = time.perf_counter() - start_time
+
+    print(
+        f"{len(joins)} joins replayed, "
+        f"{elapsed_time / len(joins) * 1000 * 1000:.1f} us per join"
+    )
+    print(f"False positives before the raid: {false_positives}")
+    if detection is None:
+        print("The raid wasn't detected")
+    else:
+        print(
+            f"Raid detected after {raid_joins_until_detection} raid joins "
+            f"({detection[0]:.1f} s): {', '.join(detection[1])}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hours", type=float, default=6)
+    parser.add_argument("--raid-size", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=46)
+    args = parser.parse_args()
+    run(args.hours, args.raid_size, args.seed)
@@ -0,0 +1,91 @@
+import argparse
+import asyncio
+import random
+import time
+from types import SimpleNamespace
+
+from robocop_ng.benchmarks.synthetic import make_bot, make_support_message
+from robocop_ng.cogs.logs import Logs
+
+spy_channel = 100
+
+
+def make_message(content: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        content=content,
+        guild=None,
+        channel=SimpleNamespace(id=spy_channel),
+        author=SimpleNamespace(
+            id=1,
+            bot=False,
+            mention="<@1>",
+            display_name="user",
+            display_avatar="https://example.com/avatar.png",
+        ),
+        jump_url="https://discord.com/channels/1/100/1",
+    )
+
+
+def make_message_sets(
+    suspect_words: list[str], count: int, seed: int
+) -> dict[str, list[str]]:
+    rng = random.Random(seed)
+    return {
+        "100+ words, no alert": [
+            make_support_message(rng, 100, 180) for _ in range(count)
+        ],
+        "100+ words, alert": [
+            make_support_message(
+                rng,
+                100,
+                180,
+                [rng.choice(suspect_words) for _ in range(rng.randint(1, 3))],
+            )
+            for _ in range(count)
+        ],
+        "3-25 words": [make_support_message(rng, 3, 25) for _ in range(count)],
+        "2000 chars punctuation": ["s" + "." * 2000 + " hi " + suspect_words[0]]
+        * max(count // 50, 1),
+    }
+
+
+async def replay(cog: Logs, contents: list[str]) -> float:
+    messages = [make_message(content) for content in contents]
+    start_time = time.perf_counter()
+    for message in messages:
+        await cog.do_spy(message)
+    return (time.perf_counter() - start_time) / len(messages)
+
+
+def run(count: int, seed: int):
+    """
+    Times the spy word detection and highlighting of Logs.do_spy, without sending the alerts.
+    """
+    bot = make_bot(spy_channels=[spy_channel])
+    alerts = []
+
+    async def send(*args, **kwargs):
+        alerts.append(args)
+
+    bot.log_sink = SimpleNamespace(
+        get_destination=lambda channel_id: SimpleNamespace(send=send)
+    )
+    cog = Logs(bot)
+    suspect_words = [
+        word for word in bot.config.suspect_words if word in cog.spy_word_matcher.words
+    ]
+    for name, contents in make_message_sets(suspect_words, count, seed).items():
+        alerts.clear()
+        elapsed_time = asyncio.run(replay(cog, contents))
+        print(
+            f"{name:<24} {elapsed_time * 1000 * 1000:>8.1f} us, "
+            f"{len(alerts)}/{len(contents)} alerts"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=3000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    run(args.messages, args.seed)
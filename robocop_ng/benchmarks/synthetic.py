@@ -0,0 +1,119 @@
+import datetime
+import random
+import sys
+import traceback
+from types import SimpleNamespace
+
+from robocop_ng import config_template
+from robocop_ng.helpers.join_pipeline import JoinPipeline
+from robocop_ng.helpers.message_dispatcher import MessageDispatcher
+
+# Cogs import the bot's config module, the template stands in for it when there's none
+try:
+    import config
+except ImportError:
+    sys.modules["config"] = config_template
+
+support_words = (
+    "the game crashes when I load it, with my switch firmware and Ryujinx version! shaders are "
+    "compiling slowly... please help me *fix* this issue_ thanks anyone know why performance drops "
+    "60fps at 4k on my GPU mods cheats patches update dlc emulator vulkan opengl"
+).split()
+
+
+def make_bot(**config) -> SimpleNamespace:
+    """
+    Returns a stand-in for the bot with the template config, enough to create the cogs and helpers
+    being measured without connecting to Discord.
+    """
+
+    async def wait_until_ready():
+        pass
+
+    async def on_error(event_method, *args, **kwargs):
+        traceback.print_exc()
+
+    bot = SimpleNamespace(
+        config=SimpleNamespace(
+            **(
+                {
+                    name: getattr(config_template, name)
+                    for name in dir(config_template)
+                    if not name.startswith("_")
+                }
+                | config
+            )
+        ),
+        wait_until_ready=wait_until_ready,
+        on_error=on_error,
+    )
+    bot.message_dispatcher = MessageDispatcher(bot)
+    bot.join_pipeline = JoinPipeline(bot)
+    return bot
+
+
+def make_log(
+    game: str = "Super Mario Odyssey v1.3.0 [0100000000010000]",
+    boots: int = 1,
+    padding: int = 0,
+) -> str:
+    """
+    Returns a Ryujinx log with its system information, settings, every game boot followed by padding
+    lines and a crash.
+    """
+    lines = [
+        "00:00:00.001 |I| Application PrintSystemInfo: Ryujinx Version: 1.1.1200",
+        "00:00:00.002 |I| Application Print: Operating System: Microsoft Windows 10.0.22631",
+        "00:00:00.003 |I| Application Print: CPU: AMD Ryzen 7 5800X 8-Core Processor ; 16 logical",
+        "00:00:00.004 |I| Application Print: RAM: Total 31.9 GiB ; Available 20.1 GiB",
+        "00:00:00.005 |I| Application Print: Logs Enabled: Info, Warning, Error, Guest, Stub",
+        "00:00:00.006 |I| Configuration LogValueChange: EnableDockedMode set to: True",
+        "00:00:00.006 |I| Configuration LogValueChange: EnablePtc set to: True",
+        "00:00:00.006 |I| Configuration LogValueChange: EnableShaderCache set to: True",
+        "00:00:00.006 |I| Configuration LogValueChange: GraphicsBackend set to: Vulkan",
+        "00:00:00.006 |I| Configuration LogValueChange: ResScale set to: 2",
+        "00:00:00.007 |I| Gpu PrintGpuInformation: NVIDIA GeForce RTX 3070",
+    ]
+    for boot in range(boots):
+        lines += [
+            f"00:00:{10 + boot:02}.000 |I| Application Load: Firmware Version: 17.0.0",
+            f"00:00:{10 + boot:02}.100 |I| Application Hid Configure: ProController | Index: 0",
+            f"00:00:{10 + boot:02}.200 |I| Loader LoadNsos: Application Loaded: {game} [64-bit]",
+            f"00:00:{10 + boot:02}.300 |I| Loader LoadNsos: Build ids found for application "
+            "0100000000010000:",
+            "    3CA12DFAAF9C82DA064D1698DF79CDA1",
+            "",
+            "00:00:12.000 |I| ModLoader Found enabled mod 'Better Fps' [E]",
+            "00:00:12.000 |I| TamperMachine Installing cheat 'Infinite Coins'",
+        ]
+        lines += [
+            f"00:01:{i % 60:02}.{i % 1000:03} |I| Gpu Stuff happening {i}"
+            for i in range(padding)
+        ]
+        lines += [
+            "00:02:00.000 |E| Gpu PrintError: Unhandled exception caught: "
+            "System.NullReferenceException: Object reference not set at 0x00007FFA12345678",
+            "    at Ryujinx.Graphics.Gpu.Engine.Foo() in C:\\build\\Ryujinx\\src\\Foo.cs:line 42",
+            "    at Ryujinx.Graphics.Gpu.Engine.Bar()",
+        ]
+    lines.append("00:03:00.000 |I| Application Exit: Ryujinx exited")
+    return "\n".join(lines) + "\n"
+
+
+def make_support_message(
+    rng: random.Random, min_words: int, max_words: int, inserted_words: list[str] = ()
+) -> str:
+    words = [
+        rng.choice(support_words) for _ in range(rng.randint(min_words, max_words))
+    ]
+    for word in inserted_words:
+        words[rng.randrange(len(words))] = word
+    return " ".join(words)
+
+
+def make_member(
+    member_id: int, name: str, joined_at: datetime.datetime, age: datetime.timedelta
+) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=member_id, name=name, joined_at=joined_at, created_at=joined_at - age
+    )
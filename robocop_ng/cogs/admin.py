@@ -41,6 +41,20 @@ class Admin(Cog):
         data_files = [discord.File(fpath) for fpath in self.bot.wanted_jsons]
         await ctx.send("Here you go:", files=data_files)
 
+    @commands.guild_only()
+    @commands.check(check_if_bot_manager)
+    @commands.command(aliases=["handlerstats"])
+    async def dispatcherstats(self, ctx):
+        """Shows how long message handlers take, bot manager only."""
+        await ctx.send(f"```\n{self.bot.message_dispatcher.format_stats()}\n```")
+
+    @commands.guild_only()
+    @commands.check(check_if_bot_manager)
+    @commands.command()
+    async def joinstats(self, ctx):
+        """Shows how long the steps of member joins take, bot manager only."""
+        await ctx.send(f"```\n{self.bot.join_pipeline.format_stats()}\n```")
+
     @commands.guild_only()
     @commands.check(check_if_bot_manager)
     @commands.command(name="eval")
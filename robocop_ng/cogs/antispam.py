@@ -0,0 +1,68 @@
+import discord
+from discord.ext.commands import Cog
+
+from robocop_ng.helpers.spam_tracker import SpamTracker
+
+
+class AntiSpam(Cog):
+    """
+    Mutes members who flood channels, spam mentions or repeat the same message.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.spam_tracker = SpamTracker(bot)
+        self.bot.message_dispatcher.register("AntiSpam", self.check_spam)
+
+    def cog_unload(self):
+        self.bot.message_dispatcher.unregister("AntiSpam")
+
+    def is_exempt(self, member: discord.Member) -> bool:
+        # Staff aren't checked, and muted members can't post anymore
+        return any(
+            r.id in self.bot.config.staff_role_ids or r.id == self.bot.config.mute_role
+            for r in member.roles
+        )
+
+    async def check_spam(self, message: discord.Message):
+        if (
+            message.guild is None
+            or message.guild.id not in self.bot.config.guild_whitelist
+            or not isinstance(message.author, discord.Member)
+            or self.is_exempt(message.author)
+        ):
+            return
+
+        spam_reason = self.spam_tracker.record_message(message)
+        if spam_reason is None:
+            return
+        # The rest of the burst shouldn't mute them again
+        self.spam_tracker.forget(message.author.id)
+
+        target = message.author
+        reason = f"Automatic mute for spam: {spam_reason}."
+        safe_name = self.bot.escape_message(target)
+        mute_duration = self.spam_tracker.settings["mute_duration"]
+        mod_timed = self.bot.get_cog("ModTimed")
+        mod = self.bot.get_cog("Mod")
+        if mute_duration is not None and mod_timed is not None:
+            await mod_timed.do_timemute(
+                target, self.bot.user, mute_duration, reason, safe_name
+            )
+        elif mod is not None:
+            await mod.do_mute(
+                target, self.bot.user, reason, safe_name, message.jump_url
+            )
+        else:
+            modlog_channel = self.bot.log_sink.get_destination(
+                self.bot.config.modlog_channel
+            )
+            await modlog_channel.send(
+                f"🚨 **Spam**: {target.mention} | {safe_name}\n"
+                f"✏️ __Reason__: {spam_reason}\n"
+                f"🔗 __Jump__: <{message.jump_url}>"
+            )
+
+
+async def setup(bot):
+    await bot.add_cog(AntiSpam(bot))
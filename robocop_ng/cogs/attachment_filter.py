@@ -0,0 +1,183 @@
+import asyncio
+from typing import Optional
+
+import aiohttp
+import discord
+from discord.ext import commands
+from discord.ext.commands import Cog, Context
+
+from robocop_ng.helpers.attachment_cache import AttachmentTooLargeError
+from robocop_ng.helpers.blocked_hashes import (
+    get_blocked_hashes,
+    hash_attachment,
+    is_sha256,
+    set_blocked_hashes,
+)
+from robocop_ng.helpers.checks import check_if_staff
+
+# Attachments larger than this aren't hashed
+default_max_size = 1000 * 1000 * 50
+# Errors which only mean an attachment couldn't be downloaded, the next ones are still hashed
+download_errors = (aiohttp.ClientError, discord.HTTPException, asyncio.TimeoutError)
+
+
+class AttachmentFilter(Cog):
+    """
+    Deletes attachments whose SHA-256 digest is blocked, and warns the users who posted them.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.blocked_hashes = get_blocked_hashes(bot)
+        self.max_size = getattr(
+            bot.config, "attachment_filter_max_size", default_max_size
+        )
+        self.bot.message_dispatcher.register(
+            "AttachmentFilter", self.check_attachments, requires_attachments=True
+        )
+
+    def cog_unload(self):
+        self.bot.message_dispatcher.unregister("AttachmentFilter")
+
+    async def find_blocked_attachment(
+        self, attachments: list[discord.Attachment]
+    ) -> Optional[tuple[discord.Attachment, str]]:
+        for attachment in attachments:
+            if attachment.size > self.max_size:
+                continue
+            try:
+                digest = await hash_attachment(self.bot, attachment, self.max_size)
+            except (AttachmentTooLargeError, *download_errors) as e:
+                self.bot.log.warning(f"Couldn't hash {attachment.url}: {e}")
+                continue
+            if digest in self.blocked_hashes:
+                return attachment, digest
+        return None
+
+    async def check_attachments(self, message: discord.Message):
+        if (
+            len(self.blocked_hashes) == 0
+            or message.guild is None
+            or message.guild.id not in self.bot.config.guild_whitelist
+            or check_if_staff(message)
+        ):
+            return
+
+        blocked = await self.find_blocked_attachment(message.attachments)
+        if blocked is None:
+            return
+        attachment, digest = blocked
+
+        try:
+            await message.delete()
+        except (discord.NotFound, discord.Forbidden):
+            pass
+
+        reason = f"Posted a blocked file: {attachment.filename}"
+        if self.blocked_hashes[digest].get("reason"):
+            reason += f" ({self.blocked_hashes[digest]['reason']})"
+        safe_name = self.bot.escape_message(message.author)
+        mod = self.bot.get_cog("Mod")
+        if mod is not None:
+            await mod.do_warn(
+                message.author, self.bot.user, reason, safe_name, message.jump_url
+            )
+        else:
+            modlog_channel = self.bot.log_sink.get_destination(
+                self.bot.config.modlog_channel
+            )
+            await modlog_channel.send(
+                f"🗑 **Blocked file**: {message.author.mention} | {safe_name}\n"
+                f"✏️ __Reason__: {reason}\n"
+                f"🏷 __SHA-256__: `{digest}`"
+            )
+
+    def block_hash(self, digest: str, reason: str, author: discord.abc.User):
+        self.blocked_hashes[digest] = {"reason": reason, "added_by": str(author)}
+        set_blocked_hashes(self.bot, self.blocked_hashes)
+
+    @commands.guild_only()
+    @commands.check(check_if_staff)
+    @commands.command(aliases=["blockhash"])
+    async def blockfile(
+        self, ctx: Context, digest: Optional[str] = None, *, reason: str = ""
+    ):
+        """Blocks a file by its SHA-256 digest, or the files replied to, staff only."""
+        if digest is not None:
+            digest = digest.lower()
+        if ctx.message.reference is None:
+            if digest is None or not is_sha256(digest):
+                return await ctx.send(
+                    "Please give a SHA-256 digest or reply to a file."
+                )
+            self.block_hash(digest, reason, ctx.author)
+            return await ctx.send(f"Files with the digest `{digest}` are now blocked!")
+
+        if digest is not None and not is_sha256(digest):
+            reason = f"{digest} {reason}".strip()
+        message = await ctx.channel.fetch_message(ctx.message.reference.message_id)
+        digests = []
+        skipped = []
+        for attachment in message.attachments:
+            if attachment.size > self.max_size:
+                skipped.append(f"- `{attachment.filename}`: too large")
+                continue
+            try:
+                digests.append(
+                    await hash_attachment(self.bot, attachment, self.max_size)
+                )
+            except AttachmentTooLargeError:
+                skipped.append(f"- `{attachment.filename}`: too large")
+            except download_errors as e:
+                self.bot.log.warning(f"Couldn't hash {attachment.url}: {e}")
+                skipped.append(f"- `{attachment.filename}`: couldn't be downloaded")
+
+        msg = ""
+        if len(digests) > 0:
+            for digest in digests:
+                self.block_hash(digest, reason, ctx.author)
+            msg += "Files with the following digests are now blocked:\n" + "\n".join(
+                f"- `{digest}`" for digest in digests
+            )
+        elif len(skipped) == 0:
+            msg += "That message has no files to block."
+        if len(skipped) > 0:
+            msg += "\n\nThese files were skipped:\n" + "\n".join(skipped)
+        await ctx.send(msg.strip())
+
+    @commands.guild_only()
+    @commands.check(check_if_staff)
+    @commands.command(aliases=["unblockhash"])
+    async def unblockfile(self, ctx: Context, digest: str):
+        """Unblocks a file by its SHA-256 digest, staff only."""
+        digest = digest.lower()
+        if self.blocked_hashes.pop(digest, None) is None:
+            return await ctx.send(f"No blocked file with the digest `{digest}` found.")
+        set_blocked_hashes(self.bot, self.blocked_hashes)
+        await ctx.send(f"Files with the digest `{digest}` are now unblocked!")
+
+    @commands.guild_only()
+    @commands.check(check_if_staff)
+    @commands.command(aliases=["blockedhashes", "listblockedfiles"])
+    async def blockedfiles(self, ctx: Context):
+        """Lists the blocked files, staff only."""
+        messages = []
+        message = "**Blocked files:**\n"
+        for digest, entry in self.blocked_hashes.items():
+            line = f"- `{digest}`"
+            if entry.get("reason"):
+                line += f": {entry['reason']}"
+            line += "\n"
+            if len(message) + len(line) >= 1500:
+                messages.append(message)
+                message = line
+            else:
+                message += line
+        messages.append(message)
+
+        for msg in messages:
+            await ctx.send(msg)
+
+
+async def setup(bot):
+    await bot.add_cog(AttachmentFilter(bot))
@@ -6,7 +6,6 @@ from discord.ext import commands
 from discord.ext.commands import Cog
 
 from robocop_ng.helpers.checks import check_if_collaborator
-from robocop_ng.helpers.invites import add_invite
 
 
 class Invites(Cog):
@@ -24,7 +23,7 @@ class Invites(Cog):
             max_age=0, max_uses=1, temporary=True, unique=True, reason=reason
         )
 
-        add_invite(self.bot, invite.id, invite.url, 1, invite.code)
+        self.bot.invite_registry.add(invite)
 
         await ctx.message.add_reaction("🆗")
         try:
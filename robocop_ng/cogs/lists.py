@@ -13,6 +13,12 @@ class Lists(Cog):
 
     def __init__(self, bot):
         self.bot = bot
+        self.bot.message_dispatcher.register(
+            "Lists", self.handle_message, channels=self.bot.config.list_channels
+        )
+
+    def cog_unload(self):
+        self.bot.message_dispatcher.unregister("Lists")
 
     # Helpers
 
@@ -108,7 +114,9 @@ class Lists(Cog):
             if attachment is not None:
                 msg["has_attachment"] = True
                 msg["attachment_filename"] = attachment.filename
-                msg["attachment_data"] = await attachment.read()
+                msg["attachment_data"] = await self.bot.attachment_cache.fetch(
+                    attachment
+                )
 
         return msg
 
@@ -233,24 +241,13 @@ class Lists(Cog):
         if self.is_edit(payload.emoji) and self.bot.config.list_files_channel != 0:
             await self.clean_up_raw_text_file_message(message)
 
-    @Cog.listener()
-    async def on_message(self, message):
-        await self.bot.wait_until_ready()
-
-        # We only care about messages in Rules, and Support FAQ
-        if message.channel.id not in self.bot.config.list_channels:
-            return
-
-        # We don"t care about messages from bots.
-        if message.author.bot:
-            return
-
+    async def handle_message(self, message):
         # Only staff can modify lists.
         if not self.check_if_target_is_staff(message.author):
             await message.delete()
             return
 
-        log_channel = self.bot.get_channel(self.bot.config.log_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.log_channel)
         channel = message.channel
         content = message.content
         user = message.author
@@ -269,7 +266,7 @@ class Lists(Cog):
             )
             if attachment is not None:
                 attachment_filename = attachment.filename
-                attachment_data = await attachment.read()
+                attachment_data = await self.bot.attachment_cache.fetch(attachment)
 
         await message.delete()
 
@@ -1,3 +1,6 @@
+import time
+from typing import Optional
+
 import discord
 from discord.ext import commands
 from discord.ext.commands import Cog
@@ -35,7 +38,7 @@ class Lockdown(Cog):
         Defaults to current channel."""
         if not channel:
             channel = ctx.channel
-        log_channel = self.bot.get_channel(self.bot.config.modlog_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.modlog_channel)
 
         roles = None
         for key, lockdown_conf in self.bot.config.lockdown_configs.items():
@@ -75,7 +78,7 @@ class Lockdown(Cog):
         """Unlocks speaking in current channel, staff only."""
         if not channel:
             channel = ctx.channel
-        log_channel = self.bot.get_channel(self.bot.config.modlog_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.modlog_channel)
 
         roles = None
         for key, lockdown_conf in self.bot.config.lockdown_configs.items():
@@ -100,6 +103,30 @@ class Lockdown(Cog):
         )
         await log_channel.send(msg)
 
+    @commands.guild_only()
+    @commands.check(check_if_staff)
+    @commands.command()
+    async def raidmode(self, ctx, enabled: Optional[bool] = None):
+        """Shows, enables or disables raid mode, staff only."""
+        raid_detector = self.bot.raid_detector
+        if enabled is None:
+            if raid_detector.is_raid_mode():
+                remaining = int(raid_detector.raid_mode_until - time.monotonic())
+                await ctx.send(f"🛡️ Raid mode is on for {remaining} more seconds.")
+            else:
+                await ctx.send("Raid mode is off.")
+            return
+
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.modlog_channel)
+        raid_detector.set_raid_mode(enabled)
+        safe_name = await commands.clean_content(escape_markdown=True).convert(
+            ctx, str(ctx.author)
+        )
+        state = "enabled" if enabled else "disabled"
+        await ctx.send(f"🛡️ Raid mode {state}.")
+        msg = f"🛡️ **Raid mode {state}**: by {ctx.author.mention} " f"| {safe_name}"
+        await log_channel.send(msg)
+
 
 async def setup(bot):
     await bot.add_cog(Lockdown(bot))
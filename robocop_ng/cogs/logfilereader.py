@@ -1,13 +1,14 @@
+import asyncio
 import logging
 import re
-from typing import Optional
+from typing import Any, Optional, Union
 
-import aiohttp
 from discord import Colour, Embed, Message, Attachment
 from discord.ext import commands
 from discord.ext.commands import Cog, Context, BucketType
 
 from robocop_ng.helpers.checks import check_if_staff
+from robocop_ng.helpers.crash_signatures import CrashSignatureIndex
 from robocop_ng.helpers.disabled_ids import (
     add_disabled_app_id,
     is_app_id_valid,
@@ -30,7 +31,19 @@ from robocop_ng.helpers.disabled_paths import (
     add_disabled_path,
     remove_disabled_path,
 )
-from robocop_ng.helpers.ryujinx_log_analyser import LogAnalyser
+from robocop_ng.helpers.macros import get_known_issue_matcher
+from robocop_ng.helpers.log_analytics import LogAnalytics
+from robocop_ng.helpers.log_archive import extract_log_archive, is_log_archive
+from robocop_ng.helpers.log_models import AnalysedLog
+from robocop_ng.helpers.log_notes import (
+    default_note_rule_set,
+    get_log_note_rules,
+    get_log_note_rules_path,
+)
+from robocop_ng.helpers.log_patterns import log_patterns
+from robocop_ng.helpers.log_sampler import AdaptiveLogFetcher
+from robocop_ng.helpers.log_worker import LogWorkerClient, analyse_log
+from robocop_ng.helpers.ryujinx_log_analyser import CommonError, LogAnalyser
 
 logging.basicConfig(
     format="%(asctime)s (%(levelname)s) %(message)s (Line %(lineno)d)",
@@ -39,34 +52,128 @@ logging.basicConfig(
 
 
 class LogFileReader(Cog):
+    # Only the start of unknown text files is fetched to check if they could be Ryujinx logs
+    prescreen_size = 4096
+    max_concurrent_downloads = 4
+    log_fetch_budget = 192000
+    # Archives have to be downloaded completely before they can be extracted
+    max_log_archive_size = 1000 * 1000 * 8
+
     @staticmethod
     def is_valid_log_name(attachment: Attachment) -> tuple[bool, bool]:
         filename = attachment.filename
-        ryujinx_log_file_regex = re.compile(r"^Ryujinx_.*\.log$")
-        log_file = re.compile(r"^.*\.log|.*\.txt$")
-        is_ryujinx_log_file = re.match(ryujinx_log_file_regex, filename) is not None
-        is_log_file = re.match(log_file, filename) is not None
+        is_ryujinx_log_file = (
+            log_patterns["ryujinx_log_name"].match(filename) is not None
+        )
+        is_log_file = log_patterns["log_name"].match(filename) is not None
 
         return is_log_file, is_ryujinx_log_file
 
+    @staticmethod
+    def is_ryujinx_log_name(filename: str) -> bool:
+        return log_patterns["ryujinx_log_name"].match(filename) is not None
+
+    @staticmethod
+    def is_log_archive_name(attachment: Attachment) -> bool:
+        return is_log_archive(attachment.filename)
+
     def __init__(self, bot):
         self.bot = bot
         self.bot_log_allowed_channels = self.bot.config.bot_log_allowed_channels
         self.disallowed_named_roles = ["pirate"]
         self.ryujinx_blue = Colour(0x4A90E2)
         self.uploaded_log_info = []
+        self.prescreen_stats = {"screened": 0, "passed": 0, "bytes_saved": 0}
+        self.crash_signatures = CrashSignatureIndex(bot)
+        self.log_analytics = LogAnalytics(bot)
+        # Logs are analysed in-process unless analysis workers are configured
+        log_analysis_workers = getattr(self.bot.config, "log_analysis_workers", [])
+        self.log_workers = (
+            LogWorkerClient(log_analysis_workers)
+            if len(log_analysis_workers) > 0
+            else None
+        )
 
         self.disallowed_roles = [
             self.bot.config.named_roles[x] for x in self.disallowed_named_roles
         ]
+        self.bot.message_dispatcher.register(
+            "LogFileReader", self.handle_message, requires_attachments=True
+        )
 
-    @staticmethod
-    async def download_file(log_url):
-        async with aiohttp.ClientSession() as session:
-            # Grabs first and last few bytes of log file to prevent abuse from large files
-            headers = {"Range": "bytes=0-60000, -6000"}
-            async with session.get(log_url, headers=headers) as response:
-                return await response.text("UTF-8")
+    def cog_unload(self):
+        self.bot.message_dispatcher.unregister("LogFileReader")
+        # Write out the changes which haven't been saved in the background yet
+        self.crash_signatures.save()
+        self.log_analytics.save()
+
+    async def download_file(self, attachment: Attachment) -> str:
+        if attachment.size == 0:
+            # There's no valid range of an empty file
+            return ""
+        # Samples parts of the log file within a byte budget to prevent abuse from large files
+        fetcher = AdaptiveLogFetcher(
+            lambda start, end: self.bot.attachment_cache.fetch(
+                attachment, f"bytes={start}-{end - 1}"
+            ),
+            attachment.size,
+            budget=self.log_fetch_budget,
+        )
+        log_buffer = await fetcher.fetch()
+        return log_buffer.to_text()
+
+    async def extract_log_files(self, attachment: Attachment) -> list[tuple[str, str]]:
+        if attachment.size > self.max_log_archive_size:
+            raise ValueError(
+                f"Archive is larger than {self.max_log_archive_size // (1000 * 1000)} MB."
+            )
+        archive = await self.bot.attachment_cache.fetch(attachment)
+        # Decompression is CPU bound, so keep it off the event loop
+        return await asyncio.to_thread(
+            extract_log_archive, attachment.filename, archive
+        )
+
+    async def load_log_files(self, attachment: Attachment) -> list[tuple[str, str]]:
+        """
+        Returns the filename and text of the attached log, or of every log inside an attached archive.
+        """
+        if self.is_log_archive_name(attachment):
+            return await self.extract_log_files(attachment)
+        return [(attachment.filename, await self.download_file(attachment))]
+
+    async def prescreen_log_file(self, attachment: Attachment) -> Optional[str]:
+        """
+        Fetches the first few KB of a text attachment and checks for a Ryujinx log signature.
+
+        Returns the log text to check if the attachment looks like a Ryujinx log, otherwise None.
+        """
+        if attachment.size == 0:
+            return None
+        head_bytes = await self.bot.attachment_cache.fetch(
+            attachment, f"bytes=0-{self.prescreen_size - 1}"
+        )
+        # The prefix may end in the middle of a multibyte character
+        head = head_bytes.decode("UTF-8", errors="ignore")
+        is_candidate = log_patterns["log_signature"].search(head) is not None
+
+        self.prescreen_stats["screened"] += 1
+        if is_candidate:
+            self.prescreen_stats["passed"] += 1
+        else:
+            self.prescreen_stats["bytes_saved"] += max(
+                0, min(attachment.size, self.log_fetch_budget) - len(head_bytes)
+            )
+        logging.info(
+            f"Log pre-screen: {self.prescreen_stats['passed']}/{self.prescreen_stats['screened']} "
+            f"attachments passed, {self.prescreen_stats['bytes_saved']} bytes saved"
+        )
+
+        if not is_candidate:
+            return None
+        if attachment.size <= len(head_bytes):
+            # The whole file has already been downloaded
+            return head_bytes.decode("UTF-8", errors="replace")
+        return await self.download_file(attachment)
 
     @staticmethod
     def is_log_valid(log_file: str) -> bool:
@@ -169,46 +276,46 @@ class LogFileReader(Cog):
         await message.delete()
         return embed
 
-    def format_analysed_log(self, author_name: str, analysed_log):
-        cleaned_game_name = re.sub(
-            r"\s\[(64|32)-bit\]$", "", analysed_log["game_info"]["game_name"]
-        )
-        analysed_log["game_info"]["game_name"] = cleaned_game_name
+    def format_analysed_log(self, author_name: str, analysed_log: AnalysedLog):
+        cleaned_game_name = analysed_log.game_info.display_name
+        hardware = analysed_log.hardware_info
+        settings = analysed_log.settings
+        error_snippet = analysed_log.error_snippet
 
         hardware_info = " | ".join(
             (
-                f"**CPU:** {analysed_log['hardware_info']['cpu']}",
-                f"**GPU:** {analysed_log['hardware_info']['gpu']}",
-                f"**RAM:** {analysed_log['hardware_info']['ram']}",
-                f"**OS:** {analysed_log['hardware_info']['os']}",
+                f"**CPU:** {hardware.cpu}",
+                f"**GPU:** {hardware.gpu}",
+                f"**RAM:** {hardware.ram}",
+                f"**OS:** {hardware.os}",
             )
         )
 
         system_settings_info = "\n".join(
             (
-                f"**Audio Backend:** `{analysed_log['settings']['audio_backend']}`",
-                f"**Console Mode:** `{analysed_log['settings']['docked']}`",
-                f"**PPTC Cache:** `{analysed_log['settings']['pptc']}`",
-                f"**Shader Cache:** `{analysed_log['settings']['shader_cache']}`",
-                f"**V-Sync:** `{analysed_log['settings']['vsync']}`",
-                f"**Hypervisor:** `{analysed_log['settings']['hypervisor']}`",
+                f"**Audio Backend:** `{settings.audio_backend}`",
+                f"**Console Mode:** `{settings.docked}`",
+                f"**PPTC Cache:** `{settings.pptc}`",
+                f"**Shader Cache:** `{settings.shader_cache}`",
+                f"**V-Sync:** `{settings.vsync}`",
+                f"**Hypervisor:** `{settings.hypervisor}`",
             )
         )
 
         graphics_settings_info = "\n".join(
             (
-                f"**Graphics Backend:** `{analysed_log['settings']['graphics_backend']}`",
-                f"**Resolution:** `{analysed_log['settings']['resolution_scale']}`",
-                f"**Anisotropic Filtering:** `{analysed_log['settings']['anisotropic_filtering']}`",
-                f"**Aspect Ratio:** `{analysed_log['settings']['aspect_ratio']}`",
-                f"**Texture Recompression:** `{analysed_log['settings']['texture_recompression']}`",
+                f"**Graphics Backend:** `{settings.graphics_backend}`",
+                f"**Resolution:** `{settings.resolution_scale}`",
+                f"**Anisotropic Filtering:** `{settings.anisotropic_filtering}`",
+                f"**Aspect Ratio:** `{settings.aspect_ratio}`",
+                f"**Texture Recompression:** `{settings.texture_recompression}`",
             )
         )
 
         ryujinx_info = " | ".join(
             (
-                f"**Version:** {analysed_log['emu_info']['ryu_version']}",
-                f"**Firmware:** {analysed_log['emu_info']['ryu_firmware']}",
+                f"**Version:** {analysed_log.emu_info.ryu_version}",
+                f"**Firmware:** {analysed_log.emu_info.ryu_firmware}",
             )
         )
 
@@ -229,10 +336,7 @@ class LogFileReader(Cog):
             value=graphics_settings_info,
             inline=True,
         )
-        if (
-            cleaned_game_name == "Unknown"
-            and analysed_log["game_info"]["errors"] == "No errors found in log"
-        ):
+        if cleaned_game_name == "Unknown" and error_snippet == "No errors found in log":
             log_embed.add_field(
                 name="Empty Log",
                 value=f"""The log file appears to be empty. To get a proper log, follow these steps:
@@ -243,13 +347,10 @@ class LogFileReader(Cog):
     5) Upload the latest log file which is larger than 3KB.""",
                 inline=False,
             )
-        if (
-            cleaned_game_name == "Unknown"
-            and analysed_log["game_info"]["errors"] != "No errors found in log"
-        ):
+        if cleaned_game_name == "Unknown" and error_snippet != "No errors found in log":
             log_embed.add_field(
                 name="Latest Error Snippet",
-                value=analysed_log["game_info"]["errors"],
+                value=error_snippet,
                 inline=False,
             )
             log_embed.add_field(
@@ -265,34 +366,81 @@ class LogFileReader(Cog):
         else:
             log_embed.add_field(
                 name="Latest Error Snippet",
-                value=analysed_log["game_info"]["errors"],
+                value=error_snippet,
                 inline=False,
             )
+            # Limit mods and cheats to 5 entries
             log_embed.add_field(
-                name="Mods", value=analysed_log["game_info"]["mods"], inline=False
+                name="Mods", value=analysed_log.game_info.format_mods(5), inline=False
             )
             log_embed.add_field(
-                name="Cheats", value=analysed_log["game_info"]["cheats"], inline=False
+                name="Cheats",
+                value=analysed_log.game_info.format_cheats(5),
+                inline=False,
             )
 
         log_embed.add_field(
             name="Notes",
-            value=analysed_log["game_info"]["notes"],
+            value=analysed_log.notes_text,
             inline=False,
         )
 
         return log_embed
 
-    async def log_file_read(self, message):
-        attached_log = message.attachments[0]
-        author_name = f"@{message.author.name}"
-        log_file = await self.download_file(attached_log.url)
-
+    async def blocked_log_action(
+        self, message: Message, log_file: str
+    ) -> Optional[Embed]:
         if self.is_game_blocked(log_file):
             return await self.blocked_game_action(message)
         blocked_path = self.contains_blocked_paths(log_file)
         if blocked_path:
             return await self.blocked_path_action(message, blocked_path)
+        return None
+
+    async def check_blocked_logs(
+        self,
+        message: Message,
+        loaded_logs: list[Union[list[tuple[str, str]], BaseException]],
+    ) -> Optional[Embed]:
+        for log_files in loaded_logs:
+            if isinstance(log_files, BaseException):
+                continue
+            for _, log_file in log_files:
+                blocked_embed = await self.blocked_log_action(message, log_file)
+                if blocked_embed is not None:
+                    return blocked_embed
+        return None
+
+    async def download_log_files(
+        self, attachments: list[Attachment], download
+    ) -> list[Union[str, BaseException]]:
+        semaphore = asyncio.Semaphore(self.max_concurrent_downloads)
+
+        async def bounded_download(attachment: Attachment):
+            async with semaphore:
+                return await download(attachment)
+
+        return await asyncio.gather(
+            *(bounded_download(attachment) for attachment in attachments),
+            return_exceptions=True,
+        )
+
+    async def analyse_log_file(
+        self, log_file: str, is_channel_allowed: bool
+    ) -> dict[str, Any]:
+        pr_channel = self.bot.config.bot_log_allowed_channels["pr-testing"]
+        note_rules = get_log_note_rules(self.bot)
+        known_issues = get_known_issue_matcher(self.bot)
+        if self.log_workers is None:
+            return analyse_log(
+                log_file, is_channel_allowed, pr_channel, note_rules, known_issues
+            )
+        return await self.log_workers.analyse(
+            log_file, is_channel_allowed, pr_channel, note_rules, known_issues
+        )
+
+    async def log_file_read(self, message: Message, log_file: str) -> Embed:
+        author_name = f"@{message.author.name}"
 
         for role in message.author.roles:
             if role.id in self.disallowed_roles:
@@ -312,26 +460,54 @@ class LogFileReader(Cog):
             embed.set_footer(text=f"Log uploaded by {author_name}")
             return embed
 
-        try:
-            analyser = LogAnalyser(log_file)
-        except ValueError:
-            return Embed(
-                colour=self.ryujinx_blue,
-                description="This log file appears to be invalid. Please make sure to upload a Ryujinx log file.",
-            )
-
         is_channel_allowed = False
         for allowed_channel_id in self.bot.config.bot_log_allowed_channels.values():
             if message.channel.id == allowed_channel_id:
                 is_channel_allowed = True
                 break
 
-        return self.format_analysed_log(
-            author_name,
-            analyser.analyse_discord(
-                is_channel_allowed,
-                self.bot.config.bot_log_allowed_channels["pr-testing"],
-            ),
+        result = await self.analyse_log_file(log_file, is_channel_allowed)
+        if result.get("error") == "invalid_log":
+            return Embed(
+                colour=self.ryujinx_blue,
+                description="This log file appears to be invalid. Please make sure to upload a Ryujinx log file.",
+            )
+
+        analysed_log = AnalysedLog.from_serialised(result["analysed_log"])
+        log_embed = self.format_analysed_log(author_name, analysed_log)
+        self.record_crash_signature(
+            message.jump_url, result["error_signature"], analysed_log
+        )
+        self.log_analytics.record(
+            analysed_log, [CommonError[name] for name in result["common_errors"]]
+        )
+        return log_embed
+
+    def record_crash_signature(
+        self,
+        link: str,
+        error_signature: Optional[tuple[str, str, list[str]]],
+        analysed_log: AnalysedLog,
+    ):
+        if error_signature is None:
+            return
+        signature, exception_type, frames = error_signature
+
+        game_name = analysed_log.game_info.display_name
+        app_id = ""
+        app_id_match = log_patterns["app_id_suffix"].search(game_name)
+        if app_id_match is not None:
+            app_id = app_id_match.group(1).upper()
+            game_name = game_name[: app_id_match.start()]
+
+        self.crash_signatures.add(
+            signature,
+            exception_type,
+            frames,
+            app_id,
+            game_name,
+            analysed_log.emu_info.ryu_version,
+            link,
         )
 
     @commands.check(check_if_staff)
@@ -523,6 +699,98 @@ class LogFileReader(Cog):
         else:
             return await ctx.send(f"No blocked path content '{block_path}' found.")
 
+    @commands.check(check_if_staff)
+    @commands.command(
+        aliases=["crashes", "crash_clusters", "top_crashes", "listcrashes"]
+    )
+    async def list_crash_clusters(self, ctx: Context, *, search: str = None):
+        """Lists the most common crashes, optionally for a game or Ryujinx version."""
+        clusters = self.crash_signatures.top(search)
+        if len(clusters) == 0:
+            return await ctx.send("No crashes recorded yet.")
+
+        messages = []
+        message = "**Most common crashes"
+        message += f" for '{search}':**\n" if search is not None else ":**\n"
+        for signature, entry in clusters:
+            games = ", ".join(entry["games"].values()) or "Unknown"
+            versions = ", ".join(entry["versions"].keys())
+            samples = " ".join(
+                f"[{i + 1}](<{link}>)" for i, link in enumerate(entry["samples"])
+            )
+            cluster_info = (
+                f"- `{signature}` **{entry['exception']}** x{entry['count']} "
+                f"(first: {entry['first_seen']}, last: {entry['last_seen']})\n"
+                f"  - `{entry['frames'][0]}`\n"
+                f"  - __Games__: {games}\n"
+                f"  - __Versions__: {versions}\n"
+                f"  - __Samples__: {samples}\n"
+            )
+            if len(message) + len(cluster_info) >= 1900:
+                messages.append(message)
+                message = cluster_info
+            else:
+                message += cluster_info
+        messages.append(message)
+
+        for msg in messages:
+            await ctx.send(msg)
+
+    @commands.check(check_if_staff)
+    @commands.command(aliases=["noterules", "log_note_rules", "reload_note_rules"])
+    async def note_rules(self, ctx: Context):
+        """Reloads the log note rules and shows which ones are in use."""
+        rule_set = get_log_note_rules(self.bot)
+        source = (
+            "built-in rules"
+            if rule_set is default_note_rule_set
+            else f"`{get_log_note_rules_path(self.bot)}`"
+        )
+        return await ctx.send(
+            f"Using {len(rule_set)} log note rules with {rule_set.predicate_count} "
+            f"distinct conditions from {source}."
+        )
+
+    @commands.check(check_if_staff)
+    @commands.command(aliases=["logstats", "log_stats", "analytics"])
+    async def log_analytics_summary(self, ctx: Context, limit: int = 5):
+        """Shows aggregate statistics of all analysed logs."""
+        analytics = self.log_analytics
+        if analytics.total == 0:
+            return await ctx.send("No logs analysed yet.")
+
+        messages = []
+        message = f"**Analysed logs:** {analytics.total}\n"
+        daily = " ".join(
+            f"`{day[5:]}: {count}`" for day, count in sorted(analytics.daily.items())
+        )
+        message += f"**Per day:** {daily}\n"
+
+        for name, counter in analytics.counters.items():
+            top_entries = sorted(counter.items(), key=lambda x: x[1], reverse=True)
+            entries = ", ".join(
+                f"{key} ({count / analytics.total:.0%})"
+                for key, count in top_entries[:limit]
+            )
+            message += (
+                f"- __{name.replace('_', ' ').capitalize()}__: {entries or 'None'}\n"
+            )
+
+        for name, sketch in analytics.sketches.items():
+            section = f"**Top {name}:**\n"
+            for key, count, error in sketch.top(limit):
+                estimate = f"{count}" if error == 0 else f"{count - error}-{count}"
+                section += f"- `{key}` x{estimate}\n"
+            if len(message) + len(section) >= 1900:
+                messages.append(message)
+                message = section
+            else:
+                message += section
+        messages.append(message)
+
+        for msg in messages:
+            await ctx.send(msg)
+
     @commands.check(check_if_staff)
     @commands.command(
         aliases=[
@@ -554,30 +822,64 @@ class LogFileReader(Cog):
         for msg in messages:
             await ctx.send(msg)
 
-    async def analyse_log_message(self, message: Message, attachment_index=0):
-        author_id = message.author.id
-        author_mention = message.author.mention
-        filename = message.attachments[attachment_index].filename
-        filesize = message.attachments[attachment_index].size
-        # Any message over 2000 chars is uploaded as message.txt, so this is accounted for
-        log_file_link = message.jump_url
-
-        uploaded_logs_exist = [
-            True for elem in self.uploaded_log_info if filename in elem.values()
+    def find_uploaded_log(
+        self, message: Message, attachment: Attachment
+    ) -> Optional[dict[str, Union[str, int]]]:
+        uploaded_logs = [
+            elem
+            for elem in self.uploaded_log_info
+            if elem["filename"] == attachment.filename
         ]
-        if not any(uploaded_logs_exist):
-            reply_message = await message.channel.send(
-                "Log detected, parsing...", reference=message
-            )
+        return next(
+            (
+                elem
+                for elem in uploaded_logs
+                if elem["file_size"] == attachment.size
+                and elem["author"] == message.author.id
+            ),
+            uploaded_logs[0] if len(uploaded_logs) > 0 else None,
+        )
+
+    async def read_log_files(
+        self, message: Message, attachments: list[Attachment]
+    ) -> tuple[list[Embed], bool]:
+        """
+        Downloads all attachments concurrently and analyses them.
+
+        Returns one embed per log (or a single embed if the message was removed)
+        and whether the author should be pinged about a problem with their logs.
+        """
+        loaded_logs = await self.download_log_files(attachments, self.load_log_files)
+
+        # Every log is checked, including archive members which won't be analysed
+        blocked_embed = await self.check_blocked_logs(message, loaded_logs)
+        if blocked_embed is not None:
+            return [blocked_embed], False
+
+        embeds = []
+        notify_author = False
+        for attachment, log_files in zip(attachments, loaded_logs):
             try:
-                embed = await self.log_file_read(message)
-                if "Ryujinx_" in filename:
+                if isinstance(log_files, BaseException):
+                    raise log_files
+                if self.is_log_archive_name(attachment):
+                    log_files = [
+                        (filename, log_file)
+                        for filename, log_file in log_files
+                        if self.is_ryujinx_log_name(filename)
+                    ]
+                    if len(log_files) == 0:
+                        raise ValueError("No Ryujinx log files found in archive.")
+                for _, log_file in log_files:
+                    embeds.append(await self.log_file_read(message, log_file))
+                if any("Ryujinx_" in filename for filename, _ in log_files):
                     self.uploaded_log_info.append(
                         {
-                            "filename": filename,
-                            "file_size": filesize,
-                            "link": log_file_link,
-                            "author": author_id,
+                            "filename": attachment.filename,
+                            "file_size": attachment.size,
+                            # Any message over 2000 chars is uploaded as message.txt, so this is accounted for
+                            "link": message.jump_url,
+                            "author": message.author.id,
                         }
                     )
                     # Avoid duplicate log file analysis, at least temporarily; keep track of the last few filenames of uploaded logs
@@ -585,56 +887,115 @@ class LogFileReader(Cog):
                     # fmt: off
                     self.uploaded_log_info = self.uploaded_log_info[-5:]
                     # fmt: on
-                return await reply_message.edit(content=None, embed=embed)
             except UnicodeDecodeError as error:
-                await reply_message.edit(
-                    content=author_mention,
-                    embed=Embed(
-                        description="This log file appears to be invalid. Please re-check and re-upload your log file.",
+                embeds.append(
+                    Embed(
+                        description=f"The log file `{attachment.filename}` appears to be invalid. Please re-check and re-upload your log file.",
                         colour=self.ryujinx_blue,
-                    ),
+                    )
+                )
+                notify_author = True
+                logging.warning(error)
+            except ValueError as error:
+                embeds.append(
+                    Embed(
+                        description=f"Couldn't read `{attachment.filename}`: {error}",
+                        colour=self.ryujinx_blue,
+                    )
                 )
+                notify_author = True
                 logging.warning(error)
             except Exception as error:
-                await reply_message.edit(
-                    content=f"Error: Couldn't parse log; parser threw `{type(error).__name__}` exception."
+                embeds.append(
+                    Embed(
+                        description=f"Error: Couldn't parse `{attachment.filename}`; parser threw `{type(error).__name__}` exception.",
+                        colour=self.ryujinx_blue,
+                    )
                 )
                 logging.warning(error)
-        else:
-            duplicate_log_file = next(
-                (
-                    elem
-                    for elem in self.uploaded_log_info
-                    if elem["filename"] == filename
-                    and elem["file_size"] == filesize
-                    and elem["author"] == author_id
-                ),
-                None,
+
+        return embeds, notify_author
+
+    async def analyse_log_message(
+        self, message: Message, attachments: list[Attachment]
+    ):
+        author_mention = message.author.mention
+        new_logs = []
+        duplicate_embeds = []
+
+        for attachment in attachments:
+            duplicate_log_file = self.find_uploaded_log(message, attachment)
+            if duplicate_log_file is None:
+                new_logs.append(attachment)
+            else:
+                duplicate_embeds.append(
+                    Embed(
+                        description=f"The log file `{attachment.filename}` appears to be a duplicate [already uploaded here]({duplicate_log_file['link']}). Please upload a more recent file.",
+                        colour=self.ryujinx_blue,
+                    )
+                )
+
+        if len(new_logs) == 0:
+            return await message.channel.send(
+                content=author_mention, embeds=duplicate_embeds[:10]
             )
-            await message.channel.send(
-                content=author_mention,
-                embed=Embed(
-                    description=f"The log file `{filename}` appears to be a duplicate [already uploaded here]({duplicate_log_file['link']}). Please upload a more recent file.",
-                    colour=self.ryujinx_blue,
-                ),
+
+        reply_message = await message.channel.send(
+            (
+                "Log detected, parsing..."
+                if len(new_logs) == 1
+                else "Logs detected, parsing..."
+            ),
+            reference=message,
+        )
+        embeds, notify_author = await self.read_log_files(message, new_logs)
+        if len(duplicate_embeds) > 0:
+            notify_author = True
+
+        # Discord only allows 10 embeds per message
+        return await reply_message.edit(
+            content=author_mention if notify_author else None,
+            embeds=(embeds + duplicate_embeds)[:10],
+        )
+
+    async def profile_log_message(self, ctx: Context, attachment: Attachment):
+        note_rules = get_log_note_rules(self.bot)
+        for filename, log_file in await self.load_log_files(attachment):
+            try:
+                # Loading the log is part of the analysis, so it's kept off the event loop as well
+                result = await asyncio.to_thread(
+                    lambda: LogAnalyser(log_file, note_rules).analyse(True)
+                )
+            except ValueError:
+                await ctx.send(f"`{filename}` doesn't appear to be a valid log file.")
+                continue
+            await ctx.send(
+                f"**Analysis profile of `{filename}`** ({len(log_file) / 1024:.0f} KB):\n"
+                f"```\n{LogAnalyser.format_profile(result['profile'])}\n```"
             )
 
     @commands.cooldown(3, 30, BucketType.channel)
     @commands.command(
         aliases=["analyselog", "analyse_log", "analyze", "analyzelog", "analyze_log"]
     )
-    async def analyse(self, ctx: Context, attachment_number=1):
+    async def analyse(self, ctx: Context, *options: str):
+        """Analyses a log file, staff can add `--profile` to get the time spent in each stage."""
+        profile = "--profile" in options and check_if_staff(ctx)
+        attachment_number = next(
+            (int(option) for option in options if option.isdigit()), 1
+        )
+
         await ctx.message.delete()
         if ctx.message.reference is not None:
             message = await ctx.fetch_message(ctx.message.reference.message_id)
-            if len(message.attachments) >= attachment_number:
+            if 0 < attachment_number <= len(message.attachments):
                 attachment = message.attachments[attachment_number - 1]
                 is_log_file, _ = self.is_valid_log_name(attachment)
 
-                if is_log_file:
-                    return await self.analyse_log_message(
-                        message, attachment_number - 1
-                    )
+                if is_log_file or self.is_log_archive_name(attachment):
+                    if profile:
+                        return await self.profile_log_message(ctx, attachment)
+                    return await self.analyse_log_message(message, [attachment])
                 else:
                     return await ctx.send(
                         f"The attached log file '{attachment.filename}' is not valid.",
@@ -645,48 +1006,64 @@ class LogFileReader(Cog):
             "Please use `.analyse` as a reply to a message with an attached log file."
         )
 
-    @Cog.listener()
-    async def on_message(self, message: Message):
-        await self.bot.wait_until_ready()
-        if message.author.bot:
-            return
+    async def handle_message(self, message: Message):
+        text_files = []
+        ryujinx_log_files = []
+        log_archives = []
         for attachment in message.attachments:
             is_log_file, is_ryujinx_log_file = self.is_valid_log_name(attachment)
+            if self.is_log_archive_name(attachment):
+                ryujinx_log_files.append(attachment)
+                log_archives.append(attachment)
+            elif is_log_file and is_ryujinx_log_file:
+                ryujinx_log_files.append(attachment)
+            elif is_log_file:
+                text_files.append(attachment)
 
-            if is_log_file and not is_ryujinx_log_file:
-                attached_log = message.attachments[0]
-                log_file = await self.download_file(attached_log.url)
+        is_channel_allowed = (
+            message.channel.id in self.bot_log_allowed_channels.values()
+        )
+
+        if len(text_files) > 0:
+            log_files = await self.download_log_files(
+                text_files, self.prescreen_log_file
+            )
+            for log_file in log_files:
+                if isinstance(log_file, BaseException):
+                    logging.warning(log_file)
+                    continue
+                if log_file is None:
+                    continue
                 # Large files show a header value when not downloaded completely
-                # this regex makes sure that the log text to read starts from the first timestamp, ignoring headers
-                log_file_header_regex = re.compile(
-                    r"\d{2}:\d{2}:\d{2}\.\d{3}.*", re.DOTALL
-                )
-                log_file_match = re.search(log_file_header_regex, log_file)
+                # the log text to read starts from the first timestamp, ignoring headers
+                log_file_match = log_patterns["log_start"].search(log_file)
                 if log_file_match:
-                    log_file = log_file_match.group(0)
-                    if self.is_game_blocked(log_file):
-                        return await message.channel.send(
-                            content=None, embed=await self.blocked_game_action(message)
-                        )
-                    blocked_path = self.contains_blocked_paths(log_file)
-                    if blocked_path:
+                    blocked_embed = await self.blocked_log_action(
+                        message, log_file[log_file_match.start() :]
+                    )
+                    if blocked_embed is not None:
                         return await message.channel.send(
-                            content=None,
-                            embed=await self.blocked_path_action(message, blocked_path),
+                            content=None, embed=blocked_embed
                         )
-            elif (
-                is_log_file
-                and is_ryujinx_log_file
-                and message.channel.id in self.bot_log_allowed_channels.values()
-            ):
-                return await self.analyse_log_message(
-                    message, message.attachments.index(attachment)
-                )
-            elif (
-                is_log_file
-                and is_ryujinx_log_file
-                and message.channel.id not in self.bot_log_allowed_channels.values()
-            ):
+
+        if len(log_archives) > 0 and not is_channel_allowed:
+            # Archived logs are only analysed in the log channels, but they're checked everywhere
+            loaded_logs = await self.download_log_files(
+                log_archives, self.extract_log_files
+            )
+            for log_files in loaded_logs:
+                if isinstance(log_files, BaseException):
+                    logging.warning(log_files)
+            blocked_embed = await self.check_blocked_logs(message, loaded_logs)
+            if blocked_embed is not None:
+                return await message.channel.send(content=None, embed=blocked_embed)
+
+        contains_ryujinx_logs = len(ryujinx_log_files) > len(log_archives)
+
+        if len(ryujinx_log_files) > 0:
+            if is_channel_allowed:
+                return await self.analyse_log_message(message, ryujinx_log_files)
+            elif contains_ryujinx_logs:
                 return await message.author.send(
                     content=message.author.mention,
                     embed=Embed(
@@ -6,9 +6,10 @@ import discord
 from discord.ext.commands import Cog
 
 from robocop_ng.helpers.checks import check_if_staff
-from robocop_ng.helpers.invites import get_invites, set_invites
+from robocop_ng.helpers.duplicate_detector import DuplicateDetector
 from robocop_ng.helpers.restrictions import get_user_restrictions
 from robocop_ng.helpers.userlogs import get_userlog
+from robocop_ng.helpers.word_matcher import WordMatcher
 
 
 class Logs(Cog):
@@ -23,59 +24,76 @@ class Logs(Cog):
         )
         self.name_re = re.compile(r"[a-zA-Z0-9].*")
         self.clean_re = re.compile(r"[^a-zA-Z0-9_ ]+", re.UNICODE)
-        # All lower case, no spaces, nothing non-alphanumeric
-        susp_hellgex = "|".join(
-            [r"\W*".join(list(word)) for word in self.bot.config.suspect_words]
+        # The parts of a message which are left after cleaning it with clean_re
+        self.kept_re = re.compile(r"[a-zA-Z0-9_ ]+")
+        # Suspect and ignored words are found together in one pass over the cleaned message,
+        # words with characters removed by clean_re can't be part of it
+        self.spy_word_matcher = WordMatcher(
+            word
+            for word in self.bot.config.suspect_words
+            + self.bot.config.suspect_ignored_words
+            if self.clean_re.search(word) is None
         )
-        self.susp_hellgex = re.compile(susp_hellgex, re.IGNORECASE)
+        self.suspect_words = set(self.bot.config.suspect_words)
+        self.ignored_words = set(self.bot.config.suspect_ignored_words)
+        self.bot.message_dispatcher.register(
+            "Logs",
+            self.do_spy,
+            channels=self.bot.config.spy_channels,
+            ignore_bots=False,
+        )
+        self.duplicate_detector = DuplicateDetector(self.bot)
+        self.bot.message_dispatcher.register("Logs.duplicates", self.do_duplicate_check)
+
+        self.bot.join_pipeline.register_roles("Restrictions", self.get_restrictions)
+        self.bot.join_pipeline.register_step("Logs", self.do_join)
+
+    def cog_unload(self):
+        self.bot.message_dispatcher.unregister("Logs")
+        self.bot.message_dispatcher.unregister("Logs.duplicates")
+        self.bot.join_pipeline.unregister("Restrictions")
+        self.bot.join_pipeline.unregister("Logs")
+
+    def get_restrictions(self, member) -> list[int]:
+        # Gives back muted role to users that leave with it,
+        # before the join is logged and even if they get kicked during a raid
+        if member.guild.id not in self.bot.config.guild_whitelist:
+            return []
+        return get_user_restrictions(self.bot, member.id)
 
     @Cog.listener()
-    async def on_member_join(self, member):
-        await self.bot.wait_until_ready()
+    async def on_invite_create(self, invite):
+        if (
+            invite.guild is None
+            or invite.guild.id not in self.bot.config.guild_whitelist
+        ):
+            return
+        self.bot.invite_registry.add(invite)
 
+    @Cog.listener()
+    async def on_invite_delete(self, invite):
+        if (
+            invite.guild is None
+            or invite.guild.id not in self.bot.config.guild_whitelist
+        ):
+            return
+        self.bot.invite_registry.mark_deleted(invite.code)
+
+    async def do_join(self, member):
         if member.guild.id not in self.bot.config.guild_whitelist:
             return
 
-        log_channel = self.bot.get_channel(self.bot.config.log_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.log_channel)
         # We use this a lot, might as well get it once
         escaped_name = self.bot.escape_message(member)
 
         # Attempt to correlate the user joining with an invite
-        invites = get_invites(self.bot)
-
-        real_invites = await member.guild.invites()
-
-        # Add unknown active invites. Can happen if invite was manually created
-        for invite in real_invites:
-            if invite.id not in invites:
-                invites[invite.id] = {
-                    "uses": 0,
-                    "url": invite.url,
-                    "max_uses": invite.max_uses,
-                    "code": invite.code,
-                }
-
-        probable_invites_used = []
-        items_to_delete = []
-        # Look for invites whose usage increased since last lookup
-        for id, invite in invites.items():
-            real_invite = next((x for x in real_invites if x.id == id), None)
-
-            if real_invite is None:
-                # Invite does not exist anymore. Was either revoked manually
-                # or the final use was used up
-                probable_invites_used.append(invite)
-                items_to_delete.append(id)
-            elif invite["uses"] < real_invite.uses:
-                probable_invites_used.append(invite)
-                invite["uses"] = real_invite.uses
-
-        # Delete used up invites
-        for id in items_to_delete:
-            del invites[id]
-
-        # Save invites data.
-        set_invites(self.bot, invites)
+        try:
+            probable_invites_used = await self.bot.invite_registry.get_used_invites(
+                member.guild
+            )
+        except discord.HTTPException:
+            probable_invites_used = []
 
         # Prepare the invite correlation message
         if len(probable_invites_used) == 1:
@@ -86,6 +104,17 @@ class Logs(Cog):
             invite_used = "One of: "
             invite_used += ", ".join([x["code"] for x in probable_invites_used])
 
+        raid_reasons = self.bot.raid_detector.record_join(
+            member,
+            (
+                probable_invites_used[0]["code"]
+                if len(probable_invites_used) == 1
+                else None
+            ),
+        )
+        if len(raid_reasons) > 0:
+            await self.log_raid_mode(raid_reasons)
+
         # Check if user account is older than 15 minutes
         age = member.joined_at - member.created_at
         if age < self.bot.config.min_age:
@@ -115,6 +144,11 @@ class Logs(Cog):
                 )
             await log_channel.send(msg)
             return
+
+        if self.bot.raid_detector.is_raid_mode():
+            await self.do_raid_join(member, log_channel, escaped_name, age, invite_used)
+            return
+
         msg = (
             f"✅ **Join**: {member.mention} | "
             f"{escaped_name}\n"
@@ -124,12 +158,6 @@ class Logs(Cog):
             f"🏷 __User ID__: {member.id}"
         )
 
-        # Handles user restrictions
-        # Basically, gives back muted role to users that leave with it.
-        rsts = get_user_restrictions(self.bot, member.id)
-        roles = [discord.utils.get(member.guild.roles, id=rst) for rst in rsts]
-        await member.add_roles(*roles)
-
         # Real hell zone.
         warns = get_userlog(self.bot)
         try:
@@ -150,6 +178,85 @@ class Logs(Cog):
         except KeyError:  # if the user is not in the file
             await log_channel.send(msg)
 
+    async def log_raid_mode(self, reasons: list[str]):
+        action = self.bot.raid_detector.settings["action"]
+        msg = (
+            "🚨 **Raid mode enabled**: "
+            f"{', '.join(reasons)} in the last "
+            f"{self.bot.raid_detector.settings['window']} seconds.\n"
+            "Joins are logged without their warns"
+        )
+        if action == "kick":
+            msg += " and kicked"
+        elif action == "quarantine":
+            msg += " and quarantined"
+        msg += ". Use `raidmode off` to disable it."
+        modlog_channel = self.bot.log_sink.get_destination(
+            self.bot.config.modlog_channel
+        )
+        await modlog_channel.send(msg)
+
+    async def do_raid_join(self, member, log_channel, escaped_name, age, invite_used):
+        # Joins are kept to a single line and skip the userlog, so a raid is cheap to log
+        msg = (
+            f"🛡️ **Raid join**: {member.mention} | {escaped_name} | "
+            f"age {age} | invite {invite_used} | {member.id}"
+        )
+
+        action = self.bot.raid_detector.settings["action"]
+        try:
+            if action == "kick":
+                await member.kick(reason="Raid mode")
+                msg += " | kicked"
+            elif action == "quarantine":
+                quarantine_role = member.guild.get_role(
+                    self.bot.raid_detector.settings["quarantine_role"]
+                )
+                if quarantine_role is not None:
+                    await member.add_roles(quarantine_role, reason="Raid mode")
+                    msg += " | quarantined"
+        except discord.HTTPException as e:
+            # Forbidden is an HTTPException too, the join is logged either way
+            msg += f" | couldn't {action}: {e.text or e.status}"
+        await log_channel.send(msg)
+
+    def get_clean_offsets(self, content: str) -> list[int]:
+        """
+        Returns the offset in the message of every character left after cleaning it with clean_re.
+        """
+        offsets = []
+        for kept in self.kept_re.finditer(content):
+            offsets.extend(range(kept.start(), kept.end()))
+        return offsets
+
+    def highlight_spy_words(
+        self, content: str, word_matches: list[tuple[int, int, str]]
+    ) -> str:
+        """
+        Puts the suspect words found in the cleaned message in bold in the original message.
+        """
+        # Only built for messages which are reported, most messages don't contain any spy word
+        clean_offsets = self.get_clean_offsets(content) if len(word_matches) > 0 else []
+
+        def clean_markdown(text: str) -> str:
+            # Bad Code :tm:, blame retr0id
+            return text.replace("*", "").replace("_", "")
+
+        parts = []
+        position = 0
+        for start, end, word in word_matches:
+            if word not in self.suspect_words or end > len(clean_offsets):
+                continue
+            start = clean_offsets[start]
+            if start < position:
+                continue
+            end = clean_offsets[end - 1] + 1
+            parts.append(clean_markdown(content[position:start]))
+            parts.append(f"**{clean_markdown(content[start:end])}**")
+            position = end
+        parts.append(clean_markdown(content[position:]))
+        return "".join(parts)
+
     async def do_spy(self, message):
         if message.author.bot:
             return
@@ -158,6 +265,7 @@ class Logs(Cog):
             return
 
         alert = False
+        # clean_re only keeps ASCII characters, so lowering them keeps the offsets of the cleaned text
         cleancont = self.clean_re.sub("", message.content).lower()
         msg = (
             f"🚨 Suspicious message by {message.author.mention} "
@@ -169,24 +277,22 @@ class Logs(Cog):
             msg += f"\n- Has invite: https://{invite[0]}"
             alert = True
 
-        for susp_word in self.bot.config.suspect_words:
-            if susp_word in cleancont and not any(
-                ok_word in cleancont
-                for ok_word in self.bot.config.suspect_ignored_words
-            ):
-                msg += f"\n- Contains suspicious word: `{susp_word}`"
-                alert = True
+        word_matches = self.spy_word_matcher.find(cleancont)
+        found_words = {word for _, _, word in word_matches}
+        if found_words.isdisjoint(self.ignored_words):
+            for susp_word in self.bot.config.suspect_words:
+                if susp_word in found_words:
+                    msg += f"\n- Contains suspicious word: `{susp_word}`"
+                    alert = True
 
         if alert:
             msg += f"\n\nJump: <{message.jump_url}>"
-            spy_channel = self.bot.get_channel(self.bot.config.spylog_channel)
-
-            # Bad Code :tm:, blame retr0id
-            message_clean = message.content.replace("*", "").replace("_", "")
-            regd = self.susp_hellgex.sub(
-                lambda w: "**{}**".format(w.group(0)), message_clean
+            spy_channel = self.bot.log_sink.get_destination(
+                self.bot.config.spylog_channel
             )
 
+            regd = self.highlight_spy_words(message.content, word_matches)
+
             # Show a message embed
             embed = discord.Embed(description=regd)
             embed.set_author(
@@ -196,6 +302,62 @@ class Logs(Cog):
 
             await spy_channel.send(msg, embed=embed)
 
+    async def do_duplicate_check(self, message):
+        if (
+            message.guild is None
+            or message.guild.id not in self.bot.config.guild_whitelist
+            or check_if_staff(message)
+        ):
+            return
+
+        cluster = self.duplicate_detector.record_message(message)
+        if cluster is None:
+            return
+        settings = self.duplicate_detector.settings
+        if cluster.alerted:
+            # Copies posted after the alert are only deleted
+            if settings["delete"]:
+                await self.delete_duplicates([(message.channel.id, message.id)])
+            return
+        if len(cluster.channels) < settings["channels"]:
+            return
+        cluster.alerted = True
+
+        msg = (
+            f"🔁 Duplicate message by {message.author.mention} "
+            f"({message.author.id}): posted in {len(cluster.channels)} channels "
+            f"by {len(cluster.authors)} users in the last {settings['window']} seconds."
+            "\n- Channels: "
+            + ", ".join(f"<#{channel_id}>" for channel_id in cluster.channels)
+        )
+        if len(cluster.authors) > 1:
+            msg += "\n- Users: " + ", ".join(
+                f"<@{author_id}>" for author_id in cluster.authors
+            )
+        if settings["delete"]:
+            await self.delete_duplicates(cluster.messages)
+            msg += f"\n- The {len(cluster.messages)} copies were deleted."
+        else:
+            msg += f"\n\nJump: <{message.jump_url}>"
+
+        spy_channel = self.bot.log_sink.get_destination(self.bot.config.spylog_channel)
+        embed = discord.Embed(description=message.content)
+        embed.set_author(
+            name=message.author.display_name,
+            icon_url=str(message.author.display_avatar),
+        )
+        await spy_channel.send(msg, embed=embed)
+
+    async def delete_duplicates(self, messages: list[tuple[int, int]]):
+        for channel_id, message_id in messages:
+            channel = self.bot.get_channel(channel_id)
+            if channel is None:
+                continue
+            try:
+                await channel.get_partial_message(message_id).delete()
+            except (discord.NotFound, discord.Forbidden):
+                pass
+
     async def do_nickcheck(self, message):
         compliant = self.name_re.fullmatch(message.author.display_name)
         if compliant:
@@ -205,17 +367,9 @@ class Logs(Cog):
             f"R11 violating name by {message.author.mention} " f"({message.author.id})."
         )
 
-        spy_channel = self.bot.get_channel(self.bot.config.spylog_channel)
+        spy_channel = self.bot.log_sink.get_destination(self.bot.config.spylog_channel)
         await spy_channel.send(msg)
 
-    @Cog.listener()
-    async def on_message(self, message):
-        await self.bot.wait_until_ready()
-        if message.channel.id not in self.bot.config.spy_channels:
-            return
-
-        await self.do_spy(message)
-
     @Cog.listener()
     async def on_message_edit(self, before, after):
         await self.bot.wait_until_ready()
@@ -233,7 +387,7 @@ class Logs(Cog):
         before_content = before.clean_content.replace("`", "`\u200d")
         after_content = after.clean_content.replace("`", "`\u200d")
 
-        log_channel = self.bot.get_channel(self.bot.config.log_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.log_channel)
 
         msg = (
             "📝 **Message edit**: \n"
@@ -255,7 +409,7 @@ class Logs(Cog):
         if message.channel.id not in self.bot.config.spy_channels or message.author.bot:
             return
 
-        log_channel = self.bot.get_channel(self.bot.config.log_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.log_channel)
         msg = (
             "🗑️ **Message delete**: \n"
             f"from {self.bot.escape_message(message.author.name)} "
@@ -277,7 +431,7 @@ class Logs(Cog):
         if member.guild.id not in self.bot.config.guild_whitelist:
             return
 
-        log_channel = self.bot.get_channel(self.bot.config.log_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.log_channel)
         msg = (
             f"⬅️ **Leave**: {member.mention} | "
             f"{self.bot.escape_message(member)}\n"
@@ -292,7 +446,7 @@ class Logs(Cog):
         if guild.id not in self.bot.config.guild_whitelist:
             return
 
-        log_channel = self.bot.get_channel(self.bot.config.modlog_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.modlog_channel)
         msg = (
             f"⛔ **Ban**: {member.mention} | "
             f"{self.bot.escape_message(member)}\n"
@@ -307,7 +461,7 @@ class Logs(Cog):
         if guild.id not in self.bot.config.guild_whitelist:
             return
 
-        log_channel = self.bot.get_channel(self.bot.config.modlog_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.modlog_channel)
         msg = (
             f"⚠️ **Unban**: {user.mention} | "
             f"{self.bot.escape_message(user)}\n"
@@ -332,7 +486,7 @@ class Logs(Cog):
             return
 
         msg = ""
-        log_channel = self.bot.get_channel(self.bot.config.log_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.log_channel)
         if member_before.roles != member_after.roles:
             # role removal
             role_removal = []
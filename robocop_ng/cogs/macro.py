@@ -12,6 +12,9 @@ from robocop_ng.helpers.macros import (
     add_aliases,
     remove_aliases,
     clear_aliases,
+    get_macro_triggers,
+    add_macro_trigger,
+    remove_macro_trigger,
 )
 
 
@@ -174,6 +177,57 @@ class Macro(Cog):
         else:
             await ctx.send(f"Couldn't find any aliases for macro '{existing_key}'.")
 
+    @commands.check(check_if_staff)
+    @commands.command(name="triggeradd", aliases=["addtrigger", "add_trigger"])
+    async def add_trigger_macro(self, ctx: Context, existing_key: str, *, trigger: str):
+        """Suggests a macro in log analysis when an error contains the trigger text or matches a crash signature."""
+        if add_macro_trigger(self.bot, existing_key, trigger):
+            await ctx.send(
+                f"Macro '{existing_key}' will now be suggested for `{trigger}`!"
+            )
+        else:
+            await ctx.send(
+                f"Error: Macro '{existing_key}' doesn't exist or already has this trigger."
+            )
+
+    @commands.check(check_if_staff)
+    @commands.command(
+        name="triggerremove",
+        aliases=["removetrigger", "remove_trigger", "deltrigger", "triggerdel"],
+    )
+    async def remove_trigger_macro(
+        self, ctx: Context, existing_key: str, *, trigger: str
+    ):
+        """Stops suggesting a macro for the given trigger."""
+        if remove_macro_trigger(self.bot, existing_key, trigger):
+            await ctx.send(f"Removed trigger `{trigger}` from macro '{existing_key}'!")
+        else:
+            await ctx.send(
+                f"Error: Trigger `{trigger}` not found for macro '{existing_key}'."
+            )
+
+    @commands.check(check_if_staff_or_dm)
+    @commands.cooldown(3, 30, BucketType.channel)
+    @commands.command(name="triggers", aliases=["listtriggers", "list_triggers"])
+    async def list_triggers(self, ctx: Context):
+        macro_triggers = get_macro_triggers(self.bot)
+        if len(macro_triggers) > 0:
+            messages = []
+            message = "📝 **Macro triggers**:\n"
+            for trigger in sorted(macro_triggers.keys()):
+                entry = f"- `{trigger}`: {', '.join(macro_triggers[trigger])}\n"
+                if len(message) >= 1500:
+                    messages.append(message)
+                    message = entry
+                else:
+                    message += entry
+            messages.append(message)
+
+            for msg in messages:
+                await ctx.send(msg)
+        else:
+            await ctx.send("Couldn't find any macro triggers.")
+
 
 async def setup(bot):
     await bot.add_cog(Macro(bot))
@@ -7,6 +7,7 @@ from discord.ext.commands import Cog, Context
 
 from robocop_ng.helpers.checks import check_if_staff, check_if_bot_manager
 from robocop_ng.helpers.restrictions import add_restriction, remove_restriction
+from robocop_ng.helpers.transcripts import create_transcript
 from robocop_ng.helpers.userlogs import userlog
 
 
@@ -26,7 +27,7 @@ class Mod(Cog):
         await ctx.guild.edit(icon=img_bytes, reason=str(ctx.author))
         await ctx.send(f"Done!")
 
-        log_channel = self.bot.get_channel(self.bot.config.modlog_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.modlog_channel)
         log_msg = (
             f"✏️ **Guild Icon Update**: {ctx.author} changed the guild icon."
             f"\n🔗 __Jump__: <{ctx.message.jump_url}>"
@@ -63,11 +64,22 @@ class Mod(Cog):
                 "I can't mute this user as they're a member of staff."
             )
 
-        userlog(self.bot, target.id, ctx.author, reason, "mutes", target.name)
-
         safe_name = await commands.clean_content(escape_markdown=True).convert(
             ctx, str(target)
         )
+        await self.do_mute(target, ctx.author, reason, safe_name, ctx.message.jump_url)
+        await ctx.send(f"{target.mention} can no longer speak.")
+
+    async def do_mute(
+        self,
+        target: discord.Member,
+        issuer: discord.abc.User,
+        reason: str,
+        safe_name: str,
+        jump_url: str,
+    ):
+        """Mutes a member and logs it."""
+        userlog(self.bot, target.id, issuer, reason, "mutes", target.name)
 
         dm_message = f"You were muted!"
         if reason:
@@ -80,12 +92,12 @@ class Mod(Cog):
             # or has DMs disabled
             pass
 
-        mute_role = ctx.guild.get_role(self.bot.config.mute_role)
+        mute_role = target.guild.get_role(self.bot.config.mute_role)
 
-        await target.add_roles(mute_role, reason=str(ctx.author))
+        await target.add_roles(mute_role, reason=str(issuer))
 
         chan_message = (
-            f"🔇 **Muted**: {str(ctx.author)} muted "
+            f"🔇 **Muted**: {str(issuer)} muted "
             f"{target.mention} | {safe_name}\n"
             f"🏷 __User ID__: {target.id}\n"
         )
@@ -98,11 +110,10 @@ class Mod(Cog):
                 " as the reason is automatically sent to the user."
             )
 
-        chan_message += f"\n🔗 __Jump__: <{ctx.message.jump_url}>"
+        chan_message += f"\n🔗 __Jump__: <{jump_url}>"
 
-        log_channel = self.bot.get_channel(self.bot.config.modlog_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.modlog_channel)
         await log_channel.send(chan_message)
-        await ctx.send(f"{target.mention} can no longer speak.")
         add_restriction(self.bot, target.id, self.bot.config.mute_role)
 
     @commands.guild_only()
@@ -125,7 +136,7 @@ class Mod(Cog):
 
         chan_message += f"\n🔗 __Jump__: <{ctx.message.jump_url}>"
 
-        log_channel = self.bot.get_channel(self.bot.config.modlog_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.modlog_channel)
         await log_channel.send(chan_message)
         await ctx.send(f"{target.mention} can now speak again.")
         remove_restriction(self.bot, target.id, self.bot.config.mute_role)
@@ -198,7 +209,7 @@ class Mod(Cog):
 
         chan_message += f"\n🔗 __Jump__: <{ctx.message.jump_url}>"
 
-        log_channel = self.bot.get_channel(self.bot.config.modlog_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.modlog_channel)
         await log_channel.send(chan_message)
         await ctx.send(f"👢 {safe_name}, 👍.")
 
@@ -270,7 +281,7 @@ class Mod(Cog):
 
         chan_message += f"\n🔗 __Jump__: <{ctx.message.jump_url}>"
 
-        log_channel = self.bot.get_channel(self.bot.config.modlog_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.modlog_channel)
         await log_channel.send(chan_message)
         await ctx.send(f"{safe_name} is now b&. 👍")
 
@@ -350,7 +361,7 @@ class Mod(Cog):
 
         chan_message += f"\n🔗 __Jump__: <{ctx.message.jump_url}>"
 
-        log_channel = self.bot.get_channel(self.bot.config.modlog_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.modlog_channel)
         await log_channel.send(chan_message)
         await ctx.send(
             f"{safe_name} is now b&, with {day_count} days of messages deleted. 👍"
@@ -399,7 +410,7 @@ class Mod(Cog):
 
         chan_message += f"\n🔗 __Jump__: <{ctx.message.jump_url}>"
 
-        log_channel = self.bot.get_channel(self.bot.config.modlog_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.modlog_channel)
         await log_channel.send(chan_message)
         await ctx.send(f"{safe_name} is now b&. 👍")
 
@@ -448,7 +459,9 @@ class Mod(Cog):
 
             chan_message += f"\n🔗 __Jump__: <{ctx.message.jump_url}>"
 
-            log_channel = self.bot.get_channel(self.bot.config.modlog_channel)
+            log_channel = self.bot.log_sink.get_destination(
+                self.bot.config.modlog_channel
+            )
             await log_channel.send(chan_message)
         await ctx.send(f"All {len(targets_int)} users are now b&. 👍")
 
@@ -481,7 +494,7 @@ class Mod(Cog):
 
         chan_message += f"\n🔗 __Jump__: <{ctx.message.jump_url}>"
 
-        log_channel = self.bot.get_channel(self.bot.config.modlog_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.modlog_channel)
         await log_channel.send(chan_message)
         await ctx.send(f"{safe_name} is now unb&.")
 
@@ -526,7 +539,7 @@ class Mod(Cog):
 
         chan_message += f"\n🔗 __Jump__: <{ctx.message.jump_url}>"
 
-        log_channel = self.bot.get_channel(self.bot.config.modlog_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.modlog_channel)
         await log_channel.send(chan_message)
 
     @commands.guild_only()
@@ -552,7 +565,7 @@ class Mod(Cog):
                     await ctx.channel.fetch_message(ctx.message.reference.message_id)
                 ).author
 
-        log_channel = self.bot.get_channel(self.bot.config.modlog_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.modlog_channel)
         target_role = ctx.guild.get_role(self.bot.config.named_roles[role])
 
         if target_role in target.roles:
@@ -591,7 +604,7 @@ class Mod(Cog):
                     await ctx.channel.fetch_message(ctx.message.reference.message_id)
                 ).author
 
-        log_channel = self.bot.get_channel(self.bot.config.modlog_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.modlog_channel)
         target_role = ctx.guild.get_role(self.bot.config.named_roles[role])
 
         if target_role not in target.roles:
@@ -612,29 +625,36 @@ class Mod(Cog):
     @commands.command(aliases=["clear"])
     async def purge(self, ctx, limit: int, channel: discord.TextChannel = None):
         """Clears a given number of messages, staff only."""
-        modlog_channel = self.bot.get_channel(self.bot.config.modlog_channel)
-        log_channel = self.bot.get_channel(self.bot.config.log_channel)
+        modlog_channel = self.bot.log_sink.get_destination(
+            self.bot.config.modlog_channel
+        )
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.log_channel)
         if not channel:
             channel = ctx.channel
 
-        purged_log_jump_url = ""
-        for deleted_message in await channel.purge(limit=limit):
-            msg = (
-                "🗑️ **Message purged**: \n"
-                f"from {self.bot.escape_message(deleted_message.author.name)} "
-                f"({deleted_message.author.id}), in {deleted_message.channel.mention}:\n"
-                f"`{deleted_message.clean_content}`"
-            )
-            if len(purged_log_jump_url) == 0:
-                purged_log_jump_url = (await log_channel.send(msg)).jump_url
-            else:
-                await log_channel.send(msg)
+        deleted_messages = await channel.purge(limit=limit)
+        # Purged messages are returned newest first
+        # Transcripts are cut at the upload limit of the guild, so the upload doesn't fail
+        transcript = create_transcript(
+            channel, reversed(deleted_messages), ctx.guild.filesize_limit
+        )
+        log_entry = await log_channel.send(
+            f"🗑️ **Messages purged**: {len(deleted_messages)} messages "
+            f"in {channel.mention}, purged by {str(ctx.author)}",
+            file=discord.File(
+                transcript,
+                filename=f"purge_{channel.id}_{ctx.message.id}.txt",
+            ),
+        )
 
         msg = (
-            f"🗑 **Purged**: {str(ctx.author)} purged {limit} "
+            f"🗑 **Purged**: {str(ctx.author)} purged {len(deleted_messages)} "
             f"messages in {channel.mention}."
-            f"\n🔗 __Jump__: <{purged_log_jump_url}>"
         )
+        if log_entry is not None:
+            msg += f"\n🔗 __Transcript__: <{log_entry.jump_url}>"
+        else:
+            msg += "\n⚠️ The transcript couldn't be uploaded to the log channel."
         await modlog_channel.send(msg)
 
     @commands.guild_only()
@@ -665,21 +685,35 @@ class Mod(Cog):
                 "I can't warn this user as they're a member of staff."
             )
 
-        log_channel = self.bot.get_channel(self.bot.config.modlog_channel)
-        warn_count = userlog(
-            self.bot, target.id, ctx.author, reason, "warns", target.name
-        )
-
         safe_name = await commands.clean_content(escape_markdown=True).convert(
             ctx, str(target)
         )
+        warn_count = await self.do_warn(
+            target, ctx.author, reason, safe_name, ctx.message.jump_url
+        )
+        await ctx.send(
+            f"{target.mention} warned. " f"User has {warn_count} warning(s)."
+        )
+
+    async def do_warn(
+        self,
+        target: discord.Member,
+        issuer: discord.abc.User,
+        reason: str,
+        safe_name: str,
+        jump_url: str,
+    ) -> int:
+        """Warns a member and logs it, returns their number of warns."""
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.modlog_channel)
+        warn_count = userlog(self.bot, target.id, issuer, reason, "warns", target.name)
+
         chan_msg = (
-            f"⚠️ **Warned**: {str(ctx.author)} warned "
+            f"⚠️ **Warned**: {str(issuer)} warned "
             f"{target.mention} (warn #{warn_count}) "
             f"| {safe_name}\n"
         )
 
-        msg = f"You were warned on {ctx.guild.name}."
+        msg = f"You were warned on {target.guild.name}."
         if reason:
             msg += " The given reason is: " + reason
         msg += (
@@ -709,9 +743,6 @@ class Mod(Cog):
             await target.kick()
         if warn_count >= 4:  # just in case
             await target.ban(reason="exceeded warn limit", delete_message_days=0)
-        await ctx.send(
-            f"{target.mention} warned. " f"User has {warn_count} warning(s)."
-        )
 
         if reason:
             chan_msg += f'✏️ __Reason__: "{reason}"'
@@ -722,9 +753,10 @@ class Mod(Cog):
                 " as the reason is automatically sent to the user."
             )
 
-        chan_msg += f"\n🔗 __Jump__: <{ctx.message.jump_url}>"
+        chan_msg += f"\n🔗 __Jump__: <{jump_url}>"
 
         await log_channel.send(chan_msg)
+        return warn_count
 
     @commands.guild_only()
     @commands.bot_has_permissions(ban_members=True)
@@ -787,7 +819,7 @@ class Mod(Cog):
 
         chan_msg += f"\n🔗 __Jump__: <{ctx.message.jump_url}>"
 
-        log_channel = self.bot.get_channel(self.bot.config.modlog_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.modlog_channel)
         await log_channel.send(chan_msg)
         await ctx.send(f"{safe_name} warned. " f"User has {warn_count} warning(s).")
 
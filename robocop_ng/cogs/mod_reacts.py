@@ -23,7 +23,7 @@ class ModReact(Cog):
         limit: int = 50,
     ):
         """Clears reacts from a given user in the given channel, staff only."""
-        log_channel = self.bot.get_channel(self.bot.config.modlog_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.modlog_channel)
         if not channel:
             channel = ctx.channel
         count = 0
@@ -48,7 +48,7 @@ class ModReact(Cog):
         self, ctx, *, limit: int = 50, channel: discord.TextChannel = None
     ):
         """Clears all reacts in a given channel, staff only. Use with care."""
-        log_channel = self.bot.get_channel(self.bot.config.modlog_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.modlog_channel)
         if not channel:
             channel = ctx.channel
         count = 0
@@ -93,7 +93,7 @@ class ModTimed(Cog):
 
         add_job(self.bot, "unban", target.id, {"guild": ctx.guild.id}, expiry_timestamp)
 
-        log_channel = self.bot.get_channel(self.bot.config.log_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.log_channel)
         await log_channel.send(chan_message)
         await ctx.send(f"{safe_name} is now b&. " f"It will expire {duration_text}. 👍")
 
@@ -123,6 +123,25 @@ class ModTimed(Cog):
                 "I can't mute this user as they're a member of staff."
             )
 
+        safe_name = await commands.clean_content(escape_markdown=True).convert(
+            ctx, str(target)
+        )
+        duration_text = await self.do_timemute(
+            target, ctx.author, duration, reason, safe_name
+        )
+        await ctx.send(
+            f"{target.mention} can no longer speak. " f"It will expire {duration_text}."
+        )
+
+    async def do_timemute(
+        self,
+        target: discord.Member,
+        issuer: discord.abc.User,
+        duration: str,
+        reason: str,
+        safe_name: str,
+    ) -> str:
+        """Mutes a member for some time and logs it, returns when the mute expires."""
         expiry_timestamp = self.bot.parse_time(duration)
         expiry_datetime = datetime.utcfromtimestamp(expiry_timestamp)
         duration_text = self.bot.get_relative_timestamp(
@@ -132,16 +151,12 @@ class ModTimed(Cog):
         userlog(
             self.bot,
             target.id,
-            ctx.author,
+            issuer,
             f"{reason} (Timed, until " f"{duration_text})",
             "mutes",
             target.name,
         )
 
-        safe_name = await commands.clean_content(escape_markdown=True).convert(
-            ctx, str(target)
-        )
-
         dm_message = f"You were muted!"
         if reason:
             dm_message += f' The given reason is: "{reason}".'
@@ -154,12 +169,12 @@ class ModTimed(Cog):
             # or has DMs disabled
             pass
 
-        mute_role = ctx.guild.get_role(self.bot.config.mute_role)
+        mute_role = target.guild.get_role(self.bot.config.mute_role)
 
-        await target.add_roles(mute_role, reason=str(ctx.author))
+        await target.add_roles(mute_role, reason=str(issuer))
 
         chan_message = (
-            f"🔇 **Timed Mute**: {ctx.author.mention} muted "
+            f"🔇 **Timed Mute**: {issuer.mention} muted "
             f"{target.mention} for {duration_text} | {safe_name}\n"
             f"🏷 __User ID__: {target.id}\n"
         )
@@ -173,15 +188,13 @@ class ModTimed(Cog):
             )
 
         add_job(
-            self.bot, "unmute", target.id, {"guild": ctx.guild.id}, expiry_timestamp
+            self.bot, "unmute", target.id, {"guild": target.guild.id}, expiry_timestamp
         )
 
-        log_channel = self.bot.get_channel(self.bot.config.log_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.log_channel)
         await log_channel.send(chan_message)
-        await ctx.send(
-            f"{target.mention} can no longer speak. " f"It will expire {duration_text}."
-        )
         add_restriction(self.bot, target.id, self.bot.config.mute_role)
+        return duration_text
 
 
 async def setup(bot):
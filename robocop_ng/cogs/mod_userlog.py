@@ -136,7 +136,7 @@ class ModUserlog(Cog):
     @commands.command(aliases=["clearwarns"])
     async def clearevent(self, ctx, target: discord.Member, event="warns"):
         """Clears all events of given type for a user, staff only."""
-        log_channel = self.bot.get_channel(self.bot.config.modlog_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.modlog_channel)
         msg = self.clear_event_from_id(str(target.id), event)
         safe_name = await commands.clean_content(escape_markdown=True).convert(
             ctx, str(target)
@@ -155,7 +155,7 @@ class ModUserlog(Cog):
     @commands.command(aliases=["clearwarnsid"])
     async def cleareventid(self, ctx, target: int, event="warns"):
         """Clears all events of given type for a userid, staff only."""
-        log_channel = self.bot.get_channel(self.bot.config.modlog_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.modlog_channel)
         msg = self.clear_event_from_id(str(target), event)
         await ctx.send(msg)
         msg = (
@@ -170,7 +170,7 @@ class ModUserlog(Cog):
     @commands.command(aliases=["delwarn"])
     async def delevent(self, ctx, target: discord.Member, idx: int, event="warns"):
         """Removes a specific event from a user, staff only."""
-        log_channel = self.bot.get_channel(self.bot.config.modlog_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.modlog_channel)
         del_event = self.delete_event_from_id(str(target.id), idx, event)
         event_name = userlog_event_types[event].lower()
         # This is hell.
@@ -194,7 +194,7 @@ class ModUserlog(Cog):
     @commands.command(aliases=["delwarnid"])
     async def deleventid(self, ctx, target: int, idx: int, event="warns"):
         """Removes a specific event from a userid, staff only."""
-        log_channel = self.bot.get_channel(self.bot.config.modlog_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.modlog_channel)
         del_event = self.delete_event_from_id(str(target), idx, event)
         event_name = userlog_event_types[event].lower()
         # This is hell.
@@ -7,6 +7,10 @@ from robocop_ng.helpers.roles import add_user_roles, get_user_roles
 class RolePersistence(Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.bot.join_pipeline.register_roles("RolePersistence", self.get_old_roles)
+
+    def cog_unload(self):
+        self.bot.join_pipeline.unregister("RolePersistence")
 
     @Cog.listener()
     async def on_raw_member_remove(self, payload: RawMemberRemoveEvent):
@@ -24,18 +28,8 @@ class RolePersistence(Cog):
         if len(save_roles) > 0:
             add_user_roles(self.bot, payload.user.id, save_roles)
 
-    @Cog.listener()
-    async def on_member_join(self, member: Member):
-        user_roles = get_user_roles(self.bot, member.id)
-        if len(user_roles) > 0:
-            user_roles = [
-                member.guild.get_role(int(role))
-                for role in user_roles
-                if member.guild.get_role(int(role)) is not None
-            ]
-            await member.add_roles(
-                *user_roles, reason="Restoring old roles from `role_persistence`."
-            )
+    def get_old_roles(self, member: Member) -> list[str]:
+        return get_user_roles(self.bot, member.id)
 
 
 async def setup(bot):
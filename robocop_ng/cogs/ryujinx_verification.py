@@ -13,21 +13,17 @@ class RyujinxVerification(Cog):
         self.bot.do_reset = self.do_reset
         self.bot.do_resetalgo = self.do_resetalgo
 
-    @Cog.listener()
-    async def on_member_join(self, member):
-        await self.bot.wait_until_ready()
-
-        if member.guild.id not in self.bot.config.guild_whitelist:
-            return
-
-        join_channel = self.bot.get_channel(self.bot.config.welcome_channel)
-
-        if join_channel is not None:
-            await join_channel.send(
-                "Hello {0.mention}! Welcome to Ryujinx! Please read the <#411271165429022730>, and then type the verifying command here to gain access to the rest of the channels.\n\nIf you need help with basic common questions, visit the <#585288848704143371> channel after joining.\n\nIf you need help with Animal Crossing visit the <#692104087889641472> channel for common issues and solutions. If you need help that is not Animal Crossing related, please visit the <#410208610455519243> channel after verifying.".format(
-                    member
-                )
-            )
+        self.bot.message_dispatcher.register(
+            "RyujinxVerification",
+            self.handle_message,
+            channels=[self.bot.config.welcome_channel],
+        )
+        # Members are welcomed after their join is logged
+        self.bot.join_pipeline.register_step("RyujinxVerification", self.do_join, 1)
+
+    def cog_unload(self):
+        self.bot.message_dispatcher.unregister("RyujinxVerification")
+        self.bot.join_pipeline.unregister("RyujinxVerification")
 
     async def process_message(self, message):
         """Process the verification process"""
@@ -42,11 +38,7 @@ class RyujinxVerification(Cog):
                 await message.author.add_roles(success_role)
                 await message.delete()
 
-    @Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot:
-            return
-
+    async def handle_message(self, message):
         try:
             await self.process_message(message)
         except discord.errors.Forbidden:
@@ -64,10 +56,7 @@ class RyujinxVerification(Cog):
             chan = self.bot.get_channel(after.channel)
             await chan.send("💢 I don't have permission to do this.")
 
-    @Cog.listener()
-    async def on_member_join(self, member):
-        await self.bot.wait_until_ready()
-
+    async def do_join(self, member):
         if member.guild.id not in self.bot.config.guild_whitelist:
             return
 
@@ -20,6 +20,15 @@ class Verification(Cog):
         self.bot.do_reset = self.do_reset
         self.bot.do_resetalgo = self.do_resetalgo
 
+        self.bot.message_dispatcher.register(
+            "Verification",
+            self.handle_message,
+            channels=[self.bot.config.welcome_channel],
+        )
+
+    def cog_unload(self):
+        self.bot.message_dispatcher.unregister("Verification")
+
     async def do_reset(self, channel, author, limit: int = 100):
         await channel.purge(limit=limit)
 
@@ -41,7 +50,7 @@ class Verification(Cog):
             f"🗑 **Reset**: {author} cleared {limit} messages " f" in {channel.mention}"
         )
         msg += f"\n💬 __Current challenge location__: under rule {rule_choice}"
-        log_channel = self.bot.get_channel(self.bot.config.log_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.log_channel)
         await log_channel.send(msg)
 
         # find rule that puts us over 2,000 characters, if any
@@ -75,7 +84,7 @@ class Verification(Cog):
             f"📘 **Reset Algorithm**: {author} reset " f"algorithm in {channel.mention}"
         )
         msg += f"\n💬 __Current algorithm__: {self.hash_choice.upper()}"
-        log_channel = self.bot.get_channel(self.bot.config.log_channel)
+        log_channel = self.bot.log_sink.get_destination(self.bot.config.log_channel)
         await log_channel.send(msg)
 
         await self.do_reset(channel, author)
@@ -176,7 +185,9 @@ class Verification(Cog):
             for algo in wrong_hash_algos:
                 for name in itertools.chain(allowed_names, close_names):
                     if hashlib.new(algo, name.encode("utf-8")).hexdigest() in mcl:
-                        log_channel = self.bot.get_channel(self.bot.config.log_channel)
+                        log_channel = self.bot.log_sink.get_destination(
+                            self.bot.config.log_channel
+                        )
                         await log_channel.send(
                             f"User {message.author.mention} tried verification with algo {algo} instead of {self.hash_choice}."
                         )
@@ -200,11 +211,7 @@ class Verification(Cog):
                     no_text = '"The definition of insanity is doing the same thing over and over again, but expecting different results."\n-Albert Einstein'
                 await chan.send(f"{message.author.mention} {no_text}")
 
-    @Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot:
-            return
-
+    async def handle_message(self, message):
         try:
             await self.process_message(message)
         except discord.errors.Forbidden:
@@ -11,6 +11,12 @@ class YubicoOTP(Cog):
     def __init__(self, bot):
         self.bot = bot
         self.otp_re = re.compile("((cc|vv)[cbdefghijklnrtuv]{42})$")
+        self.bot.message_dispatcher.register(
+            "YubicoOTP",
+            self.handle_message,
+            ignore_bots=False,
+            content_pattern=re.compile("(cc|vv)[cbdefghijklnrtuv]{42}"),
+        )
         self.api_servers = [
             "https://api.yubico.com",
             "https://api2.yubico.com",
@@ -120,9 +126,10 @@ class YubicoOTP(Cog):
         # Return None if we fail to get responses from any server
         return None
 
-    @Cog.listener()
-    async def on_message(self, message):
-        await self.bot.wait_until_ready()
+    def cog_unload(self):
+        self.bot.message_dispatcher.unregister("YubicoOTP")
+
+    async def handle_message(self, message):
         otps = self.otp_re.findall(message.content.strip())
         if otps:
             otp = otps[0][0]
@@ -50,6 +50,8 @@ initial_cogs = [
 # PR'd in at: https://github.com/reswitched/robocop-ng/pull/65
 # cogs.pin - Lets users pin important messages
 # and sends pins above limit to a github gist
+# cogs.antispam - Mutes users who flood channels, spam mentions or repeat messages
+# cogs.attachment_filter - Deletes files blocked by staff and warns their posters
 
 
 # The string that users need to say to get past verification
@@ -61,6 +63,55 @@ verification_string = "go read the rules, not the code"
 # then user will be kicked and informed
 min_age = datetime.timedelta(minutes=15)
 
+# Raid detection counts the joins of the last "window" seconds. When the joins
+# in total, of accounts in the same age bucket (< 1 hour, < 1 day, < 1 week,
+# < 1 month), with the same invite or with similar names reach their threshold,
+# raid mode is enabled for "raid_mode_duration" seconds.
+# During raid mode joins are logged in short form, and "action" can be set to
+# "kick" or "quarantine" (which gives joins the "quarantine_role") to handle them.
+raid_detection = {
+    "window": 60,
+    "joins": 20,
+    "age_bucket_joins": 10,
+    "invite_joins": 15,
+    "name_joins": 5,
+    "raid_mode_duration": 600,
+    "action": None,
+    "quarantine_role": 0,
+}
+
+# Spam detection keeps the last "history" messages of each user, from the last
+# "window" seconds. When they reach "messages" messages, "mentions" mentions,
+# "attachments" attachments or "duplicates" identical messages, the user is muted
+# for "mute_duration" (or until unmuted if it's None) by cogs.antispam.
+# Only the "max_users" most recently active users are kept track of.
+spam_detection = {
+    "window": 10,
+    "history": 10,
+    "messages": 7,
+    "mentions": 10,
+    "attachments": 8,
+    "duplicates": 4,
+    "mute_duration": "10 minutes",
+    "max_users": 10000,
+}
+
+# Duplicate detection fingerprints messages of at least "min_length" letters and
+# digits, and finds the copies posted in the last "window" seconds, counting
+# messages with "similarity" (0 to 1) or more as copies. When copies were posted in
+# "channels" channels, they're reported in the spylog channel, and deleted if
+# "delete" is True.
+duplicate_detection = {
+    "window": 60,
+    "min_length": 30,
+    "similarity": 0.6,
+    "channels": 3,
+    "delete": False,
+}
+
+# Attachments larger than this many bytes aren't checked by cogs.attachment_filter
+attachment_filter_max_size = 1000 * 1000 * 50
+
 # The bot will only work in these guilds
 guild_whitelist = [269333940928512010]  # ReSwitched discord
 
@@ -341,3 +392,9 @@ yubico_otp_client_id = 1
 yubico_otp_secret = ""
 # Optional: If you provide a secret, requests will be signed
 # and responses will be verified.
+
+# == Only if you want to use cogs.logfilereader ==
+# Addresses of log analysis workers, logs are analysed in the bot process if empty.
+# Workers are started with: python -m robocop_ng.helpers.log_worker <address>
+# Addresses are either "unix:<path>" for Unix sockets or "<host>:<port>" for TCP.
+log_analysis_workers = []
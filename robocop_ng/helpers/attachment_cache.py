@@ -0,0 +1,124 @@
+import asyncio
+from collections import OrderedDict
+from typing import AsyncIterator, Optional
+
+from discord import Attachment
+
+# Keep at most this many bytes of attachment data in memory
+default_max_bytes = 1000 * 1000 * 32
+# Downloads larger than this are returned but not cached
+default_max_entry_bytes = 1000 * 1000 * 4
+# Attachments which aren't cached are streamed in chunks of this many bytes
+default_chunk_size = 1024 * 64
+
+
+class AttachmentTooLargeError(Exception):
+    pass
+
+
+class AttachmentCache:
+    """
+    Bounded LRU of downloaded attachment bytes keyed by attachment ID (and requested range).
+
+    Concurrent fetches of the same attachment share a single download,
+    which goes through the bot-wide aiohttp session.
+    """
+
+    def __init__(
+        self,
+        bot,
+        max_bytes: int = default_max_bytes,
+        max_entry_bytes: int = default_max_entry_bytes,
+    ):
+        self.bot = bot
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._size = 0
+        self._entries: OrderedDict[tuple[int, Optional[str]], bytes] = OrderedDict()
+        self._pending: dict[tuple[int, Optional[str]], asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get(self, attachment_id: int, byte_range: Optional[str] = None):
+        key = (attachment_id, byte_range)
+        data = self._entries.get(key)
+        if data is not None:
+            self._entries.move_to_end(key)
+        return data
+
+    def __store(self, key: tuple[int, Optional[str]], data: bytes):
+        if len(data) > self.max_entry_bytes:
+            return
+        if key in self._entries:
+            self._size -= len(self._entries.pop(key))
+        self._entries[key] = data
+        self._size += len(data)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def __on_done(self, key: tuple[int, Optional[str]], task: asyncio.Task):
+        self._pending.pop(key, None)
+        if not task.cancelled() and task.exception() is None:
+            self.__store(key, task.result())
+
+    async def __download(self, url: str, byte_range: Optional[str]) -> bytes:
+        headers = {"Range": byte_range} if byte_range is not None else None
+        async with self.bot.aiosession.get(url, headers=headers) as response:
+            response.raise_for_status()
+            return await response.read()
+
+    async def fetch(
+        self, attachment: Attachment, byte_range: Optional[str] = None
+    ) -> bytes:
+        key = (attachment.id, byte_range)
+        data = self.get(*key)
+        if data is not None:
+            return data
+
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.create_task(self.__download(attachment.url, byte_range))
+            task.add_done_callback(lambda t: self.__on_done(key, t))
+            self._pending[key] = task
+
+        # Shield the shared download, so a cancelled waiter doesn't cancel it for everyone else
+        return await asyncio.shield(task)
+
+    async def iter_chunks(
+        self,
+        attachment: Attachment,
+        max_bytes: int,
+        chunk_size: int = default_chunk_size,
+    ) -> AsyncIterator[bytes]:
+        """
+        Yields the bytes of an attachment in chunks. Attachments which are cached or already
+        being downloaded in full are read from there, others are streamed without being kept.
+
+        Raises AttachmentTooLargeError once more than max_bytes were read.
+        """
+        key = (attachment.id, None)
+        data = self.get(*key)
+        if data is None and key in self._pending:
+            data = await asyncio.shield(self._pending[key])
+        if data is not None:
+            if len(data) > max_bytes:
+                raise AttachmentTooLargeError(attachment.url)
+            view = memoryview(data)
+            for i in range(0, len(view), chunk_size):
+                yield view[i : i + chunk_size]
+            return
+
+        read_bytes = 0
+        async with self.bot.aiosession.get(attachment.url) as response:
+            response.raise_for_status()
+            async for chunk in response.content.iter_chunked(chunk_size):
+                read_bytes += len(chunk)
+                if read_bytes > max_bytes:
+                    raise AttachmentTooLargeError(attachment.url)
+                yield chunk
@@ -0,0 +1,37 @@
+import hashlib
+import json
+import os
+import re
+
+from discord import Attachment
+
+from robocop_ng.helpers.data_loader import read_json
+
+sha256_regex = re.compile(r"[0-9a-f]{64}")
+
+
+def get_blocked_hashes_path(bot) -> str:
+    return os.path.join(bot.state_dir, "data/blocked_hashes.json")
+
+
+def get_blocked_hashes(bot) -> dict[str, dict[str, str]]:
+    return read_json(bot, get_blocked_hashes_path(bot))
+
+
+def set_blocked_hashes(bot, contents: dict[str, dict[str, str]]):
+    with open(get_blocked_hashes_path(bot), "w") as f:
+        json.dump(contents, f)
+
+
+def is_sha256(digest: str) -> bool:
+    return sha256_regex.fullmatch(digest) is not None
+
+
+async def hash_attachment(bot, attachment: Attachment, max_bytes: int) -> str:
+    """
+    Returns the SHA-256 digest of an attachment, hashing it chunk by chunk as it's downloaded.
+    """
+    sha256 = hashlib.sha256()
+    async for chunk in bot.attachment_cache.iter_chunks(attachment, max_bytes):
+        sha256.update(chunk)
+    return sha256.hexdigest()
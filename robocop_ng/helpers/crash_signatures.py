@@ -0,0 +1,99 @@
+import os
+import time
+from typing import Optional, Union
+
+from robocop_ng.helpers.data_loader import DelayedJsonWriter, read_json
+
+max_sample_links = 5
+max_crash_signatures = 2000
+
+
+def get_crash_signatures_path(bot) -> str:
+    return os.path.join(bot.state_dir, "data/crash_signatures.json")
+
+
+class CrashSignatureIndex:
+    """
+    Counts crashes by their error signature.
+
+    The index is loaded once and kept in memory, so lookups and inserts are dict operations.
+    Inserts are written back to the state directory in the background, in batches.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._signatures: dict[str, dict[str, Union[str, int, list, dict]]] = read_json(
+            bot, get_crash_signatures_path(bot)
+        )
+        self._writer = DelayedJsonWriter(
+            get_crash_signatures_path(bot), lambda: self._signatures
+        )
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def get(self, signature: str) -> Optional[dict[str, Union[str, int, list, dict]]]:
+        return self._signatures.get(signature)
+
+    def save(self):
+        self._writer.save()
+
+    def add(
+        self,
+        signature: str,
+        exception_type: str,
+        frames: list[str],
+        app_id: str,
+        game_name: str,
+        ryujinx_version: str,
+        link: str,
+    ) -> dict[str, Union[str, int, list, dict]]:
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+        entry = self._signatures.pop(signature, None)
+        if entry is None:
+            if len(self._signatures) >= max_crash_signatures:
+                # Forget the cluster that was seen the longest time ago
+                del self._signatures[next(iter(self._signatures))]
+            entry = {
+                "exception": exception_type,
+                "frames": frames,
+                "count": 0,
+                "first_seen": timestamp,
+                "last_seen": timestamp,
+                "games": {},
+                "versions": {},
+                "samples": [],
+            }
+        entry["count"] += 1
+        entry["last_seen"] = timestamp
+        if app_id:
+            entry["games"][app_id] = game_name
+        entry["versions"][ryujinx_version] = (
+            entry["versions"].get(ryujinx_version, 0) + 1
+        )
+        entry["samples"] = (entry["samples"] + [link])[-max_sample_links:]
+
+        # Keep the entries ordered by when they were last seen
+        self._signatures[signature] = entry
+        self._writer.save_later()
+        return entry
+
+    def top(
+        self, search: Optional[str] = None, limit: int = 10
+    ) -> list[tuple[str, dict[str, Union[str, int, list, dict]]]]:
+        """
+        Returns the most common crash clusters, optionally only those matching a game or Ryujinx version.
+        """
+        entries = self._signatures.items()
+        if search is not None:
+            search = search.lower()
+            entries = [
+                (signature, entry)
+                for signature, entry in entries
+                if search in (version.lower() for version in entry["versions"].keys())
+                or any(
+                    search == app_id.lower() or search in game_name.lower()
+                    for app_id, game_name in entry["games"].items()
+                )
+            ]
+        return sorted(entries, key=lambda x: x[1]["count"], reverse=True)[:limit]
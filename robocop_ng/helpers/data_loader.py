@@ -1,5 +1,7 @@
+import asyncio
 import json
 import os
+from typing import Any, Callable, Optional
 
 from robocop_ng.helpers.notifications import report_critical_error
 
@@ -19,3 +21,45 @@ def read_json(bot, filepath: str) -> dict:
                     },
                 )
     return {}
+
+
+class DelayedJsonWriter:
+    """
+    Writes a JSON file in the background, save_delay seconds after the first unsaved change,
+    so a burst of changes is written once.
+
+    The contents are serialised on the event loop for a consistent snapshot, only the write is
+    threaded. get_contents can return None when there's nothing to write.
+    """
+
+    def __init__(
+        self,
+        filepath: str,
+        get_contents: Callable[[], Optional[Any]],
+        save_delay: float = 10.0,
+    ):
+        self.filepath = filepath
+        self.get_contents = get_contents
+        self.save_delay = save_delay
+        self._save_task: Optional[asyncio.Task] = None
+
+    def __serialise(self) -> Optional[str]:
+        contents = self.get_contents()
+        return json.dumps(contents) if contents is not None else None
+
+    def __write(self, contents: Optional[str]):
+        if contents is None:
+            return
+        with open(self.filepath, "w") as f:
+            f.write(contents)
+
+    def save_later(self):
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.create_task(self.__save())
+
+    async def __save(self):
+        await asyncio.sleep(self.save_delay)
+        await asyncio.to_thread(self.__write, self.__serialise())
+
+    def save(self):
+        self.__write(self.__serialise())
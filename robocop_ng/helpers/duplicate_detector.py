@@ -0,0 +1,183 @@
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+import discord
+
+default_duplicate_detection = {
+    "window": 60,
+    "min_length": 30,
+    "similarity": 0.6,
+    "channels": 3,
+    "delete": False,
+}
+
+# Fingerprints keep the smallest shingle hash of each of sketch_size bins, and are indexed
+# by bands of band_size bins, so only messages with a whole band in common are compared.
+# They're also indexed whole, so copies of short messages without a whole band still meet
+sketch_size = 30
+band_size = 3
+shingle_length = 5
+# Fingerprints are indexed in buckets of window / bucket_count seconds, which expire whole
+bucket_count = 6
+
+normalise_regex = re.compile(r"[\W_]+")
+
+
+def normalise_content(content: str) -> str:
+    """
+    Keeps only the letters and digits of a message, so spacing and punctuation
+    changes don't hide a copy.
+    """
+    return normalise_regex.sub("", content.casefold())
+
+
+def get_fingerprint(text: str) -> tuple[Optional[int], ...]:
+    """
+    Returns the one permutation MinHash sketch of the text: its shingles are hashed into bins,
+    and the smallest hash of each bin is kept. Bins without any shingle are None.
+    Texts have about as many bins in common as they have shingles in common.
+    """
+    fingerprint = [None] * sketch_size
+    for i in range(max(len(text) - shingle_length + 1, 1)):
+        value = hash(text[i : i + shingle_length])
+        bin_index = value % sketch_size
+        if fingerprint[bin_index] is None or value < fingerprint[bin_index]:
+            fingerprint[bin_index] = value
+    return tuple(fingerprint)
+
+
+def get_index_keys(
+    fingerprint: tuple[Optional[int], ...],
+) -> list[tuple[Optional[int], ...]]:
+    """
+    Returns the bands of the fingerprint without empty bins, prefixed by their first bin,
+    and the whole fingerprint, prefixed by sketch_size.
+    """
+    keys = []
+    for i in range(0, sketch_size, band_size):
+        band = fingerprint[i : i + band_size]
+        if None not in band:
+            keys.append((i, *band))
+    keys.append((sketch_size, *fingerprint))
+    return keys
+
+
+def get_similarity(
+    fingerprint: tuple[Optional[int], ...], other: tuple[Optional[int], ...]
+) -> float:
+    shared = 0
+    used = 0
+    for value, other_value in zip(fingerprint, other):
+        if value is not None or other_value is not None:
+            used += 1
+            if value == other_value:
+                shared += 1
+    return shared / used if used > 0 else 0.0
+
+
+@dataclass(slots=True, eq=False)
+class DuplicateCluster:
+    """Messages found to be copies of each other."""
+
+    channels: set[int] = field(default_factory=set)
+    authors: set[int] = field(default_factory=set)
+    messages: list[tuple[int, int]] = field(default_factory=list)
+    alerted: bool = False
+
+    def add(self, message: discord.Message):
+        self.channels.add(message.channel.id)
+        self.authors.add(message.author.id)
+        self.messages.append((message.channel.id, message.id))
+
+
+@dataclass(slots=True, eq=False)
+class FingerprintEntry:
+    fingerprint: tuple[Optional[int], ...]
+    cluster: DuplicateCluster
+
+
+@dataclass(slots=True)
+class FingerprintBucket:
+    start: float
+    entries: dict[tuple[Optional[int], ...], list[FingerprintEntry]] = field(
+        default_factory=dict
+    )
+
+
+class DuplicateDetector:
+    """
+    Keeps the fingerprints of the messages of the last window seconds, indexed by their hashes,
+    and groups messages which are near-duplicates of each other.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.settings = {
+            **default_duplicate_detection,
+            **getattr(bot.config, "duplicate_detection", {}),
+        }
+        self.bucket_width = self.settings["window"] / bucket_count
+        self._buckets: deque[FingerprintBucket] = deque()
+
+    def __get_bucket(self, now: float) -> FingerprintBucket:
+        while (
+            len(self._buckets) > 0
+            and self._buckets[0].start <= now - self.settings["window"]
+        ):
+            self._buckets.popleft()
+        if (
+            len(self._buckets) == 0
+            or now >= self._buckets[-1].start + self.bucket_width
+        ):
+            self._buckets.append(FingerprintBucket(now - now % self.bucket_width))
+        return self._buckets[-1]
+
+    def __find_cluster(
+        self,
+        fingerprint: tuple[Optional[int], ...],
+        index_keys: list[tuple[Optional[int], ...]],
+    ) -> Optional[DuplicateCluster]:
+        candidates = {
+            entry
+            for bucket in self._buckets
+            for key in index_keys
+            for entry in bucket.entries.get(key, ())
+        }
+
+        best_cluster = None
+        best_similarity = self.settings["similarity"]
+        for entry in candidates:
+            similarity = get_similarity(fingerprint, entry.fingerprint)
+            if similarity >= best_similarity:
+                best_cluster = entry.cluster
+                best_similarity = similarity
+        return best_cluster
+
+    def record_message(
+        self, message: discord.Message, now: Optional[float] = None
+    ) -> Optional[DuplicateCluster]:
+        """
+        Adds a message to the index and returns the cluster of copies it belongs to,
+        if it's a copy of a recent message.
+        """
+        text = normalise_content(message.content)
+        if len(text) < self.settings["min_length"]:
+            return None
+
+        now = now if now is not None else time.monotonic()
+        bucket = self.__get_bucket(now)
+        fingerprint = get_fingerprint(text)
+        index_keys = get_index_keys(fingerprint)
+        cluster = self.__find_cluster(fingerprint, index_keys)
+        is_copy = cluster is not None
+        if cluster is None:
+            cluster = DuplicateCluster()
+        cluster.add(message)
+
+        entry = FingerprintEntry(fingerprint, cluster)
+        for key in index_keys:
+            bucket.entries.setdefault(key, []).append(entry)
+        return cluster if is_copy else None
@@ -1,8 +1,17 @@
+import asyncio
 import json
 import os
-from typing import Union
+import time
+from typing import Optional, Union
 
-from robocop_ng.helpers.data_loader import read_json
+import discord
+
+from robocop_ng.helpers.data_loader import DelayedJsonWriter, read_json
+
+# Joins within this many seconds of each other share one invites() snapshot
+snapshot_delay = 1.0
+# Invites deleted longer ago than this were revoked, not used up by a join
+deleted_invite_window = 30.0
 
 
 def get_invites_path(bot):
@@ -13,17 +22,107 @@ def get_invites(bot) -> dict[str, dict[str, Union[str, int]]]:
     return read_json(bot, get_invites_path(bot))
 
 
-def add_invite(bot, invite_id: str, url: str, max_uses: int, code: str):
-    invites = get_invites(bot)
-    invites[invite_id] = {
-        "uses": 0,
-        "url": url,
-        "max_uses": max_uses,
-        code: code,
-    }
-    set_invites(bot, invites)
-
-
 def set_invites(bot, contents: dict[str, dict[str, Union[str, int]]]):
     with open(get_invites_path(bot), "w") as f:
         json.dump(contents, f)
+
+
+class InviteRegistry:
+    """
+    Keeps the known invites and their uses in memory, indexed by invite code.
+
+    Created and deleted invites are tracked through gateway events. Finding the invites used by
+    joining members still needs a snapshot of the guild's invites, which bursts of joins share.
+    Changes are written to invites.json in the background.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._invites: Optional[dict[str, dict[str, Union[str, int]]]] = None
+        self._deleted: dict[str, float] = {}
+        self._snapshot_task: Optional[asyncio.Task] = None
+        self._writer = DelayedJsonWriter(get_invites_path(bot), lambda: self._invites)
+        self.snapshots = 0
+
+    @property
+    def invites(self) -> dict[str, dict[str, Union[str, int]]]:
+        if self._invites is None:
+            self._invites = {
+                code: {
+                    "uses": invite.get("uses", 0),
+                    "url": invite.get("url"),
+                    "max_uses": invite.get("max_uses"),
+                    # Invites created by older versions stored their code under the code itself
+                    "code": invite.get("code", code),
+                }
+                for code, invite in get_invites(self.bot).items()
+            }
+        return self._invites
+
+    def save(self):
+        self._writer.save()
+
+    def add(self, invite: discord.Invite):
+        self.invites[invite.code] = {
+            "uses": invite.uses or 0,
+            "url": invite.url,
+            "max_uses": invite.max_uses,
+            "code": invite.code,
+        }
+        self._deleted.pop(invite.code, None)
+        self._writer.save_later()
+
+    def mark_deleted(self, code: str):
+        # The invite is kept until the next snapshot, since its last use might belong to a join
+        if code in self.invites:
+            self._deleted[code] = time.monotonic()
+
+    async def __take_snapshot(
+        self, guild: discord.Guild
+    ) -> list[dict[str, Union[str, int]]]:
+        await asyncio.sleep(snapshot_delay)
+        # Joins from now on need a newer snapshot
+        self._snapshot_task = None
+        real_invites = {x.code: x for x in await guild.invites()}
+        self.snapshots += 1
+        now = time.monotonic()
+
+        # Add unknown active invites. Can happen if invite was manually created
+        # or created while the bot was offline
+        for code, real_invite in real_invites.items():
+            if code not in self.invites:
+                self.invites[code] = {
+                    "uses": 0,
+                    "url": real_invite.url,
+                    "max_uses": real_invite.max_uses,
+                    "code": code,
+                }
+
+        probable_invites_used = []
+        # Look for invites whose usage increased since last lookup
+        for code, invite in list(self.invites.items()):
+            real_invite = real_invites.get(code)
+            if real_invite is None:
+                # Invite does not exist anymore. Was either revoked manually
+                # or the final use was used up
+                deleted_at = self._deleted.pop(code, None)
+                if deleted_at is None or now - deleted_at < deleted_invite_window:
+                    probable_invites_used.append(invite)
+                del self.invites[code]
+            elif invite["uses"] < real_invite.uses:
+                probable_invites_used.append(invite)
+                invite["uses"] = real_invite.uses
+
+        self._writer.save_later()
+        return probable_invites_used
+
+    async def get_used_invites(
+        self, guild: discord.Guild
+    ) -> list[dict[str, Union[str, int]]]:
+        """
+        Returns the invites which were probably used by a member who just joined.
+        """
+        if self._snapshot_task is None:
+            self._snapshot_task = asyncio.create_task(self.__take_snapshot(guild))
+        # A join which is cancelled mustn't cancel the snapshot of the other joins
+        return await asyncio.shield(self._snapshot_task)
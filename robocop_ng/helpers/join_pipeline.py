@@ -0,0 +1,117 @@
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable, Union
+
+from discord import Member
+
+
+@dataclass(slots=True)
+class JoinStep:
+    name: str
+    order: int
+    callback: Callable[[Member], Any]
+    calls: int = 0
+    errors: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+    def add_time(self, elapsed_time: float):
+        self.calls += 1
+        self.total_time += elapsed_time
+        self.max_time = max(self.max_time, elapsed_time)
+
+
+class JoinPipeline:
+    """
+    Handles new members in a fixed order: first the roles they get back, then the steps of the cogs.
+
+    Role providers return the IDs of the roles a member should have, which are merged and applied
+    with a single member edit, before any step runs. Steps run one after the other, by their order.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.role_providers: dict[str, JoinStep] = {}
+        self.steps: dict[str, JoinStep] = {}
+        self.role_edit = JoinStep("Role edit", 0, None)
+
+    def register_roles(
+        self,
+        name: str,
+        provider: Callable[[Member], Iterable[Union[int, str]]],
+        order: int = 0,
+    ):
+        self.role_providers[name] = JoinStep(name, order, provider)
+
+    def register_step(
+        self, name: str, callback: Callable[[Member], Awaitable[Any]], order: int = 0
+    ):
+        self.steps[name] = JoinStep(name, order, callback)
+
+    def unregister(self, name: str):
+        self.role_providers.pop(name, None)
+        self.steps.pop(name, None)
+
+    def get_roles(self, member: Member) -> list[int]:
+        role_ids = {}
+        for provider in sorted(self.role_providers.values(), key=lambda x: x.order):
+            start_time = time.perf_counter()
+            try:
+                role_ids.update(
+                    dict.fromkeys(int(x) for x in provider.callback(member))
+                )
+            except Exception:
+                provider.errors += 1
+                self.bot.log.exception(f"Role provider {provider.name} failed")
+            provider.add_time(time.perf_counter() - start_time)
+        return list(role_ids)
+
+    async def __restore_roles(self, member: Member):
+        role_ids = self.get_roles(member)
+        # Guild.get_role looks roles up in the guild's cached role map
+        roles = [
+            role
+            for role in (member.guild.get_role(x) for x in role_ids)
+            if role is not None and role not in member.roles
+        ]
+        if len(roles) == 0:
+            return
+
+        start_time = time.perf_counter()
+        try:
+            await member.edit(
+                roles=[x for x in member.roles if not x.is_default()] + roles,
+                reason="Restoring roles of a returning member.",
+            )
+        except Exception:
+            self.role_edit.errors += 1
+            await self.bot.on_error("on_member_join:Role edit", member)
+        self.role_edit.add_time(time.perf_counter() - start_time)
+
+    async def run(self, member: Member):
+        await self.bot.wait_until_ready()
+        await self.__restore_roles(member)
+        for step in sorted(self.steps.values(), key=lambda x: x.order):
+            start_time = time.perf_counter()
+            try:
+                await step.callback(member)
+            except Exception:
+                step.errors += 1
+                await self.bot.on_error(f"on_member_join:{step.name}", member)
+            step.add_time(time.perf_counter() - start_time)
+
+    def format_stats(self) -> str:
+        lines = [
+            f"{'Join step':<22} {'Calls':>8} {'Errors':>6} {'Avg':>9} {'Max':>9}",
+        ]
+        for step in [
+            *self.role_providers.values(),
+            self.role_edit,
+            *sorted(self.steps.values(), key=lambda x: x.order),
+        ]:
+            average_time = step.total_time / step.calls if step.calls else 0
+            lines.append(
+                f"{step.name:<22} {step.calls:>8} {step.errors:>6} "
+                f"{average_time * 1000:>6.1f} ms {step.max_time * 1000:>6.1f} ms"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,65 @@
+import re
+from typing import Optional
+
+signature_regex = re.compile(r"^[0-9a-f]{16}$")
+token_regex = re.compile(r"\w+")
+
+
+class KnownIssueMatcher:
+    """
+    Maps error signatures and error text snippets to the macros explaining them.
+
+    Signatures are looked up directly. Snippets can start or end in the middle of a word, so they're
+    indexed by their longest token with a word boundary on both sides within the snippet. Matching
+    tokenizes the error text once and checks the snippets sharing one of its words with a substring
+    search. Snippets without such a token are always checked with a substring search.
+    """
+
+    def __init__(self, triggers: dict[str, list[str]]):
+        self.triggers = triggers
+        self._signatures: dict[str, list[str]] = {}
+        self._snippets: dict[str, dict[str, list[str]]] = {}
+        self._unindexed_snippets: dict[str, list[str]] = {}
+        self._size = 0
+        for trigger, macro_keys in triggers.items():
+            trigger = trigger.lower()
+            self._size += 1
+            if signature_regex.match(trigger) is not None:
+                self._signatures[trigger] = macro_keys
+                continue
+            # Tokens touching the ends of the snippet may be part of a longer word in the error text
+            whole_tokens = [
+                x.group()
+                for x in token_regex.finditer(trigger)
+                if x.start() > 0 and x.end() < len(trigger)
+            ]
+            if len(whole_tokens) == 0:
+                if len(trigger.strip()) > 0:
+                    self._unindexed_snippets[trigger] = macro_keys
+                continue
+            index_token = max(whole_tokens, key=len)
+            if index_token not in self._snippets:
+                self._snippets[index_token] = {}
+            self._snippets[index_token][trigger] = macro_keys
+
+    def __len__(self) -> int:
+        return self._size
+
+    def match(self, error_text: str, signature: Optional[str] = None) -> list[str]:
+        macro_keys = []
+        if signature is not None and signature in self._signatures:
+            macro_keys.extend(self._signatures[signature])
+        if len(self._snippets) > 0 or len(self._unindexed_snippets) > 0:
+            error_text = error_text.lower()
+            if len(self._snippets) > 0:
+                for token in dict.fromkeys(token_regex.findall(error_text)):
+                    for snippet, snippet_macro_keys in self._snippets.get(
+                        token, {}
+                    ).items():
+                        if snippet in error_text:
+                            macro_keys.extend(snippet_macro_keys)
+            for snippet, snippet_macro_keys in self._unindexed_snippets.items():
+                if snippet in error_text:
+                    macro_keys.extend(snippet_macro_keys)
+        # Remove duplicates while keeping the order
+        return list(dict.fromkeys(macro_keys))
@@ -0,0 +1,144 @@
+import datetime
+import os
+from typing import Optional
+
+from robocop_ng.helpers.data_loader import DelayedJsonWriter, read_json
+from robocop_ng.helpers.log_models import AnalysedLog
+
+# Number of keys tracked by each heavy hitter sketch
+top_k_capacity = 50
+daily_bucket_count = 30
+
+gpu_vendors = {
+    "NVIDIA": ["nvidia", "geforce"],
+    "AMD": ["amd", "radeon"],
+    "Intel": ["intel"],
+    "Apple": ["apple"],
+}
+
+
+def get_log_analytics_path(bot) -> str:
+    return os.path.join(bot.state_dir, "data/log_analytics.json")
+
+
+class SpaceSavingSketch:
+    """
+    Approximate top-k counter with a fixed number of slots.
+
+    When a new key arrives and all slots are taken, it replaces the smallest counter
+    and inherits its count as the maximum overestimation error.
+    """
+
+    def __init__(self, capacity: int, counters: Optional[dict[str, list[int]]] = None):
+        self.capacity = capacity
+        # key -> [count, error]
+        self.counters: dict[str, list[int]] = counters if counters is not None else {}
+
+    def add(self, key: str):
+        counter = self.counters.get(key)
+        if counter is not None:
+            counter[0] += 1
+        elif len(self.counters) < self.capacity:
+            self.counters[key] = [1, 0]
+        else:
+            min_key = min(self.counters, key=lambda x: self.counters[x][0])
+            min_count = self.counters.pop(min_key)[0]
+            self.counters[key] = [min_count + 1, min_count]
+
+    def top(self, limit: int = 10) -> list[tuple[str, int, int]]:
+        return [
+            (key, count, error)
+            for key, (count, error) in sorted(
+                self.counters.items(), key=lambda x: x[1][0], reverse=True
+            )[:limit]
+        ]
+
+
+class LogAnalytics:
+    """
+    Constant-memory aggregates over analysed logs.
+
+    No individual logs are kept: small categories are plain counters, open-ended ones
+    (games, Ryujinx versions, GPUs) use space-saving sketches and analyses per day are kept
+    for the last month. Changes are written back to the state directory in the background.
+    """
+
+    counter_names = ["gpu_vendor", "os", "graphics_backend", "common_errors"]
+    sketch_names = ["games", "versions", "gpus"]
+
+    def __init__(self, bot):
+        self.bot = bot
+        data = read_json(bot, get_log_analytics_path(bot))
+        self.total = data.get("total", 0)
+        self.counters: dict[str, dict[str, int]] = {
+            name: data.get("counters", {}).get(name, {}) for name in self.counter_names
+        }
+        self.sketches = {
+            name: SpaceSavingSketch(
+                top_k_capacity, data.get("sketches", {}).get(name, {})
+            )
+            for name in self.sketch_names
+        }
+        self.daily: dict[str, int] = data.get("daily", {})
+        # Logs without a graphics backend used to be counted under "None"
+        backends = self.counters["graphics_backend"]
+        if "None" in backends:
+            backends["Unknown"] = backends.get("Unknown", 0) + backends.pop("None")
+        self._writer = DelayedJsonWriter(
+            get_log_analytics_path(bot), self.__get_contents
+        )
+
+    @staticmethod
+    def get_gpu_vendor(gpu: str) -> str:
+        if gpu == "Unknown":
+            return gpu
+        gpu = gpu.lower()
+        for vendor, names in gpu_vendors.items():
+            if any(name in gpu for name in names):
+                return vendor
+        return "Other"
+
+    @staticmethod
+    def get_os_family(os_name: str) -> str:
+        for family in ["Windows", "Linux", "macOS"]:
+            if family.lower() in os_name.lower():
+                return family
+        return "Unknown" if os_name == "Unknown" else "Other"
+
+    def __count(self, name: str, key: str):
+        self.counters[name][key] = self.counters[name].get(key, 0) + 1
+
+    def __get_contents(self) -> dict:
+        return {
+            "total": self.total,
+            "counters": self.counters,
+            "sketches": {
+                name: sketch.counters for name, sketch in self.sketches.items()
+            },
+            "daily": self.daily,
+        }
+
+    def save(self):
+        self._writer.save()
+
+    def record(self, analysed_log: AnalysedLog, common_errors: list):
+        self.total += 1
+        hardware_info = analysed_log.hardware_info
+        self.__count("gpu_vendor", self.get_gpu_vendor(hardware_info.gpu))
+        self.__count("os", self.get_os_family(hardware_info.os))
+        self.__count(
+            "graphics_backend", analysed_log.settings.graphics_backend or "Unknown"
+        )
+        for common_error in common_errors:
+            self.__count("common_errors", common_error.name)
+
+        self.sketches["games"].add(analysed_log.game_info.display_name)
+        self.sketches["versions"].add(analysed_log.emu_info.ryu_version)
+        self.sketches["gpus"].add(hardware_info.gpu)
+
+        today = datetime.date.today().isoformat()
+        self.daily[today] = self.daily.get(today, 0) + 1
+        if len(self.daily) > daily_bucket_count:
+            del self.daily[min(self.daily.keys())]
+
+        self._writer.save_later()
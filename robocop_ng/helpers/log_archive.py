@@ -0,0 +1,110 @@
+import io
+import os
+import re
+import zipfile
+import zlib
+from collections import deque
+from typing import Iterable, Iterator
+
+from robocop_ng.helpers.log_sampler import SparseLogBuffer
+
+log_archive_regex = re.compile(r"^.*\.(?:zip|log\.gz|txt\.gz)$", re.IGNORECASE)
+archived_log_regex = re.compile(r"^.*\.(?:log|txt)$", re.IGNORECASE)
+
+# Ryujinx logs compress roughly 10-20x, zip bombs compress a lot better than that
+max_compression_ratio = 100
+max_decompressed_size = 1000 * 1000 * 64
+max_archived_logs = 10
+# Only the start and end of huge decompressed logs are kept for analysis
+kept_log_size = 1000 * 1000 * 4
+chunk_size = 64 * 1024
+
+
+def is_log_archive(filename: str) -> bool:
+    return log_archive_regex.match(filename) is not None
+
+
+def gzip_chunks(data: bytes) -> Iterator[bytes]:
+    # Concatenated gzip files are valid too, each member is decompressed in turn
+    while data[:2] == b"\x1f\x8b":
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        # max_length bounds the output of every step, so a bomb never expands in a single call
+        chunk = decompressor.decompress(data, chunk_size)
+        while True:
+            yield chunk
+            if decompressor.eof or len(decompressor.unconsumed_tail) == 0:
+                break
+            chunk = decompressor.decompress(decompressor.unconsumed_tail, chunk_size)
+        if not decompressor.eof:
+            # The archive is truncated, keep what could be decompressed
+            yield decompressor.flush()
+            return
+        data = decompressor.unused_data
+
+
+def read_capped(
+    chunks: Iterable[bytes], compressed_size: int, limit: int
+) -> SparseLogBuffer:
+    """
+    Consumes decompressed chunks, keeping the head and tail of the stream.
+
+    Raises ValueError if the stream exceeds the ratio cap or the decompression limit.
+    """
+    limit = min(limit, max(compressed_size, 1) * max_compression_ratio)
+    half_size = kept_log_size // 2
+    head = bytearray()
+    tail = deque()
+    tail_size = 0
+    total_size = 0
+
+    for chunk in chunks:
+        total_size += len(chunk)
+        if total_size > limit:
+            raise ValueError("Archive exceeds the allowed compression ratio or size.")
+        if len(head) < half_size:
+            head_part = chunk[: half_size - len(head)]
+            head += head_part
+            chunk = chunk[len(head_part) :]
+        if len(chunk) > 0:
+            tail.append(chunk)
+            tail_size += len(chunk)
+            while tail_size - len(tail[0]) >= half_size:
+                tail_size -= len(tail.popleft())
+
+    buffer = SparseLogBuffer(total_size)
+    buffer.add(0, bytes(head))
+    if tail_size > 0:
+        buffer.add(total_size - tail_size, b"".join(tail))
+    return buffer
+
+
+def extract_log_archive(filename: str, data: bytes) -> list[tuple[str, str]]:
+    """
+    Returns the (filename, log text) of every log contained in a gzip or zip archive.
+    """
+    try:
+        if filename.lower().endswith(".gz"):
+            buffer = read_capped(gzip_chunks(data), len(data), max_decompressed_size)
+            return [(os.path.basename(filename[:-3]), buffer.to_text())]
+
+        logs = []
+        remaining_size = max_decompressed_size
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            for info in archive.infolist():
+                member_name = os.path.basename(info.filename)
+                if info.is_dir() or archived_log_regex.match(member_name) is None:
+                    continue
+                if len(logs) >= max_archived_logs or info.file_size > remaining_size:
+                    # The logs extracted so far are kept once the budget is spent
+                    break
+                with archive.open(info) as member:
+                    buffer = read_capped(
+                        iter(lambda: member.read(chunk_size), b""),
+                        info.compress_size,
+                        remaining_size,
+                    )
+                remaining_size -= buffer.size
+                logs.append((member_name, buffer.to_text()))
+        return logs
+    except (zipfile.BadZipFile, zlib.error, RuntimeError, NotImplementedError) as error:
+        raise ValueError(f"Archive couldn't be extracted: {error}") from error
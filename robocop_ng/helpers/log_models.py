@@ -0,0 +1,218 @@
+import re
+from dataclasses import dataclass, field, fields
+from enum import StrEnum
+from typing import Any, Optional, Union
+
+from robocop_ng.helpers.log_notes import NoteSeverity
+
+
+class Toggle(StrEnum):
+    ENABLED = "Enabled"
+    DISABLED = "Disabled"
+    NOT_AVAILABLE = "N/A"
+
+    @classmethod
+    def from_log_value(cls, value: str) -> "Toggle":
+        return cls.ENABLED if value == "True" else cls.DISABLED
+
+
+class ConsoleMode(StrEnum):
+    DOCKED = "Docked"
+    HANDHELD = "Handheld"
+
+    @classmethod
+    def from_log_value(cls, value: str) -> "ConsoleMode":
+        return cls.DOCKED if value == "True" else cls.HANDHELD
+
+
+class ResolutionScale(StrEnum):
+    CUSTOM = "Custom"
+    NATIVE = "Native (720p/1080p)"
+    X2 = "2x (1440p/2160p)"
+    X3 = "3x (2160p/3240p)"
+    X4 = "4x (2880p/4320p)"
+
+    @classmethod
+    def from_log_value(cls, value: str) -> "ResolutionScale":
+        return {"1": cls.NATIVE, "2": cls.X2, "3": cls.X3, "4": cls.X4}.get(
+            value, cls.CUSTOM
+        )
+
+
+class AnisotropicFiltering(StrEnum):
+    AUTO = "Auto"
+    X2 = "2x"
+    X4 = "4x"
+    X8 = "8x"
+    X16 = "16x"
+
+    @classmethod
+    def from_log_value(cls, value: str) -> "AnisotropicFiltering":
+        return {"2": cls.X2, "4": cls.X4, "8": cls.X8, "16": cls.X16}.get(
+            value, cls.AUTO
+        )
+
+
+class AspectRatio(StrEnum):
+    FIXED_4X3 = "4:3"
+    FIXED_16X9 = "16:9"
+    FIXED_16X10 = "16:10"
+    FIXED_21X9 = "21:9"
+    FIXED_32X9 = "32:9"
+    STRETCHED = "Stretch to Fit Window"
+    UNKNOWN = "Unknown"
+
+    @classmethod
+    def from_log_value(cls, value: str) -> "AspectRatio":
+        return {
+            "Fixed4x3": cls.FIXED_4X3,
+            "Fixed16x9": cls.FIXED_16X9,
+            "Fixed16x10": cls.FIXED_16X10,
+            "Fixed21x9": cls.FIXED_21X9,
+            "Fixed32x9": cls.FIXED_32X9,
+            "Stretched": cls.STRETCHED,
+        }.get(value, cls.UNKNOWN)
+
+
+def serialise(value: Any) -> Any:
+    """Converts a result model into plain dicts, lists and strings."""
+    if isinstance(value, StrEnum):
+        return value.value
+    if hasattr(value, "__dataclass_fields__"):
+        return {x.name: serialise(getattr(value, x.name)) for x in fields(value)}
+    if isinstance(value, (list, tuple)):
+        return [serialise(x) for x in value]
+    return value
+
+
+@dataclass(slots=True)
+class HardwareInfo:
+    cpu: str = "Unknown"
+    gpu: str = "Unknown"
+    ram: str = "Unknown"
+    os: str = "Unknown"
+
+
+@dataclass(slots=True)
+class EmulatorInfo:
+    ryu_version: str = "Unknown"
+    ryu_firmware: str = "Unknown"
+    logs_enabled: Optional[str] = None
+
+
+@dataclass(slots=True)
+class GameInfo:
+    game_name: str = "Unknown"
+    mods: list[str] = field(default_factory=list)
+    cheats: list[str] = field(default_factory=list)
+
+    @property
+    def display_name(self) -> str:
+        return re.sub(r"\s\[(64|32)-bit\]$", "", self.game_name)
+
+    @staticmethod
+    def __format_entries(
+        entries: list[str], name: str, limit: Optional[int] = None
+    ) -> str:
+        if len(entries) == 0:
+            return f"No {name} found"
+        lines = [f"ℹ️ {entry}" for entry in entries]
+        if limit is not None and len(lines) > limit:
+            lines = lines[:limit] + [f"✂️ {len(lines) - limit} other {name}"]
+        return "\n".join(lines)
+
+    def format_mods(self, limit: Optional[int] = None) -> str:
+        return self.__format_entries(self.mods, "mods", limit)
+
+    def format_cheats(self, limit: Optional[int] = None) -> str:
+        return self.__format_entries(self.cheats, "cheats", limit)
+
+
+@dataclass(slots=True)
+class Settings:
+    audio_backend: Optional[str] = None
+    backend_threading: Optional[str] = None
+    docked: Optional[ConsoleMode] = None
+    expand_ram: Optional[str] = None
+    fs_integrity: Optional[str] = None
+    graphics_backend: Optional[str] = None
+    ignore_missing_services: Optional[str] = None
+    memory_manager: Optional[str] = None
+    pptc: Optional[Toggle] = None
+    shader_cache: Optional[Toggle] = None
+    vsync: Optional[Toggle] = None
+    hypervisor: Optional[Toggle] = None
+    resolution_scale: Optional[ResolutionScale] = None
+    anisotropic_filtering: Optional[AnisotropicFiltering] = None
+    aspect_ratio: Optional[AspectRatio] = None
+    texture_recompression: Optional[Toggle] = None
+
+
+@dataclass(slots=True)
+class LogNotes:
+    entries: dict[str, NoteSeverity] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, note: str, severity: NoteSeverity):
+        self.entries[note] = severity
+
+    def sorted(self) -> list[str]:
+        # Notes are ordered by severity first, then alphabetically by the text after the symbol,
+        # notes come from staff edited rules so they might not have one
+        return [
+            note
+            for note, _ in sorted(
+                self.entries.items(),
+                key=lambda x: (x[1], (x[0].split(maxsplit=1) or [""])[-1]),
+            )
+        ]
+
+
+@dataclass(slots=True)
+class AnalysedLog:
+    hardware_info: HardwareInfo
+    emu_info: EmulatorInfo
+    game_info: GameInfo
+    settings: Settings
+    notes: list[str]
+    errors: list[list[str]]
+
+    @property
+    def error_snippet(self) -> str:
+        if len(self.errors) == 0:
+            return "No errors found in log"
+        last_error = "\n".join(self.errors[-1][:2])
+        return f"```\n{last_error}\n```"
+
+    @property
+    def notes_text(self) -> str:
+        return "\n".join(self.notes) if len(self.notes) > 0 else "Nothing to note"
+
+    @classmethod
+    def from_serialised(cls, data: dict[str, Any]) -> "AnalysedLog":
+        """Loads an analysed log from the output of serialise(), settings are kept as their plain values."""
+        return cls(
+            hardware_info=HardwareInfo(**data["hardware_info"]),
+            emu_info=EmulatorInfo(**data["emu_info"]),
+            game_info=GameInfo(**data["game_info"]),
+            settings=Settings(**data["settings"]),
+            notes=data["notes"],
+            errors=data["errors"],
+        )
+
+    def to_dict(self) -> dict[str, Union[dict[str, str], list[str], list[list[str]]]]:
+        return {
+            "hardware_info": serialise(self.hardware_info),
+            "emu_info": serialise(self.emu_info),
+            "game_info": {
+                "game_name": self.game_info.game_name,
+                "errors": self.error_snippet,
+                "mods": self.game_info.format_mods(),
+                "cheats": self.game_info.format_cheats(),
+            },
+            "notes": self.notes,
+            "errors": self.errors,
+            "settings": serialise(self.settings),
+        }
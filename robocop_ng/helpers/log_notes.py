@@ -0,0 +1,258 @@
+import os
+from enum import IntEnum, auto
+from typing import Any, Callable, Optional
+
+from robocop_ng.helpers.data_loader import read_json
+
+
+class NoteSeverity(IntEnum):
+    CRITICAL = auto()
+    ERROR = auto()
+    WARNING = auto()
+    INFO = auto()
+    OK = auto()
+
+
+# Every condition is a (field, operator, value) triple and all conditions of a rule need to match.
+# Fields are paths into the analysed log: settings, hardware_info, emu_info and game_info attributes,
+# common_errors (the names of the detected CommonErrors) and ryujinx_version (a RyujinxVersion name).
+default_note_rules = [
+    {
+        "note": "**❌ Nintendo Switch firmware not found**",
+        "severity": "CRITICAL",
+        "conditions": [
+            ["emu_info.ryu_firmware", "eq", "Unknown"],
+            ["game_info.game_name", "ne", "Unknown"],
+        ],
+    },
+    {
+        "note": "**⚠️ Custom builds are not officially supported**",
+        "severity": "WARNING",
+        "conditions": [["ryujinx_version", "eq", "CUSTOM"]],
+    },
+    {
+        "note": "🔴 **Rosetta should be disabled**",
+        "severity": "ERROR",
+        "conditions": [["hardware_info.cpu", "contains", "VirtualApple"]],
+    },
+    {
+        "note": "**⚠️ Intel iGPU users should consider using Vulkan graphics backend**",
+        "severity": "WARNING",
+        "conditions": [
+            ["hardware_info.os", "contains", "Windows"],
+            ["settings.graphics_backend", "ne", "Vulkan"],
+            ["hardware_info.gpu", "contains", "Intel"],
+        ],
+    },
+    {
+        "note": "**⚠️ AMD GPU users should consider using Vulkan graphics backend**",
+        "severity": "WARNING",
+        "conditions": [
+            ["hardware_info.os", "contains", "Windows"],
+            ["settings.graphics_backend", "ne", "Vulkan"],
+            ["hardware_info.gpu", "contains", "AMD"],
+        ],
+    },
+    {
+        "note": "⚠️ Dummy audio backend, consider changing to SDL2 or OpenAL",
+        "severity": "WARNING",
+        "conditions": [["settings.audio_backend", "eq", "Dummy"]],
+    },
+    {
+        "note": "🔴 **PPTC cache should be enabled**",
+        "severity": "ERROR",
+        "conditions": [["settings.pptc", "eq", "Disabled"]],
+    },
+    {
+        "note": "🔴 **Shader cache should be enabled**",
+        "severity": "ERROR",
+        "conditions": [["settings.shader_cache", "eq", "Disabled"]],
+    },
+    {
+        "note": "⚠️ `Use alternative memory layout` should only be enabled for 4K mods",
+        "severity": "WARNING",
+        "conditions": [["settings.expand_ram", "eq", "True"]],
+    },
+    {
+        "note": "🔴 **`Software` setting in Memory Manager Mode will give slower performance than the default setting of `Host unchecked`**",
+        "severity": "ERROR",
+        "conditions": [["settings.memory_manager", "eq", "SoftwarePageTable"]],
+    },
+    {
+        "note": "⚠️ `Ignore Missing Services` being enabled can cause instability",
+        "severity": "WARNING",
+        "conditions": [["settings.ignore_missing_services", "eq", "True"]],
+    },
+    {
+        "note": "⚠️ V-Sync disabled can cause instability like games running faster than intended or longer load times",
+        "severity": "WARNING",
+        "conditions": [["settings.vsync", "eq", "Disabled"]],
+    },
+    {
+        "note": "⚠️ Disabling file integrity checks may cause corrupted dumps to not be detected",
+        "severity": "WARNING",
+        "conditions": [["settings.fs_integrity", "eq", "Disabled"]],
+    },
+    {
+        "note": "🔴 **Graphics Backend Multithreading should be set to `Auto`**",
+        "severity": "ERROR",
+        "conditions": [["settings.backend_threading", "eq", "Off"]],
+    },
+    {
+        "note": "⚠️ Cache collision detected. Investigate possible shader cache issues",
+        "severity": "WARNING",
+        "conditions": [["common_errors", "contains", "SHADER_CACHE_COLLISION"]],
+    },
+    {
+        "note": "⚠️ Cache corruption detected. Investigate possible shader cache issues",
+        "severity": "WARNING",
+        "conditions": [["common_errors", "contains", "SHADER_CACHE_CORRUPTION"]],
+    },
+    {
+        "note": "⚠️ Dump error detected. Investigate possible bad game/firmware dump issues",
+        "severity": "WARNING",
+        "conditions": [["common_errors", "contains", "DUMP_HASH"]],
+    },
+    {
+        "note": "⚠️ Keys or firmware out of date, consider updating them",
+        "severity": "WARNING",
+        "conditions": [["common_errors", "contains", "UPDATE_KEYS"]],
+    },
+    {
+        "note": "⚠️ File permission error. Consider deleting save directory and allowing Ryujinx to make a new one",
+        "severity": "WARNING",
+        "conditions": [["common_errors", "contains", "FILE_PERMISSIONS"]],
+    },
+    {
+        "note": "⚠️ Save not found error. Consider starting game without a save file or using a new save file",
+        "severity": "WARNING",
+        "conditions": [["common_errors", "contains", "FILE_NOT_FOUND"]],
+    },
+    {
+        "note": "⚠️ Consider enabling `Ignore Missing Services` in Ryujinx settings",
+        "severity": "WARNING",
+        "conditions": [
+            ["common_errors", "contains", "MISSING_SERVICES"],
+            ["settings.ignore_missing_services", "eq", "False"],
+        ],
+    },
+    {
+        "note": "⚠️ Consider enabling `Texture Recompression` in Ryujinx settings",
+        "severity": "WARNING",
+        "conditions": [
+            ["common_errors", "contains", "VULKAN_OUT_OF_MEMORY"],
+            ["settings.texture_recompression", "eq", "Disabled"],
+        ],
+    },
+]
+
+note_rule_operators: dict[str, Callable[[Any, str], bool]] = {
+    "eq": lambda value, expected: value == expected,
+    "ne": lambda value, expected: value != expected,
+    "contains": lambda value, expected: value is not None and expected in value,
+    "not_contains": lambda value, expected: value is None or expected not in value,
+}
+
+
+class NoteRuleSet:
+    """
+    Note rules compiled into a flat evaluation plan.
+
+    Conditions shared by several rules are deduplicated, so each of them is evaluated once per log
+    and rules only combine the precomputed results.
+    """
+
+    def __init__(self, rules: list[dict[str, Any]]):
+        self.rules = rules
+        self._predicates: list[
+            tuple[tuple[str, ...], Callable[[Any, str], bool], str]
+        ] = []
+        self._rules: list[tuple[tuple[int, ...], str, NoteSeverity]] = []
+        predicate_ids: dict[tuple[str, str, str], int] = {}
+
+        for rule in rules:
+            try:
+                note = rule["note"]
+                severity = NoteSeverity[rule["severity"]]
+                condition_ids = []
+                for field, operator, expected in rule["conditions"]:
+                    if operator not in note_rule_operators:
+                        raise ValueError(f"Unknown operator '{operator}'")
+                    key = (field, operator, str(expected))
+                    if key not in predicate_ids:
+                        predicate_ids[key] = len(self._predicates)
+                        self._predicates.append(
+                            (
+                                tuple(field.split(".")),
+                                note_rule_operators[operator],
+                                str(expected),
+                            )
+                        )
+                    condition_ids.append(predicate_ids[key])
+            except (KeyError, TypeError, ValueError) as error:
+                raise ValueError(f"Invalid note rule {rule}: {error!r}") from error
+            self._rules.append((tuple(condition_ids), note, severity))
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    @property
+    def predicate_count(self) -> int:
+        return len(self._predicates)
+
+    @staticmethod
+    def __resolve(context: dict[str, Any], path: tuple[str, ...]) -> Any:
+        value = context
+        for key in path:
+            if isinstance(value, dict):
+                value = value.get(key)
+            else:
+                value = getattr(value, key, None)
+        return value
+
+    def evaluate(self, context: dict[str, Any]) -> dict[str, NoteSeverity]:
+        results = [
+            operator(self.__resolve(context, path), expected)
+            for path, operator, expected in self._predicates
+        ]
+        return {
+            note: severity
+            for condition_ids, note, severity in self._rules
+            if all(results[i] for i in condition_ids)
+        }
+
+
+default_note_rule_set = NoteRuleSet(default_note_rules)
+
+
+def get_log_note_rules_path(bot) -> str:
+    return os.path.join(bot.state_dir, "data/log_note_rules.json")
+
+
+def get_log_note_rules(bot) -> NoteRuleSet:
+    """
+    Returns the note rules from the state directory, recompiling them whenever the file changes.
+
+    Without a rules file the built-in rules are used. If the file is invalid, the previous rules are kept.
+    """
+    path = get_log_note_rules_path(bot)
+    modified_time = os.path.getmtime(path) if os.path.isfile(path) else None
+    cached: Optional[tuple[Optional[float], NoteRuleSet]] = getattr(
+        bot, "log_note_rules", None
+    )
+    if cached is not None and cached[0] == modified_time:
+        return cached[1]
+
+    rule_set = cached[1] if cached is not None else default_note_rule_set
+    if modified_time is None:
+        rule_set = default_note_rule_set
+    else:
+        rules = read_json(bot, path).get("rules")
+        if rules is not None:
+            try:
+                rule_set = NoteRuleSet(rules)
+            except ValueError as error:
+                bot.log.error(f"Couldn't load log note rules: {error}")
+
+    bot.log_note_rules = (modified_time, rule_set)
+    return rule_set
@@ -0,0 +1,167 @@
+import re
+
+from robocop_ng.helpers.size import Size
+
+# Ryujinx configuration keys of the settings shown in the log analysis
+log_setting_keys = {
+    "anisotropic_filtering": "MaxAnisotropy",
+    "aspect_ratio": "AspectRatio",
+    "audio_backend": "AudioBackend",
+    "backend_threading": "BackendThreading",
+    "docked": "EnableDockedMode",
+    "expand_ram": "ExpandRam",
+    "fs_integrity": "EnableFsIntegrityChecks",
+    "graphics_backend": "GraphicsBackend",
+    "ignore_missing_services": "IgnoreMissingServices",
+    "memory_manager": "MemoryManagerMode",
+    "pptc": "EnablePtc",
+    "resolution_scale": "ResScale",
+    "shader_cache": "EnableShaderCache",
+    "texture_recompression": "EnableTextureRecompression",
+    "vsync": "EnableVsync",
+    "hypervisor": "UseHypervisor",
+}
+
+_sizes = "|".join(Size.names())
+
+# Every pattern of the log subsystem as name -> (pattern, example the pattern has to match)
+log_pattern_definitions: dict[str, tuple[str, str]] = {
+    # Attachments
+    "ryujinx_log_name": (
+        r"^Ryujinx_.*\.log$",
+        "Ryujinx_1.1.1200_2024-01-01_12-00-00.log",
+    ),
+    "log_name": (r"^.*\.log|.*\.txt$", "crash.txt"),
+    "log_signature": (
+        r"\d{2}:\d{2}:\d{2}\.\d{3}\s+\|[A-Z]+\||Ryujinx Version:",
+        "00:00:00.001 |I| Application PrintSystemInfo: Ryujinx Version: 1.1.1200",
+    ),
+    # Log structure
+    "log_start": (r"\d{2}:\d{2}:\d{2}\.\d{3}", "00:00:00.001 |I| Application"),
+    "timestamp": (r"(\d{2}:\d{2}:\d{2}\.\d{3})\s+?\|", "00:03:00.000 |I| Application"),
+    "app_loaded_line": (
+        r"Loader [A-Za-z]*: Application Loaded:[^\n]*",
+        "Loader LoadNsos: Application Loaded: Super Mario Odyssey v1.3.0 [0100000000010000] [64-bit]",
+    ),
+    # Application
+    "app_name": (
+        r"Loader [A-Za-z]*: Application Loaded:\s([^;\n\r]*)",
+        "Loader LoadNsos: Application Loaded: Super Mario Odyssey v1.3.0 [0100000000010000] [64-bit]",
+    ),
+    "app_id": (r".* \[([a-zA-Z0-9]*)\]", "Super Mario Odyssey [0100000000010000]"),
+    "app_id_suffix": (
+        r"\s\[([a-zA-Z0-9]{16})\]$",
+        "Super Mario Odyssey [0100000000010000]",
+    ),
+    "build_ids": (
+        r"Build ids found for (?:title|application) ([a-zA-Z0-9]*):[\n\r]*((?:\s+.*[\n\r]+)+)",
+        "Build ids found for application 0100000000010000:\n    3CA12DFAAF9C82DA064D1698DF79CDA1\n",
+    ),
+    "ro_section": (
+        r"PrintRoSectionInfo: main:[\r\n]((?:\s+.*[\r\n])*)",
+        "PrintRoSectionInfo: main:\n    Module: nnSdk\n",
+    ),
+    "homebrew": (
+        r"Load.*Application: Loading as [Hh]omebrew",
+        "Loader LoadNro: Application: Loading as homebrew",
+    ),
+    "file_path": (
+        r"(?:[A-Za-z]:)?(?:[\\/]+[^\\/:\"\r\n]+)+",
+        "C:\\Users\\Ryujinx\\Games\\game.nsp",
+    ),
+    # System information
+    "cpu": (r"CPU:\s([^;\n\r]*)", "CPU: AMD Ryzen 7 5800X 8-Core Processor ; 16"),
+    "ram": (
+        rf"RAM: Total ([\d.]+) ({_sizes}) ; Available ([\d.]+) ({_sizes})",
+        "RAM: Total 31.9 GiB ; Available 20.1 GiB",
+    ),
+    "os": (
+        r"Operating System:\s([^;\n\r]*)",
+        "Operating System: Microsoft Windows 10.0.22631",
+    ),
+    "gpu": (
+        r"PrintGpuInformation:\s([^;\n\r]*)",
+        "PrintGpuInformation: NVIDIA GeForce RTX 3070",
+    ),
+    "ryujinx_version": (r"Ryujinx Version:[^\n]*", "Ryujinx Version: 1.1.1200"),
+    "firmware_version": (r"Firmware Version:[^\n]*", "Firmware Version: 17.0.0"),
+    "logs_enabled": (
+        r"Logs Enabled:\s([^;\n\r]*)",
+        "Logs Enabled: Info, Warning, Error, Guest, Stub",
+    ),
+    "settings": (
+        rf"LogValueChange: ({'|'.join(log_setting_keys.values())})[^\S\n][^\n]*",
+        "Configuration LogValueChange: EnablePtc set to: True",
+    ),
+    "default_user_profile": (
+        r"UserId: 00000000000000010000000000000000",
+        "UserId: 00000000000000010000000000000000",
+    ),
+    # Game session
+    "mods": (
+        r"Found\s(enabled|disabled)?\s?mod\s\'(.+?)\'\s(\[.+?\])",
+        "ModLoader Found enabled mod 'Better Fps' [E]",
+    ),
+    # Cheats which fail to compile are skipped
+    "cheat": (
+        r"Installing cheat\s'(.+)'(?!\r?\s\d{2}:\d{2}:\d{2}\.\d{3}\s\|E\|\sTamperMachine\sCompile)",
+        "TamperMachine Installing cheat 'Infinite Coins'",
+    ),
+    "controllers": (
+        r"Hid Configure: ([^\r\n]+)",
+        "Hid Configure: ProController | Index: 0",
+    ),
+    # Ryujinx versions
+    "mainline_version": (r"^\d\.\d\.\d+$", "1.1.1200"),
+    "old_mainline_version": (r"^\d\.\d\.(\d){4}$", "1.0.7000"),
+    "pr_version": (r"^\d\.\d\.\d\+([a-f]|\d){7}$", "1.1.0+1a2b3c4"),
+    "ldn_version": (r"^\d\.\d\.\d-ldn\d+\.\d+(?:\.\d+|$)", "1.1.0-ldn3.1"),
+    "mac_version": (r"^\d\.\d\.\d-macos\d+(?:\.\d+(?:\.\d+|$)|$)", "1.1.0-macos1"),
+    # Error signatures
+    "error_prefix": (
+        r"^\d{2}:\d{2}:\d{2}\.\d{3}\s+\|[A-Z]+\|\s+",
+        "00:02:00.000 |E| Gpu PrintError",
+    ),
+    "error_source": (
+        r"\sin\s.+:line\s\d+$",
+        "at Foo() in C:\\build\\Foo.cs:line 42",
+    ),
+    "error_path": (
+        r"(?:[A-Za-z]:)?(?:[\\/]+[^\\/:\"\s]+)+",
+        "/home/user/.config/Ryujinx",
+    ),
+    "error_address": (
+        r"0x[0-9A-Fa-f]+|\b[0-9A-Fa-f]{8,}\b",
+        "at 0x00007FFA12345678",
+    ),
+    "error_number": (r"\d+", "HLE.OsThread.33"),
+    "exception_type": (
+        r"\b((?:[A-Za-z_]\w*\.)*\w*(?:Exception|Error))\b",
+        "System.NullReferenceException: Object reference not set",
+    ),
+}
+
+
+def compile_log_patterns(
+    definitions: dict[str, tuple[str, str]],
+) -> dict[str, re.Pattern]:
+    """
+    Compiles every pattern and checks it against its example, so a broken pattern fails on startup
+    instead of on the first log which needs it.
+    """
+    patterns = {}
+    for name, (pattern, example) in definitions.items():
+        try:
+            compiled_pattern = re.compile(pattern)
+        except re.error as error:
+            raise ValueError(f"Invalid log pattern '{name}': {error}") from error
+        if compiled_pattern.search(example) is None:
+            raise ValueError(
+                f"Log pattern '{name}' doesn't match its example: {example!r}"
+            )
+        patterns[name] = compiled_pattern
+    return patterns
+
+
+# Compiled once on import and shared by every log analyser
+log_patterns = compile_log_patterns(log_pattern_definitions)
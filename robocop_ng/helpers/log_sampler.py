@@ -0,0 +1,191 @@
+import asyncio
+import re
+from typing import Awaitable, Callable
+
+# Start of a log entry, e.g. "00:00:12.345 |I| ..."
+log_entry_regex = re.compile(rb"(?:^|\n)(\d{2}:\d{2}:\d{2}\.\d{3} )")
+app_loaded_marker = b"Application Loaded:"
+error_marker = b"|E|"
+
+
+class SparseLogBuffer:
+    """
+    Holds non-contiguous byte ranges of a log file, keyed by their offset in the file.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._segments: dict[int, bytes] = {}
+
+    def add(self, offset: int, data: bytes):
+        self._segments[offset] = data
+
+    @property
+    def fetched_bytes(self) -> int:
+        return sum(len(data) for data in self._segments.values())
+
+    def spans(self) -> list[tuple[int, int]]:
+        """Returns the merged (start, end) offsets of the fetched ranges."""
+        spans = []
+        for offset in sorted(self._segments.keys()):
+            end = offset + len(self._segments[offset])
+            if len(spans) > 0 and offset <= spans[-1][1]:
+                spans[-1] = (spans[-1][0], max(spans[-1][1], end))
+            else:
+                spans.append((offset, end))
+        return spans
+
+    def gaps(self) -> list[tuple[int, int]]:
+        gaps = []
+        position = 0
+        for start, end in self.spans():
+            if start > position:
+                gaps.append((position, start))
+            position = max(position, end)
+        if position < self.size:
+            gaps.append((position, self.size))
+        return gaps
+
+    def __contiguous_chunks(self) -> list[tuple[int, bytes]]:
+        chunks = []
+        for offset in sorted(self._segments.keys()):
+            data = self._segments[offset]
+            if len(chunks) > 0:
+                last_offset, last_data = chunks[-1]
+                last_end = last_offset + len(last_data)
+                if offset <= last_end:
+                    chunks[-1] = (last_offset, last_data + data[last_end - offset :])
+                    continue
+            chunks.append((offset, data))
+        return chunks
+
+    def to_text(self) -> str:
+        """
+        Stitches the fetched ranges into log text.
+
+        Chunks following a gap start at the next complete log entry and chunks preceding a gap
+        end at their last complete line, so partial lines are never passed to the analyser.
+        """
+        parts = []
+        for offset, data in self.__contiguous_chunks():
+            # Where the chunk ends in the file, before its start is trimmed
+            chunk_end = offset + len(data)
+            if offset > 0:
+                entry_match = log_entry_regex.search(data)
+                if entry_match is None:
+                    continue
+                data = data[entry_match.start(1) :]
+            if chunk_end < self.size:
+                data = data[: data.rfind(b"\n") + 1]
+            if len(data) > 0:
+                # Ranges can cut multi-byte characters at their edges
+                parts.append(data.decode("UTF-8", errors="replace"))
+        return "".join(part if part.endswith("\n") else part + "\n" for part in parts)
+
+
+class AdaptiveLogFetcher:
+    """
+    Fetches a log file with a bounded number of bytes using HTTP range requests.
+
+    The head and tail are always fetched. If the head doesn't contain the game boot yet, the
+    following chunks are fetched until it is found. The remaining budget is spent on probes
+    spread over the unfetched middle, starting right after the head if it is dense with errors.
+    """
+
+    def __init__(
+        self,
+        fetch_range: Callable[[int, int], Awaitable[bytes]],
+        size: int,
+        budget: int = 192000,
+        head_size: int = 60000,
+        tail_size: int = 16000,
+        chunk_size: int = 16000,
+        error_density_threshold: float = 0.5,
+    ):
+        self.fetch_range = fetch_range
+        self.size = size
+        self.budget = budget
+        self.head_size = head_size
+        self.tail_size = tail_size
+        self.chunk_size = chunk_size
+        # Errors per KB in the head, above which the region right after the head is probed first
+        self.error_density_threshold = error_density_threshold
+        self.buffer = SparseLogBuffer(size)
+
+    @property
+    def remaining_budget(self) -> int:
+        return self.budget - self.buffer.fetched_bytes
+
+    async def __fetch(self, start: int, end: int) -> bytes:
+        data = await self.fetch_range(start, end)
+        if len(data) >= self.size:
+            # The server ignored the range and sent the whole file
+            self.buffer = SparseLogBuffer(self.size)
+            self.buffer.add(0, data[: self.size])
+            return data[start:end]
+        data = data[: end - start]
+        self.buffer.add(start, data)
+        return data
+
+    def __is_complete(self) -> bool:
+        return len(self.buffer.gaps()) == 0
+
+    def __probe_ranges(self, head: bytes) -> list[tuple[int, int]]:
+        gaps = self.buffer.gaps()
+        if len(gaps) == 0:
+            return []
+        gap_start, gap_end = gaps[0]
+        probe_count = min(
+            self.remaining_budget // self.chunk_size,
+            (gap_end - gap_start) // self.chunk_size,
+        )
+        if probe_count <= 0:
+            return []
+
+        error_density = head.count(error_marker) / max(len(head) / 1000, 1)
+        if error_density >= self.error_density_threshold:
+            # Errors are piling up, so the first probe continues right after the head
+            offsets = [gap_start]
+            remaining = probe_count - 1
+            first_offset = gap_start + self.chunk_size
+        else:
+            offsets = []
+            remaining = probe_count
+            first_offset = gap_start
+
+        if remaining > 0:
+            stride = (gap_end - first_offset - self.chunk_size) // remaining
+            offsets.extend(first_offset + stride * (i + 1) for i in range(remaining))
+
+        return [(offset, offset + self.chunk_size) for offset in offsets]
+
+    async def fetch(self) -> SparseLogBuffer:
+        if self.size <= self.budget:
+            await self.__fetch(0, self.size)
+            return self.buffer
+
+        head, _ = await asyncio.gather(
+            self.__fetch(0, self.head_size),
+            self.__fetch(self.size - self.tail_size, self.size),
+        )
+        if self.__is_complete():
+            return self.buffer
+
+        # Extend the head until the game boot is found, keeping enough budget for two probes
+        head_end = self.head_size
+        boot_found = app_loaded_marker in head
+        while (
+            not boot_found
+            and self.remaining_budget >= self.chunk_size * 3
+            and head_end + self.chunk_size <= self.size - self.tail_size
+        ):
+            chunk = await self.__fetch(head_end, head_end + self.chunk_size)
+            boot_found = app_loaded_marker in head[-len(app_loaded_marker) :] + chunk
+            head += chunk
+            head_end += self.chunk_size
+
+        await asyncio.gather(
+            *(self.__fetch(start, end) for start, end in self.__probe_ranges(head))
+        )
+
+        return self.buffer
@@ -0,0 +1,280 @@
+import asyncio
+import io
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import discord
+
+# Discord limits for a single message
+max_content_length = 2000
+max_embeds = 10
+max_embed_length = 6000
+# Discord allows 5 messages per 5 seconds in a channel
+channel_rate_limit = (5, 5.0)
+# Log messages sent per second over all log channels, which leaves room for command replies
+global_rate_limit = (10, 1.0)
+# Pending text entries are sent as one file instead, if they would need more messages than this
+overflow_messages = 3
+overflow_filename = "log.txt"
+
+
+@dataclass(slots=True)
+class LogEntry:
+    content: Optional[str]
+    embeds: list[discord.Embed]
+    files: list[discord.File]
+    # Other arguments of TextChannel.send, like allowed_mentions
+    kwargs: dict[str, Any]
+    future: asyncio.Future
+
+    @property
+    def is_batchable(self) -> bool:
+        # Files and other arguments can't be shared with other entries
+        return len(self.files) == 0 and len(self.kwargs) == 0
+
+    @property
+    def is_text(self) -> bool:
+        return self.is_batchable and len(self.embeds) == 0
+
+
+class RateLimitBucket:
+    """
+    Keeps track of the sends in the last period, to know when the next one is allowed.
+    """
+
+    def __init__(self, limit: int, period: float):
+        self.limit = limit
+        self.period = period
+        self._sends: deque[float] = deque()
+
+    def get_delay(self, now: float) -> float:
+        while len(self._sends) > 0 and self._sends[0] <= now - self.period:
+            self._sends.popleft()
+        if len(self._sends) < self.limit:
+            return 0
+        return self._sends[0] + self.period - now
+
+    def add(self, now: float):
+        self._sends.append(now)
+
+
+@dataclass(slots=True)
+class LogQueue:
+    channel_id: int
+    priority: int
+    bucket: RateLimitBucket
+    entries: deque[LogEntry] = field(default_factory=deque)
+
+
+class LogDestination:
+    """
+    Stands in for a log channel, so cogs can keep calling send() on it.
+    """
+
+    def __init__(self, sink: "LogSink", channel_id: int):
+        self.sink = sink
+        self.id = channel_id
+
+    async def send(
+        self, content: Optional[str] = None, **kwargs
+    ) -> Optional[discord.Message]:
+        return await self.sink.send(self.id, content, **kwargs)
+
+    def queue(self, content: Optional[str] = None, **kwargs) -> asyncio.Future:
+        return self.sink.queue(self.id, content, **kwargs)
+
+
+class LogSink:
+    """
+    Queues messages for the log channels and sends them in the background.
+
+    Consecutive entries are joined into one message, their text as lines and their embeds one after
+    the other, up to Discord's limits. A backlog of text entries, like the one of a purge, is sent
+    as a file.
+    Channels are served by priority (modlog, log, spylog, anything else) and every channel keeps its
+    own rate limit bucket, so log floods are delayed here instead of in discord.py, where they would
+    hold up command replies.
+    send() waits for the message an entry was sent in, like TextChannel.send, queue() doesn't.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.priorities: dict[int, int] = {}
+        for name in ("modlog_channel", "log_channel", "spylog_channel"):
+            channel_id = getattr(bot.config, name, None)
+            if channel_id is not None:
+                self.priorities.setdefault(channel_id, len(self.priorities))
+        self._queues: dict[int, LogQueue] = {}
+        self._global_bucket = RateLimitBucket(*global_rate_limit)
+        self._wakeup = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+        self.sent_messages = 0
+        self.sent_entries = 0
+
+    def __len__(self) -> int:
+        return sum(len(x.entries) for x in self._queues.values())
+
+    def get_destination(self, channel_id: int) -> LogDestination:
+        return LogDestination(self, channel_id)
+
+    async def send(
+        self, channel_id: int, content: Optional[str] = None, **kwargs
+    ) -> Optional[discord.Message]:
+        """
+        Queues a log entry and waits for the message it was sent in,
+        which is None if it couldn't be sent.
+        """
+        return await self.queue(channel_id, content, **kwargs)
+
+    def queue(
+        self,
+        channel_id: int,
+        content: Optional[str] = None,
+        *,
+        embed: Optional[discord.Embed] = None,
+        embeds: Optional[list[discord.Embed]] = None,
+        file: Optional[discord.File] = None,
+        files: Optional[list[discord.File]] = None,
+        **kwargs,
+    ) -> asyncio.Future:
+        """
+        Queues a log entry without waiting for it to be sent, and returns a future of the message
+        it was sent in. Other arguments are passed on to TextChannel.send, entries with them are
+        sent on their own.
+        """
+        queue = self._queues.get(channel_id)
+        if queue is None:
+            queue = LogQueue(
+                channel_id,
+                self.priorities.get(channel_id, len(self.priorities)),
+                RateLimitBucket(*channel_rate_limit),
+            )
+            self._queues[channel_id] = queue
+        future = asyncio.get_running_loop().create_future()
+        queue.entries.append(
+            LogEntry(
+                str(content) if content is not None else None,
+                ([embed] if embed is not None else []) + (embeds or []),
+                ([file] if file is not None else []) + (files or []),
+                kwargs,
+                future,
+            )
+        )
+        self._wakeup.set()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self.__run())
+        return future
+
+    def __take_overflow(self, queue: LogQueue) -> Optional[list[LogEntry]]:
+        entries = []
+        length = 0
+        for entry in queue.entries:
+            if not entry.is_text:
+                break
+            entries.append(entry)
+            length += len(entry.content or "") + 1
+        if len(entries) == 0 or (
+            length <= max_content_length * overflow_messages
+            and len(entries[0].content or "") <= max_content_length
+        ):
+            return None
+        for _ in entries:
+            queue.entries.popleft()
+        return entries
+
+    def __take_batch(self, queue: LogQueue) -> list[LogEntry]:
+        entries = [queue.entries.popleft()]
+        if not entries[0].is_batchable:
+            return entries
+        length = len(entries[0].content or "")
+        embed_count = len(entries[0].embeds)
+        embed_length = sum(len(x) for x in entries[0].embeds)
+        while len(queue.entries) > 0 and queue.entries[0].is_batchable:
+            entry = queue.entries[0]
+            length += len(entry.content or "") + 1
+            embed_count += len(entry.embeds)
+            embed_length += sum(len(x) for x in entry.embeds)
+            if (
+                length > max_content_length
+                or embed_count > max_embeds
+                or embed_length > max_embed_length
+            ):
+                break
+            entries.append(queue.entries.popleft())
+        return entries
+
+    async def __send(self, queue: LogQueue, entries: list[LogEntry], overflow: bool):
+        message = None
+        try:
+            channel = self.bot.get_channel(queue.channel_id)
+            if channel is None:
+                raise ValueError(f"Log channel {queue.channel_id} wasn't found")
+            if overflow:
+                text = "\n".join(x.content or "" for x in entries)
+                message = await channel.send(
+                    f"{len(entries)} log {'entry' if len(entries) == 1 else 'entries'}:",
+                    file=discord.File(
+                        io.BytesIO(text.encode("UTF-8")), filename=overflow_filename
+                    ),
+                )
+            else:
+                content = "\n".join(x.content for x in entries if x.content is not None)
+                message = await channel.send(
+                    content if len(content) > 0 else None,
+                    embeds=[y for x in entries for y in x.embeds],
+                    files=entries[0].files,
+                    **entries[0].kwargs,
+                )
+        except Exception as error:
+            self.bot.log.error(
+                f"Couldn't send {len(entries)} log entries to {queue.channel_id}: {error!r}"
+            )
+        finally:
+            self.sent_messages += 1
+            self.sent_entries += len(entries)
+            for entry in entries:
+                if not entry.future.done():
+                    entry.future.set_result(message)
+
+    async def __run(self):
+        while True:
+            self._wakeup.clear()
+            now = time.monotonic()
+            delay = self._global_bucket.get_delay(now)
+            queue = None
+            if delay == 0:
+                delay = None
+                for candidate in sorted(
+                    (x for x in self._queues.values() if len(x.entries) > 0),
+                    key=lambda x: x.priority,
+                ):
+                    candidate_delay = candidate.bucket.get_delay(now)
+                    if candidate_delay == 0:
+                        queue = candidate
+                        break
+                    if delay is None or candidate_delay < delay:
+                        delay = candidate_delay
+
+            if queue is None:
+                # Wait for a new entry, or for a bucket to allow the next send
+                timer = (
+                    asyncio.get_running_loop().call_later(delay, self._wakeup.set)
+                    if delay is not None
+                    else None
+                )
+                try:
+                    await self._wakeup.wait()
+                finally:
+                    if timer is not None:
+                        timer.cancel()
+                continue
+
+            entries = self.__take_overflow(queue)
+            overflow = entries is not None
+            if not overflow:
+                entries = self.__take_batch(queue)
+            queue.bucket.add(now)
+            self._global_bucket.add(now)
+            await self.__send(queue, entries, overflow)
@@ -0,0 +1,322 @@
+import asyncio
+import itertools
+import json
+import logging
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from typing import Any, Optional
+
+from robocop_ng.helpers.known_issues import KnownIssueMatcher
+from robocop_ng.helpers.log_models import serialise
+from robocop_ng.helpers.log_notes import NoteRuleSet
+from robocop_ng.helpers.ryujinx_log_analyser import LogAnalyser
+
+# Every message is a 4 byte big endian length followed by that many bytes of UTF-8 JSON
+message_header = struct.Struct(">I")
+max_message_size = 1000 * 1000 * 64
+request_timeout = 60
+connect_timeout = 5
+worker_start_timeout = 30
+
+
+class LogWorkerError(Exception):
+    pass
+
+
+def parse_address(address: str) -> tuple[Optional[str], Optional[str], Optional[int]]:
+    """
+    Parses a worker address, either "unix:<path>" or "<host>:<port>", into (path, host, port).
+    """
+    if address.startswith("unix:"):
+        return address[5:], None, None
+    host, _, port = address.rpartition(":")
+    if len(host) == 0 or not port.isdigit():
+        raise ValueError(f"Invalid log worker address: '{address}'")
+    return None, host, int(port)
+
+
+def encode_message(message: dict[str, Any]) -> bytes:
+    data = json.dumps(message, separators=(",", ":")).encode("UTF-8")
+    if len(data) > max_message_size:
+        raise LogWorkerError(f"Message of {len(data)} bytes is too large")
+    return message_header.pack(len(data)) + data
+
+
+async def read_message(reader: asyncio.StreamReader) -> Optional[dict[str, Any]]:
+    """
+    Reads the next message from the stream, or returns None if the stream was closed between messages.
+    """
+    try:
+        header = await reader.readexactly(message_header.size)
+    except asyncio.IncompleteReadError as error:
+        if len(error.partial) == 0:
+            return None
+        raise
+    (size,) = message_header.unpack(header)
+    if size > max_message_size:
+        raise LogWorkerError(f"Message of {size} bytes is too large")
+    return json.loads(await reader.readexactly(size))
+
+
+def analyse_log(
+    log_text: str,
+    is_channel_allowed: bool,
+    pr_channel: int,
+    note_rules: NoteRuleSet,
+    known_issues: KnownIssueMatcher,
+) -> dict[str, Any]:
+    """
+    Analyses a log for Discord and returns the result as plain data, the same way in-process and in a worker.
+    """
+    try:
+        analyser = LogAnalyser(log_text, note_rules)
+    except ValueError as error:
+        return {"error": "invalid_log", "message": str(error)}
+
+    analysed_log = analyser.analyse_discord(
+        is_channel_allowed, pr_channel, known_issues
+    )
+    return {
+        "analysed_log": serialise(analysed_log),
+        "error_signature": analyser.get_error_signature(),
+        "common_errors": [error.name for error in analyser.get_common_errors()],
+    }
+
+
+class LogWorker:
+    """
+    Analyses logs sent over a socket, one request per message and any number of requests per connection.
+
+    Note rules and known issue triggers are part of every request, so workers don't need access to the
+    bot's state directory. They are only recompiled when they change.
+    """
+
+    def __init__(self):
+        self._note_rules: tuple[Optional[str], Optional[NoteRuleSet]] = (None, None)
+        self._known_issues: tuple[Optional[str], Optional[KnownIssueMatcher]] = (
+            None,
+            None,
+        )
+
+    def __get_note_rules(self, rules: list[dict[str, Any]]) -> NoteRuleSet:
+        key = json.dumps(rules, sort_keys=True)
+        if self._note_rules[0] != key:
+            self._note_rules = (key, NoteRuleSet(rules))
+        return self._note_rules[1]
+
+    def __get_known_issues(self, triggers: dict[str, list[str]]) -> KnownIssueMatcher:
+        key = json.dumps(triggers, sort_keys=True)
+        if self._known_issues[0] != key:
+            self._known_issues = (key, KnownIssueMatcher(triggers))
+        return self._known_issues[1]
+
+    def handle_request(self, request: dict[str, Any]) -> dict[str, Any]:
+        try:
+            return analyse_log(
+                request["log_text"],
+                request["is_channel_allowed"],
+                request["pr_channel"],
+                self.__get_note_rules(request["note_rules"]),
+                self.__get_known_issues(request["known_issue_triggers"]),
+            )
+        except Exception as error:
+            # A log which breaks the parser only fails its own request
+            logging.exception("Log analysis failed")
+            return {"error": "failed", "message": f"{type(error).__name__}: {error}"}
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        try:
+            while (request := await read_message(reader)) is not None:
+                response = await asyncio.to_thread(self.handle_request, request)
+                writer.write(encode_message(response))
+                await writer.drain()
+        except (
+            asyncio.IncompleteReadError,
+            ConnectionError,
+            LogWorkerError,
+            json.JSONDecodeError,
+        ) as error:
+            logging.warning(f"Dropped log worker connection: {error!r}")
+        finally:
+            writer.close()
+
+    async def serve(self, address: str):
+        path, host, port = parse_address(address)
+        if path is not None:
+            server = await asyncio.start_unix_server(self.handle_connection, path)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+            # Port 0 binds any free port, which is reported instead
+            host, port = server.sockets[0].getsockname()[:2]
+            address = f"{host}:{port}"
+        # The first line on stdout tells launchers where the worker can be reached
+        print(address, flush=True)
+        async with server:
+            await server.serve_forever()
+
+
+class LogWorkerClient:
+    """
+    Sends logs to analysis workers, taking turns between them.
+
+    A worker which can't be reached is skipped for the next one. A worker which fails while analysing
+    is not retried elsewhere, since a log that crashes one worker would most likely crash all of them.
+    """
+
+    def __init__(self, addresses: list[str]):
+        self.addresses = addresses
+        self._next_worker = itertools.cycle(range(len(addresses)))
+
+    async def __connect(
+        self, address: str
+    ) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        path, host, port = parse_address(address)
+        if path is not None:
+            connection = asyncio.open_unix_connection(path)
+        else:
+            connection = asyncio.open_connection(host, port)
+        return await asyncio.wait_for(connection, connect_timeout)
+
+    async def request(self, request: dict[str, Any]) -> dict[str, Any]:
+        data = encode_message(request)
+        first_worker = next(self._next_worker)
+        for i in range(len(self.addresses)):
+            address = self.addresses[(first_worker + i) % len(self.addresses)]
+            try:
+                reader, writer = await self.__connect(address)
+            except (OSError, asyncio.TimeoutError) as error:
+                logging.warning(f"Log worker {address} is unavailable: {error!r}")
+                continue
+
+            try:
+                writer.write(data)
+                await writer.drain()
+                response = await asyncio.wait_for(read_message(reader), request_timeout)
+            except (
+                OSError,
+                asyncio.TimeoutError,
+                asyncio.IncompleteReadError,
+            ) as error:
+                raise LogWorkerError(
+                    f"Log worker {address} failed: {error!r}"
+                ) from error
+            finally:
+                writer.close()
+            if response is None:
+                raise LogWorkerError(f"Log worker {address} closed the connection")
+            return response
+        raise LogWorkerError("No log worker is available")
+
+    async def analyse(
+        self,
+        log_text: str,
+        is_channel_allowed: bool,
+        pr_channel: int,
+        note_rules: NoteRuleSet,
+        known_issues: KnownIssueMatcher,
+    ) -> dict[str, Any]:
+        response = await self.request(
+            {
+                "log_text": log_text,
+                "is_channel_allowed": is_channel_allowed,
+                "pr_channel": pr_channel,
+                "note_rules": note_rules.rules,
+                "known_issue_triggers": known_issues.triggers,
+            }
+        )
+        if response.get("error") == "failed":
+            raise LogWorkerError(response["message"])
+        return response
+
+
+class LocalLogWorkers:
+    """
+    Starts log workers as child processes on this machine, as a stand-in for deployed workers.
+
+    Workers listen on Unix sockets in a temporary directory, or on free localhost ports where Unix sockets
+    aren't available. Use it as an async context manager, which returns the worker addresses.
+    """
+
+    def __init__(self, count: int = 1):
+        self.count = count
+        self.addresses: list[str] = []
+        self._processes: list[asyncio.subprocess.Process] = []
+        self._socket_dir: Optional[str] = None
+
+    async def __start_worker(self, address: str) -> str:
+        process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-m",
+            "robocop_ng.helpers.log_worker",
+            address,
+            stdout=asyncio.subprocess.PIPE,
+            # Workers import the same robocop_ng package as the launcher
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        )
+        self._processes.append(process)
+        line = await asyncio.wait_for(process.stdout.readline(), worker_start_timeout)
+        if len(line) == 0:
+            raise LogWorkerError(f"Log worker exited with code {await process.wait()}")
+        return line.decode("UTF-8").strip()
+
+    async def start(self) -> list[str]:
+        if hasattr(asyncio, "start_unix_server"):
+            self._socket_dir = tempfile.mkdtemp(prefix="robocop_log_workers_")
+            addresses = [
+                f"unix:{os.path.join(self._socket_dir, f'worker_{i}.sock')}"
+                for i in range(self.count)
+            ]
+        else:
+            addresses = ["127.0.0.1:0"] * self.count
+        try:
+            self.addresses = list(
+                await asyncio.gather(*(self.__start_worker(x) for x in addresses))
+            )
+        except BaseException:
+            await self.stop()
+            raise
+        return self.addresses
+
+    async def stop(self):
+        for process in self._processes:
+            if process.returncode is None:
+                process.terminate()
+        for process in self._processes:
+            await process.wait()
+        self._processes = []
+        self.addresses = []
+        if self._socket_dir is not None:
+            shutil.rmtree(self._socket_dir, ignore_errors=True)
+            self._socket_dir = None
+
+    async def __aenter__(self) -> list[str]:
+        return await self.start()
+
+    async def __aexit__(self, *_):
+        await self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Runs a log analysis worker.")
+    parser.add_argument(
+        "address",
+        type=str,
+        help='"unix:<path>" for a Unix socket or "<host>:<port>" for TCP',
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        format="[%(asctime)s] {%(filename)s:%(lineno)d} %(levelname)s - %(message)s",
+        level=logging.INFO,
+    )
+    try:
+        asyncio.run(LogWorker().serve(args.address))
+    except KeyboardInterrupt:
+        pass
@@ -3,12 +3,17 @@ import os
 from typing import Optional, Union
 
 from robocop_ng.helpers.data_loader import read_json
+from robocop_ng.helpers.known_issues import KnownIssueMatcher
 
 
 def get_macros_path(bot):
     return os.path.join(bot.state_dir, "data/macros.json")
 
 
+def get_macro_triggers_path(bot):
+    return os.path.join(bot.state_dir, "data/macro_triggers.json")
+
+
 def get_macros_dict(bot) -> dict[str, dict[str, Union[list[str], str]]]:
     macros = read_json(bot, get_macros_path(bot))
     if len(macros) > 0:
@@ -140,3 +145,53 @@ def clear_aliases(bot, key: str) -> bool:
         set_macros(bot, macros)
         return True
     return False
+
+
+def get_macro_triggers(bot) -> dict[str, list[str]]:
+    macro_triggers = read_json(bot, get_macro_triggers_path(bot))
+    if "triggers" not in macro_triggers.keys():
+        return {}
+    return macro_triggers["triggers"]
+
+
+def set_macro_triggers(bot, contents: dict[str, list[str]]):
+    with open(get_macro_triggers_path(bot), "w") as f:
+        json.dump({"triggers": contents}, f)
+    # The matcher is rebuilt on its next use
+    bot.known_issue_matcher = None
+
+
+def get_known_issue_matcher(bot) -> KnownIssueMatcher:
+    matcher = getattr(bot, "known_issue_matcher", None)
+    if matcher is None:
+        matcher = KnownIssueMatcher(get_macro_triggers(bot))
+        bot.known_issue_matcher = matcher
+    return matcher
+
+
+def add_macro_trigger(bot, key: str, trigger: str) -> bool:
+    key = key.lower()
+    trigger = trigger.strip().lower()
+    if get_macro(bot, key) is None or len(trigger) == 0:
+        return False
+    macro_triggers = get_macro_triggers(bot)
+    if trigger not in macro_triggers.keys():
+        macro_triggers[trigger] = []
+    if key in macro_triggers[trigger]:
+        return False
+    macro_triggers[trigger].append(key)
+    set_macro_triggers(bot, macro_triggers)
+    return True
+
+
+def remove_macro_trigger(bot, key: str, trigger: str) -> bool:
+    key = key.lower()
+    trigger = trigger.strip().lower()
+    macro_triggers = get_macro_triggers(bot)
+    if trigger not in macro_triggers.keys() or key not in macro_triggers[trigger]:
+        return False
+    macro_triggers[trigger].remove(key)
+    if len(macro_triggers[trigger]) == 0:
+        del macro_triggers[trigger]
+    set_macro_triggers(bot, macro_triggers)
+    return True
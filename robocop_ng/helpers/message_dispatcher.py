@@ -0,0 +1,138 @@
+import asyncio
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from discord import Message
+
+
+@dataclass(slots=True)
+class MessageHandler:
+    name: str
+    callback: Callable[[Message], Awaitable[Any]]
+    # None handles messages from every channel
+    channels: Optional[frozenset[int]] = None
+    requires_attachments: bool = False
+    ignore_bots: bool = True
+    # Cheap check on the message content, the handler still does its own validation
+    content_pattern: Optional[re.Pattern] = None
+    calls: int = 0
+    errors: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+    def accepts(self, message: Message) -> bool:
+        if self.ignore_bots and message.author.bot:
+            return False
+        if self.requires_attachments and len(message.attachments) == 0:
+            return False
+        if (
+            self.content_pattern is not None
+            and self.content_pattern.search(message.content) is None
+        ):
+            return False
+        return True
+
+
+class MessageDispatcher:
+    """
+    Routes new messages to the handlers cogs registered for them.
+
+    Handlers are indexed by channel ID, so a message only reaches the handlers listening in its channel
+    and the ones listening everywhere. Every handler runs in its own task, like a listener would.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.handlers: dict[str, MessageHandler] = {}
+        self._channel_handlers: dict[int, list[MessageHandler]] = {}
+        self._global_handlers: list[MessageHandler] = []
+        self._tasks: set[asyncio.Task] = set()
+        self.dispatched = 0
+
+    def __rebuild_routes(self):
+        self._channel_handlers = {}
+        self._global_handlers = []
+        for handler in self.handlers.values():
+            if handler.channels is None:
+                self._global_handlers.append(handler)
+                continue
+            for channel_id in handler.channels:
+                self._channel_handlers.setdefault(channel_id, []).append(handler)
+
+    def register(
+        self,
+        name: str,
+        callback: Callable[[Message], Awaitable[Any]],
+        channels: Optional[Iterable[int]] = None,
+        requires_attachments: bool = False,
+        ignore_bots: bool = True,
+        content_pattern: Optional[re.Pattern] = None,
+    ):
+        self.handlers[name] = MessageHandler(
+            name,
+            callback,
+            frozenset(channels) if channels is not None else None,
+            requires_attachments,
+            ignore_bots,
+            content_pattern,
+        )
+        self.__rebuild_routes()
+
+    def unregister(self, name: str):
+        if self.handlers.pop(name, None) is not None:
+            self.__rebuild_routes()
+
+    def get_handlers(self, message: Message) -> list[MessageHandler]:
+        return [
+            handler
+            for handlers in (
+                self._channel_handlers.get(message.channel.id, ()),
+                self._global_handlers,
+            )
+            for handler in handlers
+            if handler.accepts(message)
+        ]
+
+    async def __run(self, handler: MessageHandler, message: Message):
+        await self.bot.wait_until_ready()
+        start_time = time.perf_counter()
+        try:
+            await handler.callback(message)
+        except Exception:
+            handler.errors += 1
+            await self.bot.on_error(f"on_message:{handler.name}", message)
+        finally:
+            elapsed_time = time.perf_counter() - start_time
+            handler.calls += 1
+            handler.total_time += elapsed_time
+            handler.max_time = max(handler.max_time, elapsed_time)
+
+    def dispatch(self, message: Message) -> int:
+        """
+        Starts the handlers for a new message and returns how many were started.
+        """
+        self.dispatched += 1
+        handlers = self.get_handlers(message)
+        for handler in handlers:
+            task = asyncio.create_task(self.__run(handler, message))
+            # Keep a reference until the task is done, so it isn't garbage collected
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return len(handlers)
+
+    def format_stats(self) -> str:
+        lines = [
+            f"{'Handler':<22} {'Calls':>8} {'Errors':>6} {'Avg':>9} {'Max':>9}",
+        ]
+        for handler in sorted(
+            self.handlers.values(), key=lambda x: x.total_time, reverse=True
+        ):
+            average_time = handler.total_time / handler.calls if handler.calls else 0
+            lines.append(
+                f"{handler.name:<22} {handler.calls:>8} {handler.errors:>6} "
+                f"{average_time * 1000:>6.1f} ms {handler.max_time * 1000:>6.1f} ms"
+            )
+        lines.append(f"{self.dispatched} messages dispatched")
+        return "\n".join(lines)
@@ -0,0 +1,170 @@
+import datetime
+import re
+import time
+from typing import Optional
+
+import discord
+
+default_raid_detection = {
+    "window": 60,
+    "joins": 20,
+    "age_bucket_joins": 10,
+    "invite_joins": 15,
+    "name_joins": 5,
+    "raid_mode_duration": 600,
+    "action": None,
+    "quarantine_role": 0,
+}
+
+# Upper bounds of the account age buckets, joins of accounts older than the last one aren't counted
+account_age_buckets = [
+    ("1 hour", datetime.timedelta(hours=1)),
+    ("1 day", datetime.timedelta(days=1)),
+    ("1 week", datetime.timedelta(weeks=1)),
+    ("1 month", datetime.timedelta(days=30)),
+]
+name_key_regex = re.compile(r"[\W\d_]+")
+
+
+def get_age_bucket(age: datetime.timedelta) -> Optional[str]:
+    for name, max_age in account_age_buckets:
+        if age < max_age:
+            return name
+    return None
+
+
+def get_name_key(name: str) -> str:
+    """
+    Reduces a name to its letters, so "raider_01" and "Raider 02" are counted together.
+    """
+    return name_key_regex.sub("", name).lower()
+
+
+class SlidingWindowCounter:
+    """
+    Counts the events of the last window seconds in a ring of fixed size buckets.
+
+    Adding and counting only clear the buckets which left the window since the last call,
+    so both take constant time.
+    """
+
+    def __init__(self, window: float, resolution: int = 10):
+        self.bucket_width = window / resolution
+        self._buckets = [0] * resolution
+        self._bucket_index = 0
+        self._total = 0
+
+    def __advance(self, now: float):
+        bucket_index = int(now // self.bucket_width)
+        if bucket_index <= self._bucket_index:
+            return
+        # Buckets which left the window are cleared, at most the whole ring once
+        steps = min(bucket_index - self._bucket_index, len(self._buckets))
+        for i in range(self._bucket_index + 1, self._bucket_index + 1 + steps):
+            self._total -= self._buckets[i % len(self._buckets)]
+            self._buckets[i % len(self._buckets)] = 0
+        self._bucket_index = bucket_index
+
+    def add(self, now: float) -> int:
+        self.__advance(now)
+        self._buckets[self._bucket_index % len(self._buckets)] += 1
+        self._total += 1
+        return self._total
+
+    def count(self, now: float) -> int:
+        self.__advance(now)
+        return self._total
+
+
+class KeyedWindowCounter:
+    """
+    Sliding window counters by key. Keys without events in the window are dropped once per window.
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+        self._counters: dict[str, SlidingWindowCounter] = {}
+        self._next_prune = 0.0
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+    def add(self, key: str, now: float) -> int:
+        if now >= self._next_prune:
+            self._counters = {
+                k: v for k, v in self._counters.items() if v.count(now) > 0
+            }
+            self._next_prune = now + self.window
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = SlidingWindowCounter(self.window)
+            self._counters[key] = counter
+        return counter.add(now)
+
+
+class RaidDetector:
+    """
+    Counts recent joins in total, per account age bucket, per invite and per similar name,
+    and switches to raid mode when one of the counts goes over its threshold.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.settings = {
+            **default_raid_detection,
+            **getattr(bot.config, "raid_detection", {}),
+        }
+        window = self.settings["window"]
+        self._joins = SlidingWindowCounter(window)
+        self._age_buckets = KeyedWindowCounter(window)
+        self._invites = KeyedWindowCounter(window)
+        self._names = KeyedWindowCounter(window)
+        self.raid_mode_until = 0.0
+
+    def is_raid_mode(self, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.monotonic()) < self.raid_mode_until
+
+    def set_raid_mode(self, enabled: bool, now: Optional[float] = None):
+        now = now if now is not None else time.monotonic()
+        self.raid_mode_until = (
+            now + self.settings["raid_mode_duration"] if enabled else 0.0
+        )
+
+    def record_join(
+        self,
+        member: discord.Member,
+        invite_code: Optional[str] = None,
+        now: Optional[float] = None,
+    ) -> list[str]:
+        """
+        Counts a join and returns the thresholds it went over, if it enabled raid mode.
+        While raid mode is on, going over a threshold only extends it.
+        """
+        now = now if now is not None else time.monotonic()
+        reasons = []
+        joins = self._joins.add(now)
+        if joins >= self.settings["joins"]:
+            reasons.append(f"{joins} joins")
+
+        age_bucket = get_age_bucket(member.joined_at - member.created_at)
+        if age_bucket is not None:
+            joins = self._age_buckets.add(age_bucket, now)
+            if joins >= self.settings["age_bucket_joins"]:
+                reasons.append(f"{joins} joins of accounts younger than {age_bucket}")
+
+        if invite_code is not None:
+            joins = self._invites.add(invite_code, now)
+            if joins >= self.settings["invite_joins"]:
+                reasons.append(f"{joins} joins with invite {invite_code}")
+
+        name_key = get_name_key(member.name)
+        if len(name_key) > 0:
+            joins = self._names.add(name_key, now)
+            if joins >= self.settings["name_joins"]:
+                reasons.append(f"{joins} joins named like {name_key}")
+
+        if len(reasons) == 0:
+            return []
+        was_raid_mode = self.is_raid_mode(now)
+        self.set_raid_mode(True, now)
+        return [] if was_raid_mode else reasons
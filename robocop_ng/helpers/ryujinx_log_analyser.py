@@ -1,8 +1,31 @@
+import hashlib
 import re
+import time
+import tracemalloc
 from enum import IntEnum, auto
-from typing import Optional, Union
+from typing import Any, Callable, Iterator, Optional, Union
 
 from robocop_ng.helpers.disabled_ids import is_build_id_valid
+from robocop_ng.helpers.known_issues import KnownIssueMatcher
+from robocop_ng.helpers.log_models import (
+    AnalysedLog,
+    AnisotropicFiltering,
+    AspectRatio,
+    ConsoleMode,
+    EmulatorInfo,
+    GameInfo,
+    HardwareInfo,
+    LogNotes,
+    ResolutionScale,
+    Settings,
+    Toggle,
+)
+from robocop_ng.helpers.log_notes import (
+    NoteRuleSet,
+    NoteSeverity,
+    default_note_rule_set,
+)
+from robocop_ng.helpers.log_patterns import log_patterns, log_setting_keys
 from robocop_ng.helpers.size import Size
 
 
@@ -28,31 +51,33 @@ class RyujinxVersion(IntEnum):
 
 class LogAnalyser:
     _log_text: str
+    # Offset of the first log entry, anything before it is a download header
+    _log_start: int
+    # (boot start, boot end, start, end) offsets of every game session in the log text
+    _sessions: list[tuple[int, int, int, int]]
+    _session: tuple[int, int, int, int]
     _log_errors: list[list[str]]
-    _hardware_info: dict[str, Optional[str]]
-    _emu_info: dict[str, Optional[str]]
-    _game_info: dict[str, Optional[str]]
-    _settings: dict[str, Optional[str]]
-    _notes: Union[set[str], list[str]]
+    _hardware_info: HardwareInfo
+    _emu_info: EmulatorInfo
+    _game_info: GameInfo
+    _settings: Settings
+    _notes: LogNotes
+    _note_rules: NoteRuleSet
+    _profile: Optional[list[dict[str, Union[str, int, float]]]]
 
     @staticmethod
     def is_homebrew(log_file: str) -> bool:
-        return (
-            re.search("Load.*Application: Loading as [Hh]omebrew", log_file) is not None
-        )
+        return log_patterns["homebrew"].search(log_file) is not None
 
     @staticmethod
     def get_filepaths(log_file: str) -> set[str]:
         return set(
-            x.rstrip("\u0000")
-            for x in re.findall(r"(?:[A-Za-z]:)?(?:[\\/]+[^\\/:\"\r\n]+)+", log_file)
+            x.rstrip("\u0000") for x in log_patterns["file_path"].findall(log_file)
         )
 
     @staticmethod
     def get_main_ro_section(log_file: str) -> Optional[dict[str, str]]:
-        ro_section_matches = re.findall(
-            r"PrintRoSectionInfo: main:[\r\n]((?:\s+.*[\r\n])*)", log_file
-        )
+        ro_section_matches = log_patterns["ro_section"].findall(log_file)
         if ro_section_matches and len(ro_section_matches) > 0:
             ro_section_match: str = ro_section_matches[-1]
             ro_section = {"module": "", "sdk_libraries": []}
@@ -75,22 +100,15 @@ class LogAnalyser:
     def get_app_info(
         log_file: str,
     ) -> Optional[tuple[str, str, str, list[str], dict[str, str]]]:
-        game_name_match = re.findall(
-            r"Loader [A-Za-z]*: Application Loaded:\s([^;\n\r]*)",
-            log_file,
-            re.MULTILINE,
-        )
+        game_name_match = log_patterns["app_name"].findall(log_file)
         if game_name_match:
             game_name = game_name_match[-1].rstrip()
-            app_id_match = re.match(r".* \[([a-zA-Z0-9]*)\]", game_name)
+            app_id_match = log_patterns["app_id"].match(game_name)
             if app_id_match:
                 app_id = app_id_match.group(1).strip().upper()
             else:
                 app_id = ""
-            bids_match_all = re.findall(
-                r"Build ids found for (?:title|application) ([a-zA-Z0-9]*):[\n\r]*((?:\s+.*[\n\r]+)+)",
-                log_file,
-            )
+            bids_match_all = log_patterns["build_ids"].findall(log_file)
             if bids_match_all and len(bids_match_all) > 0:
                 bids_match: tuple[str] = bids_match_all[-1]
                 app_id_from_bids = None
@@ -122,78 +140,201 @@ class LogAnalyser:
                     return True
         return False
 
-    def __init__(self, log_text: Union[str, list[str]]):
-        self.__init_members()
+    def __init__(
+        self,
+        log_text: Union[str, list[str]],
+        note_rules: Optional[NoteRuleSet] = None,
+    ):
+        self._note_rules = (
+            note_rules if note_rules is not None else default_note_rule_set
+        )
+        self._profile = None
+        self.__run_stages(log_text)
+
+    def __get_stage_range(self, name: str) -> tuple[int, int]:
+        """
+        Returns the (start, end) offsets of the log text searched by a stage.
+        """
+        log_end = len(self._log_text)
+        match name:
+            case "header":
+                return 0, self._log_start
+            case "sessions":
+                return self._log_start, log_end
+            case "errors" | "app_name" | "cheats":
+                _, _, start, end = self._session
+                return start, end
+            case "hardware" | "settings" | "emu_info":
+                # Values logged before the session started are searched too
+                _, _, _, end = self._session
+                return self._log_start, end
+            case "mods":
+                boot_start, boot_end, _, _ = self._session
+                return boot_start, boot_end
+            case "notes":
+                # The default user profile is searched in the whole log
+                return self._log_start, log_end
+            case _:
+                return 0, log_end
+
+    def __run_stage(self, name: str, stage: Callable[..., Any], *args) -> Any:
+        if self._profile is None:
+            return stage(*args)
+
+        tracemalloc.reset_peak()
+        memory_before, _ = tracemalloc.get_traced_memory()
+        start_time = time.perf_counter()
+        result = stage(*args)
+        elapsed_time = time.perf_counter() - start_time
+        _, memory_peak = tracemalloc.get_traced_memory()
+        scan_start, scan_end = self.__get_stage_range(name)
+
+        self._profile.append(
+            {
+                "stage": name,
+                "time_ms": elapsed_time * 1000,
+                "peak_memory": memory_peak - memory_before,
+                "scanned_bytes": scan_end - scan_start,
+            }
+        )
+        return result
 
+    def __run_stages(self, log_text: Union[str, list[str]]):
+        self.__run_stage("header", self.__load_log_text, log_text)
+        self.__run_stage("sessions", self.__get_sessions)
+        # The last session is the one users are asking about
+        self.__analyse_session(self._sessions[-1])
+
+    def __analyse_session(self, session: tuple[int, int, int, int]):
+        self.__init_members()
+        self._session = session
+        self.__run_stage("errors", self.__get_errors)
+        self.__run_stage("hardware", self.__get_hardware_info)
+        self.__run_stage("settings", self.__get_settings_info)
+        self.__run_stage("emu_info", self.__get_ryujinx_info)
+        self.__run_stage("app_name", self.__get_app_name)
+        self.__run_stage("mods", self.__get_mods)
+        self.__run_stage("cheats", self.__get_cheats)
+        self.__run_stage("notes", self.__get_notes)
+
+    def __load_log_text(self, log_text: Union[str, list[str]]):
+        # The log text is kept as it was received and never copied: extractors search it between offsets
+        # and accept both \n and \r\n line endings, so only the values they match are turned into new strings
         if isinstance(log_text, str):
-            self._log_text = log_text.replace("\r\n", "\n")
+            self._log_text = log_text
         elif isinstance(log_text, list):
             self._log_text = "\n".join(log_text)
         else:
             raise TypeError(log_text)
 
         # Large files show a header value when not downloaded completely
-        # this regex makes sure that the log text to read starts from the first timestamp, ignoring headers
-        log_file_header_regex = re.compile(r"\d{2}:\d{2}:\d{2}\.\d{3}.*", re.DOTALL)
-        log_file_match = re.search(log_file_header_regex, self._log_text)
-        if log_file_match and log_file_match.group(0) is not None:
-            self._log_text = log_file_match.group(0)
-        else:
+        # the log text to read starts from the first timestamp, ignoring headers
+        log_file_match = log_patterns["log_start"].search(self._log_text)
+        if log_file_match is None:
             raise ValueError("No log entries found.")
-
-        self.__get_errors()
-        self.__get_hardware_info()
-        self.__get_settings_info()
-        self.__get_ryujinx_info()
-        self.__get_app_name()
-        self.__get_mods()
-        self.__get_cheats()
-        self.__get_notes()
+        self._log_start = log_file_match.start()
 
     def __init_members(self):
-        self._hardware_info = {
-            "cpu": "Unknown",
-            "gpu": "Unknown",
-            "ram": "Unknown",
-            "os": "Unknown",
-        }
-        self._emu_info = {
-            "ryu_version": "Unknown",
-            "ryu_firmware": "Unknown",
-            "logs_enabled": None,
-        }
-        self._game_info = {
-            "game_name": "Unknown",
-            "errors": "No errors found in log",
-            "mods": "No mods found",
-            "cheats": "No cheats found",
-        }
-        self._settings = {
-            "audio_backend": "Unknown",
-            "backend_threading": "Unknown",
-            "docked": "Unknown",
-            "expand_ram": "Unknown",
-            "fs_integrity": "Unknown",
-            "graphics_backend": "Unknown",
-            "ignore_missing_services": "Unknown",
-            "memory_manager": "Unknown",
-            "pptc": "Unknown",
-            "shader_cache": "Unknown",
-            "vsync": "Unknown",
-            "hypervisor": "Unknown",
-            "resolution_scale": "Unknown",
-            "anisotropic_filtering": "Unknown",
-            "aspect_ratio": "Unknown",
-            "texture_recompression": "Unknown",
-        }
-        self._notes = set()
+        self._hardware_info = HardwareInfo()
+        self._emu_info = EmulatorInfo()
+        self._game_info = GameInfo()
+        self._settings = Settings()
+        self._notes = LogNotes()
         self._log_errors = []
 
+    def __get_sessions(self):
+        """
+        Splits the log into game sessions at every "Application Loaded" line, in a single pass.
+
+        A session starts at its "Application Loaded" line and ends where the next one starts, except the first one
+        which also contains the log header. Its boot is what was logged between the previous and its own
+        "Application Loaded" line, since some of the session's information is logged while the game is loading.
+        The boot of the last session extends to the end of the log.
+        Sessions are kept as offsets into the log text, so no part of the log is copied.
+        """
+        log_text = self._log_text
+        sessions = []
+        boot_start = self._log_start
+        start = self._log_start
+        previous_app_loaded_end = self._log_start
+        for i, app_loaded_match in enumerate(
+            log_patterns["app_loaded_line"].finditer(log_text, self._log_start)
+        ):
+            if i > 0:
+                line_start = (
+                    log_text.rfind("\n", self._log_start, app_loaded_match.start()) + 1
+                )
+                sessions.append(
+                    (boot_start, previous_app_loaded_end, start, line_start)
+                )
+                boot_start = previous_app_loaded_end
+                start = line_start
+            previous_app_loaded_end = app_loaded_match.end()
+        sessions.append((boot_start, len(log_text), start, len(log_text)))
+        self._sessions = sessions
+
+    @property
+    def session_count(self) -> int:
+        return len(self._sessions)
+
+    def __get_line(self, start: int, end: int) -> str:
+        log_text = self._log_text
+        if end > start and log_text[end - 1] == "\r":
+            end -= 1
+        return log_text[start:end]
+
+    def __iter_error_lines(self, start: int, end: int) -> Iterator[str]:
+        """
+        Yields the lines which can be part of an error: every line from the first error on which either
+        contains an error or starts with a space.
+
+        Both kinds of lines are located with str.find, so the lines in between are never split or copied.
+        """
+        log_text = self._log_text
+        error_pos = log_text.find("|E|", start, end)
+        if error_pos == -1:
+            return
+        error_line_start = max(log_text.rfind("\n", start, error_pos) + 1, start)
+        line_start = error_line_start
+        indent_pos = line_start
+        while True:
+            line_end = log_text.find("\n", line_start, end)
+            if line_end == -1:
+                line_end = end
+            yield self.__get_line(line_start, line_end)
+            if line_end >= end:
+                return
+
+            # Both positions are only searched again once they were passed, so the log is scanned once
+            if error_pos != -1 and error_pos < line_end:
+                error_pos = log_text.find("|E|", line_end, end)
+                if error_pos != -1:
+                    error_line_start = log_text.rfind("\n", line_end, error_pos) + 1
+            if indent_pos != -1 and indent_pos < line_end:
+                indent_pos = log_text.find("\n ", line_end, end)
+            next_lines = []
+            if error_pos != -1:
+                next_lines.append(error_line_start)
+            if indent_pos != -1:
+                next_lines.append(indent_pos + 1)
+            if len(next_lines) == 0:
+                return
+            line_start = min(next_lines)
+
+    def __search_last(
+        self, regex: re.Pattern, start: int, end: int
+    ) -> Optional[re.Match]:
+        last_match = None
+        for match in regex.finditer(self._log_text, start, end):
+            last_match = match
+        return last_match
+
     def __get_errors(self):
+        _, _, start, end = self._session
         errors = []
         curr_error_lines = []
         error_line = False
-        for line in self._log_text.splitlines():
+        for line in self.__iter_error_lines(start, end):
             if len(line.strip()) == 0:
                 continue
             if "|E|" in line:
@@ -208,423 +349,273 @@ class LogAnalyser:
         self._log_errors = errors
 
     def __get_hardware_info(self):
-        for setting in self._hardware_info.keys():
-            match setting:
-                case "cpu":
-                    cpu_match = re.search(
-                        r"CPU:\s([^;\n\r]*)", self._log_text, re.MULTILINE
-                    )
-                    if cpu_match is not None and cpu_match.group(1) is not None:
-                        self._hardware_info[setting] = cpu_match.group(1).rstrip()
-
-                case "ram":
-                    sizes = "|".join(Size.names())
-                    ram_match = re.search(
-                        rf"RAM: Total ([\d.]+) ({sizes}) ; Available ([\d.]+) ({sizes})",
-                        self._log_text,
-                        re.MULTILINE,
-                    )
-                    if ram_match is not None:
-                        try:
-                            dest_unit = Size.MiB
-
-                            ram_available = float(ram_match.group(3))
-                            ram_available = Size.from_name(ram_match.group(4)).convert(
-                                ram_available, dest_unit
-                            )
-
-                            ram_total = float(ram_match.group(1))
-                            ram_total = Size.from_name(ram_match.group(2)).convert(
-                                ram_total, dest_unit
-                            )
-
-                            self._hardware_info[setting] = (
-                                f"{ram_available:.0f}/{ram_total:.0f} {dest_unit.name}"
-                            )
-                        except ValueError:
-                            # ram_match.group(1) or ram_match.group(3) couldn't be parsed as a float.
-                            self._hardware_info[setting] = "Error"
-
-                case "os":
-                    os_match = re.search(
-                        r"Operating System:\s([^;\n\r]*)",
-                        self._log_text,
-                        re.MULTILINE,
-                    )
-                    if os_match is not None and os_match.group(1) is not None:
-                        self._hardware_info[setting] = os_match.group(1).rstrip()
-
-                case "gpu":
-                    gpu_match = re.search(
-                        r"PrintGpuInformation:\s([^;\n\r]*)",
-                        self._log_text,
-                        re.MULTILINE,
-                    )
-                    if gpu_match is not None and gpu_match.group(1) is not None:
-                        self._hardware_info[setting] = gpu_match.group(1).rstrip()
-
-                case _:
-                    raise NotImplementedError(setting)
+        # Hardware is logged once at startup, except for the GPU which is logged for every game boot
+        _, _, _, end = self._session
+        cpu_match = log_patterns["cpu"].search(self._log_text, self._log_start, end)
+        if cpu_match is not None and cpu_match.group(1) is not None:
+            self._hardware_info.cpu = cpu_match.group(1).rstrip()
+
+        ram_match = log_patterns["ram"].search(self._log_text, self._log_start, end)
+        if ram_match is not None:
+            try:
+                dest_unit = Size.MiB
+
+                ram_available = float(ram_match.group(3))
+                ram_available = Size.from_name(ram_match.group(4)).convert(
+                    ram_available, dest_unit
+                )
+
+                ram_total = float(ram_match.group(1))
+                ram_total = Size.from_name(ram_match.group(2)).convert(
+                    ram_total, dest_unit
+                )
+
+                self._hardware_info.ram = (
+                    f"{ram_available:.0f}/{ram_total:.0f} {dest_unit.name}"
+                )
+            except ValueError:
+                # ram_match.group(1) or ram_match.group(3) couldn't be parsed as a float.
+                self._hardware_info.ram = "Error"
+
+        os_match = log_patterns["os"].search(self._log_text, self._log_start, end)
+        if os_match is not None and os_match.group(1) is not None:
+            self._hardware_info.os = os_match.group(1).rstrip()
+
+        gpu_match = self.__search_last(log_patterns["gpu"], self._log_start, end)
+        if gpu_match is not None and gpu_match.group(1) is not None:
+            self._hardware_info.gpu = gpu_match.group(1).rstrip()
 
     def __get_ryujinx_info(self):
-        for setting in self._emu_info.keys():
-            match setting:
-                case "ryu_version":
-                    for line in self._log_text.splitlines():
-                        if "Ryujinx Version:" in line:
-                            self._emu_info[setting] = line.split()[-1].strip()
-                            break
-
-                case "logs_enabled":
-                    logs_match = re.search(
-                        r"Logs Enabled:\s([^;\n\r]*)", self._log_text, re.MULTILINE
-                    )
-                    if logs_match is not None and logs_match.group(1) is not None:
-                        self._emu_info[setting] = logs_match.group(1).rstrip()
-
-                case "ryu_firmware":
-                    for line in self._log_text.splitlines():
-                        if "Firmware Version:" in line:
-                            self._emu_info[setting] = line.split()[-1].strip()
-                            break
-
-                case _:
-                    raise NotImplementedError(setting)
-
-    def __get_setting_value(self, name, key):
-        values = [
-            line.split()[-1]
-            for line in self._log_text.splitlines()
-            if re.search(rf"LogValueChange: ({key})\s", line)
-        ]
-        if len(values) > 0:
-            value = values[-1]
-        else:
+        _, _, _, end = self._session
+        version_match = log_patterns["ryujinx_version"].search(
+            self._log_text, self._log_start, end
+        )
+        if version_match is not None:
+            self._emu_info.ryu_version = version_match.group(0).split()[-1].strip()
+
+        logs_match = log_patterns["logs_enabled"].search(
+            self._log_text, self._log_start, end
+        )
+        if logs_match is not None and logs_match.group(1) is not None:
+            self._emu_info.logs_enabled = logs_match.group(1).rstrip()
+
+        # The firmware can be installed between sessions, so the latest one before the session ends is used
+        firmware_match = self.__search_last(
+            log_patterns["firmware_version"], self._log_start, end
+        )
+        if firmware_match is not None:
+            self._emu_info.ryu_firmware = firmware_match.group(0).split()[-1].strip()
+
+    def __get_setting_value(self, name: str, value: Optional[str]):
+        if value is None:
             return None
 
         match name:
             case "docked":
-                return "Docked" if value == "True" else "Handheld"
+                return ConsoleMode.from_log_value(value)
 
             case "resolution_scale":
-                resolution_map = {
-                    "-1": "Custom",
-                    "1": "Native (720p/1080p)",
-                    "2": "2x (1440p/2160p)",
-                    "3": "3x (2160p/3240p)",
-                    "4": "4x (2880p/4320p)",
-                }
-                if value in resolution_map.keys():
-                    return resolution_map[value]
-                else:
-                    return "Custom"
+                return ResolutionScale.from_log_value(value)
 
             case "anisotropic_filtering":
-                anisotropic_map = {
-                    "-1": "Auto",
-                    "2": "2x",
-                    "4": "4x",
-                    "8": "8x",
-                    "16": "16x",
-                }
-                if value in anisotropic_map.keys():
-                    return anisotropic_map[value]
-                else:
-                    return "Auto"
+                return AnisotropicFiltering.from_log_value(value)
 
             case "aspect_ratio":
-                aspect_map = {
-                    "Fixed4x3": "4:3",
-                    "Fixed16x9": "16:9",
-                    "Fixed16x10": "16:10",
-                    "Fixed21x9": "21:9",
-                    "Fixed32x9": "32:9",
-                    "Stretched": "Stretch to Fit Window",
-                }
-                if value in aspect_map.keys():
-                    return aspect_map[value]
-                else:
-                    return "Unknown"
+                return AspectRatio.from_log_value(value)
 
             case "pptc" | "shader_cache" | "texture_recompression" | "vsync":
-                return "Enabled" if value == "True" else "Disabled"
+                return Toggle.from_log_value(value)
 
             case "hypervisor":
-                if "mac" in self._hardware_info["os"]:
-                    return "Enabled" if value == "True" else "Disabled"
+                if "mac" in self._hardware_info.os:
+                    return Toggle.from_log_value(value)
                 else:
-                    return "N/A"
+                    return Toggle.NOT_AVAILABLE
             case _:
                 return value
 
     def __get_settings_info(self):
-        settings_map = {
-            "anisotropic_filtering": "MaxAnisotropy",
-            "aspect_ratio": "AspectRatio",
-            "audio_backend": "AudioBackend",
-            "backend_threading": "BackendThreading",
-            "docked": "EnableDockedMode",
-            "expand_ram": "ExpandRam",
-            "fs_integrity": "EnableFsIntegrityChecks",
-            "graphics_backend": "GraphicsBackend",
-            "ignore_missing_services": "IgnoreMissingServices",
-            "memory_manager": "MemoryManagerMode",
-            "pptc": "EnablePtc",
-            "resolution_scale": "ResScale",
-            "shader_cache": "EnableShaderCache",
-            "texture_recompression": "EnableTextureRecompression",
-            "vsync": "EnableVsync",
-            "hypervisor": "UseHypervisor",
-        }
+        # Settings keep their last value logged before the session ends
+        _, _, _, end = self._session
+        values = {}
+        for setting_match in log_patterns["settings"].finditer(
+            self._log_text, self._log_start, end
+        ):
+            values[setting_match.group(1)] = setting_match.group(0).split()[-1]
 
-        for key in self._settings.keys():
-            if key in settings_map:
-                self._settings[key] = self.__get_setting_value(key, settings_map[key])
-            else:
-                raise NotImplementedError(key)
+        for name, key in log_setting_keys.items():
+            setattr(
+                self._settings, name, self.__get_setting_value(name, values.get(key))
+            )
 
     def __get_mods(self):
-        mods_regex = re.compile(
-            r"Found\s(enabled|disabled)?\s?mod\s\'(.+?)\'\s(\[.+?\])"
-        )
-        matches = re.findall(mods_regex, self._log_text)
+        boot_start, boot_end, _, _ = self._session
+        matches = log_patterns["mods"].findall(self._log_text, boot_start, boot_end)
         if matches:
             mods = [
                 {"mod": match[1], "status": match[0], "type": match[2]}
                 for match in matches
             ]
             mods_status = [
-                f"ℹ️ {i['mod']} ({'ExeFS' if i['type'] == '[E]' else 'RomFS'})"
+                f"{i['mod']} ({'ExeFS' if i['type'] == '[E]' else 'RomFS'})"
                 for i in mods
                 if i["status"] == "" or i["status"] == "enabled"
             ]
             # Remove duplicated mods from output
-            mods_status = list(dict.fromkeys(mods_status))
-
-            self._game_info["mods"] = "\n".join(mods_status)
+            self._game_info.mods = list(dict.fromkeys(mods_status))
 
     def __get_cheats(self):
-        # Make sure to skip cheats which fail to compile
-        cheat_regex = re.compile(
-            r"Installing cheat\s'(.+)'(?!\s\d{2}:\d{2}:\d{2}\.\d{3}\s\|E\|\sTamperMachine\sCompile)"
+        _, _, start, end = self._session
+        self._game_info.cheats = log_patterns["cheat"].findall(
+            self._log_text, start, end
         )
-        matches = re.findall(cheat_regex, self._log_text)
-        if matches:
-            cheats = [f"ℹ️ {match}" for match in matches]
-
-            self._game_info["cheats"] = "\n".join(cheats)
 
     def __get_app_name(self):
-        app_match = re.findall(
-            r"Loader [A-Za-z]*: Application Loaded:\s([^;\n\r]*)",
-            self._log_text,
-            re.MULTILINE,
-        )
+        _, _, start, end = self._session
+        app_match = log_patterns["app_name"].search(self._log_text, start, end)
         if app_match:
-            self._game_info["game_name"] = app_match[-1].rstrip()
+            self._game_info.game_name = app_match.group(1).rstrip()
 
     def __get_controller_notes(self):
-        controllers_regex = re.compile(r"Hid Configure: ([^\r\n]+)")
-        controllers = re.findall(controllers_regex, self._log_text)
+        _, _, start, end = self._session
+        controllers = log_patterns["controllers"].findall(self._log_text, start, end)
         if controllers:
             input_status = [f"ℹ {match}" for match in controllers]
             # Hid Configure lines can appear multiple times, so converting to dict keys removes duplicate entries,
             # also maintains the list order
             input_status = list(dict.fromkeys(input_status))
-            self._notes.add("\n".join(input_status))
+            self._notes.add("\n".join(input_status), NoteSeverity.INFO)
         # If emulator crashes on startup without game load, there is no need to show controller notification at all
-        elif self._game_info["game_name"] != "Unknown":
-            self._notes.add("⚠️ No controller information found")
-
-    def __get_os_notes(self):
-        if (
-            "Windows" in self._hardware_info["os"]
-            and self._settings["graphics_backend"] != "Vulkan"
-        ):
-            if "Intel" in self._hardware_info["gpu"]:
-                self._notes.add(
-                    "**⚠️ Intel iGPU users should consider using Vulkan graphics backend**"
-                )
-            if "AMD" in self._hardware_info["gpu"]:
-                self._notes.add(
-                    "**⚠️ AMD GPU users should consider using Vulkan graphics backend**"
-                )
-
-    def __get_cpu_notes(self):
-        if "VirtualApple" in self._hardware_info["cpu"]:
-            self._notes.add("🔴 **Rosetta should be disabled**")
+        elif self._game_info.game_name != "Unknown":
+            self._notes.add("⚠️ No controller information found", NoteSeverity.WARNING)
 
     def __get_log_notes(self):
         default_logs = ["Info", "Warning", "Error", "Guest"]
         user_logs = []
-        if self._emu_info["logs_enabled"] is not None:
-            user_logs = (
-                self._emu_info["logs_enabled"].rstrip().replace(" ", "").split(",")
-            )
+        if self._emu_info.logs_enabled is not None:
+            user_logs = self._emu_info.logs_enabled.rstrip().replace(" ", "").split(",")
 
         if "Debug" in user_logs:
             self._notes.add(
-                "⚠️ **Debug logs enabled will have a negative impact on performance**"
+                "⚠️ **Debug logs enabled will have a negative impact on performance**",
+                NoteSeverity.WARNING,
             )
 
         disabled_logs = set(default_logs).difference(set(user_logs))
         if disabled_logs:
             logs_status = [f"⚠️ {log} log is not enabled" for log in disabled_logs]
-            log_string = "\n".join(logs_status)
+            self._notes.add("\n".join(logs_status), NoteSeverity.WARNING)
         else:
-            log_string = "✅ Default logs enabled"
-
-        self._notes.add(log_string)
-
-    def __get_settings_notes(self):
-        if self._settings["audio_backend"] == "Dummy":
-            self._notes.add(
-                "⚠️ Dummy audio backend, consider changing to SDL2 or OpenAL"
-            )
-
-        if self._settings["pptc"] == "Disabled":
-            self._notes.add("🔴 **PPTC cache should be enabled**")
-
-        if self._settings["shader_cache"] == "Disabled":
-            self._notes.add("🔴 **Shader cache should be enabled**")
+            self._notes.add("✅ Default logs enabled", NoteSeverity.OK)
 
-        if self._settings["expand_ram"] == "True":
-            self._notes.add(
-                "⚠️ `Use alternative memory layout` should only be enabled for 4K mods"
-            )
-
-        if self._settings["memory_manager"] == "SoftwarePageTable":
-            self._notes.add(
-                "🔴 **`Software` setting in Memory Manager Mode will give slower performance than the default setting of `Host unchecked`**"
-            )
-
-        if self._settings["ignore_missing_services"] == "True":
-            self._notes.add(
-                "⚠️ `Ignore Missing Services` being enabled can cause instability"
-            )
-
-        if self._settings["vsync"] == "Disabled":
-            self._notes.add(
-                "⚠️ V-Sync disabled can cause instability like games running faster than intended or longer load times"
-            )
-
-        if self._settings["fs_integrity"] == "Disabled":
-            self._notes.add(
-                "⚠️ Disabling file integrity checks may cause corrupted dumps to not be detected"
-            )
-
-        if self._settings["backend_threading"] == "Off":
-            self._notes.add(
-                "🔴 **Graphics Backend Multithreading should be set to `Auto`**"
-            )
+    def __get_note_context(
+        self,
+    ) -> dict[
+        str, Union[HardwareInfo, EmulatorInfo, GameInfo, Settings, set[str], str]
+    ]:
+        return {
+            "hardware_info": self._hardware_info,
+            "emu_info": self._emu_info,
+            "game_info": self._game_info,
+            "settings": self._settings,
+            "common_errors": {error.name for error in self.get_common_errors()},
+            "ryujinx_version": self.get_ryujinx_version().name,
+        }
 
-    def __sort_notes(self):
-        def severity(log_note_string):
-            symbols = ["❌", "🔴", "⚠️", "ℹ", "✅"]
-            return next(
-                i for i, symbol in enumerate(symbols) if symbol in log_note_string
+    def __get_latest_timestamp(self) -> Optional[str]:
+        log_text = self._log_text
+        _, _, start, line_end = self._session
+        # Walk back from the end of the session until a line with a timestamp is found
+        while line_end > start:
+            line_start = max(log_text.rfind("\n", start, line_end - 1) + 1, start)
+            timestamps = log_patterns["timestamp"].findall(
+                log_text, line_start, line_end
             )
-
-        game_notes = [note for note in self._notes]
-        # Warnings split on the string after the warning symbol for alphabetical ordering
-        # Severity key then orders alphabetically sorted warnings to show most severe first
-        return sorted(sorted(game_notes, key=lambda x: x.split()[1]), key=severity)
+            if len(timestamps) > 0:
+                return timestamps[-1]
+            line_end = line_start
+        return None
 
     def __get_notes(self):
-        for common_error in self.get_common_errors():
-            match common_error:
-                case CommonError.SHADER_CACHE_COLLISION:
-                    self._notes.add(
-                        "⚠️ Cache collision detected. Investigate possible shader cache issues"
-                    )
-                case CommonError.SHADER_CACHE_CORRUPTION:
-                    self._notes.add(
-                        "⚠️ Cache corruption detected. Investigate possible shader cache issues"
-                    )
-                case CommonError.DUMP_HASH:
-                    self._notes.add(
-                        "⚠️ Dump error detected. Investigate possible bad game/firmware dump issues"
-                    )
-                case CommonError.UPDATE_KEYS:
-                    self._notes.add(
-                        "⚠️ Keys or firmware out of date, consider updating them"
-                    )
-                case CommonError.FILE_PERMISSIONS:
-                    self._notes.add(
-                        "⚠️ File permission error. Consider deleting save directory and allowing Ryujinx to make a new one"
-                    )
-                case CommonError.FILE_NOT_FOUND:
-                    self._notes.add(
-                        "⚠️ Save not found error. Consider starting game without a save file or using a new save file"
-                    )
-                case CommonError.MISSING_SERVICES:
-                    if self._settings["ignore_missing_services"] == "False":
-                        self._notes.add(
-                            "⚠️ Consider enabling `Ignore Missing Services` in Ryujinx settings"
-                        )
-                case CommonError.VULKAN_OUT_OF_MEMORY:
-                    if self._settings["texture_recompression"] == "Disabled":
-                        self._notes.add(
-                            "⚠️ Consider enabling `Texture Recompression` in Ryujinx settings"
-                        )
-                case _:
-                    raise NotImplementedError(common_error)
-
-        timestamp_regex = re.compile(r"(\d{2}:\d{2}:\d{2}\.\d{3})\s+?\|")
-        latest_timestamp = re.findall(timestamp_regex, self._log_text)[-1]
+        self._notes = LogNotes(self._note_rules.evaluate(self.__get_note_context()))
+
+        latest_timestamp = self.__get_latest_timestamp()
         if latest_timestamp:
             timestamp_message = f"ℹ️ Time elapsed: `{latest_timestamp}`"
-            self._notes.add(timestamp_message)
+            self._notes.add(timestamp_message, NoteSeverity.INFO)
 
         if self.is_default_user_profile():
             self._notes.add(
-                "⚠️ Default user profile in use, consider creating a custom one."
+                "⚠️ Default user profile in use, consider creating a custom one.",
+                NoteSeverity.WARNING,
             )
 
         self.__get_controller_notes()
-        self.__get_os_notes()
-        self.__get_cpu_notes()
-
-        if (
-            self._emu_info["ryu_firmware"] == "Unknown"
-            and self._game_info["game_name"] != "Unknown"
-        ):
-            firmware_warning = f"**❌ Nintendo Switch firmware not found**"
-            self._notes.add(firmware_warning)
-
-        self.__get_settings_notes()
-        if self.get_ryujinx_version() == RyujinxVersion.CUSTOM:
-            self._notes.add("**⚠️ Custom builds are not officially supported**")
 
     def get_ryujinx_version(self):
-        mainline_version = re.compile(r"^\d\.\d\.\d+$")
-        old_mainline_version = re.compile(r"^\d\.\d\.(\d){4}$")
-        pr_version = re.compile(r"^\d\.\d\.\d\+([a-f]|\d){7}$")
-        ldn_version = re.compile(r"^\d\.\d\.\d-ldn\d+\.\d+(?:\.\d+|$)")
-        mac_version = re.compile(r"^\d\.\d\.\d-macos\d+(?:\.\d+(?:\.\d+|$)|$)")
-
-        if re.match(mainline_version, self._emu_info["ryu_version"]):
+        if log_patterns["mainline_version"].match(self._emu_info.ryu_version):
             return RyujinxVersion.MASTER
-        elif re.match(old_mainline_version, self._emu_info["ryu_version"]):
+        elif log_patterns["old_mainline_version"].match(self._emu_info.ryu_version):
             return RyujinxVersion.OLD_MASTER
-        elif re.match(mac_version, self._emu_info["ryu_version"]):
+        elif log_patterns["mac_version"].match(self._emu_info.ryu_version):
             return RyujinxVersion.MAC
-        elif re.match(ldn_version, self._emu_info["ryu_version"]):
+        elif log_patterns["ldn_version"].match(self._emu_info.ryu_version):
             return RyujinxVersion.LDN
-        elif re.match(pr_version, self._emu_info["ryu_version"]):
+        elif log_patterns["pr_version"].match(self._emu_info.ryu_version):
             return RyujinxVersion.PR
         else:
             return RyujinxVersion.CUSTOM
 
     def is_default_user_profile(self) -> bool:
         return (
-            re.search(r"UserId: 00000000000000010000000000000000", self._log_text)
+            log_patterns["default_user_profile"].search(self._log_text, self._log_start)
             is not None
         )
 
     def get_last_error(self) -> Optional[list[str]]:
         return self._log_errors[-1] if len(self._log_errors) > 0 else None
 
+    @staticmethod
+    def normalise_error_line(line: str) -> str:
+        # Remove the timestamp and log level
+        line = log_patterns["error_prefix"].sub("", line.strip())
+        # Remove source locations and any other paths
+        line = log_patterns["error_source"].sub("", line)
+        line = log_patterns["error_path"].sub("<path>", line)
+        # Remove addresses, hashes and numbers which differ between crashes
+        line = log_patterns["error_address"].sub("<addr>", line)
+        line = log_patterns["error_number"].sub("N", line)
+        return line
+
+    def get_error_signature(
+        self, frame_count: int = 5
+    ) -> Optional[tuple[str, str, list[str]]]:
+        """
+        Returns a stable signature of the last error, its exception type and its normalised top frames.
+        """
+        last_error = self.get_last_error()
+        if last_error is None:
+            return None
+
+        error_text = "\n".join(last_error)
+        exception_match = log_patterns["exception_type"].search(error_text)
+        exception_type = (
+            exception_match.group(1) if exception_match is not None else "Unknown"
+        )
+        frames = [
+            self.normalise_error_line(line)
+            for line in last_error
+            if line.strip().startswith("at ")
+        ][:frame_count]
+        if len(frames) == 0:
+            # Errors without a stack trace are identified by their message
+            frames = [self.normalise_error_line(last_error[0])]
+
+        signature = hashlib.sha1(
+            "\n".join([exception_type, *frames]).encode("UTF-8")
+        ).hexdigest()[:16]
+        return signature, exception_type, frames
+
     def get_common_errors(self) -> list[CommonError]:
         errors = []
 
@@ -660,75 +651,158 @@ class LogAnalyser:
 
         return errors
 
+    def get_known_issue_macros(self, known_issues: KnownIssueMatcher) -> list[str]:
+        error_signature = self.get_error_signature()
+        return known_issues.match(
+            "\n".join("\n".join(error_lines) for error_lines in self._log_errors),
+            error_signature[0] if error_signature is not None else None,
+        )
+
+    def __get_analysed_log(self, notes: LogNotes) -> AnalysedLog:
+        return AnalysedLog(
+            hardware_info=self._hardware_info,
+            emu_info=self._emu_info,
+            game_info=self._game_info,
+            settings=self._settings,
+            notes=notes.sorted(),
+            errors=self._log_errors,
+        )
+
+    def get_sessions(self) -> list[AnalysedLog]:
+        """
+        Returns the analysis of every game session in the log, the last one being the main analysis.
+        """
+        main_session = (
+            self._session,
+            self._hardware_info,
+            self._emu_info,
+            self._game_info,
+            self._settings,
+            self._notes,
+            self._log_errors,
+        )
+        # Earlier sessions are not part of the profiled stages
+        profile, self._profile = self._profile, None
+        sessions = []
+        try:
+            for session in self._sessions[:-1]:
+                self.__analyse_session(session)
+                sessions.append(self.__get_analysed_log(self._notes))
+        finally:
+            self._profile = profile
+            (
+                self._session,
+                self._hardware_info,
+                self._emu_info,
+                self._game_info,
+                self._settings,
+                self._notes,
+                self._log_errors,
+            ) = main_session
+        sessions.append(self.__get_analysed_log(self._notes))
+        return sessions
+
     def analyse_discord(
-        self, is_channel_allowed: bool, pr_channel: int
-    ) -> dict[str, dict[str, str]]:
-        last_error = self.get_last_error()
-        if last_error is not None:
-            last_error = "\n".join(last_error[:2])
-            self._game_info["errors"] = f"```\n{last_error}\n```"
-        else:
-            self._game_info["errors"] = "No errors found in log"
-
-        # Limit mods and cheats to 5 entries
-        mods = self._game_info["mods"].splitlines()
-        cheats = self._game_info["cheats"].splitlines()
-        if len(mods) > 5:
-            limit_mods = mods[:5]
-            limit_mods.append(f"✂️ {len(mods) - 5} other mods")
-            self._game_info["mods"] = "\n".join(limit_mods)
-        if len(cheats) > 5:
-            limit_cheats = cheats[:5]
-            limit_cheats.append(f"✂️ {len(cheats) - 5} other cheats")
-            self._game_info["cheats"] = "\n".join(limit_cheats)
+        self,
+        is_channel_allowed: bool,
+        pr_channel: int,
+        known_issues: Optional[KnownIssueMatcher] = None,
+    ) -> AnalysedLog:
+        # Discord specific notes are added to a copy, so the analyser's own results stay untouched
+        notes = LogNotes(dict(self._notes.entries))
 
         if is_channel_allowed and self.get_ryujinx_version() == RyujinxVersion.PR:
-            self._notes.add(
-                f"**⚠️ PR build logs should be posted in <#{pr_channel}> if reporting bugs or tests**"
+            notes.add(
+                f"**⚠️ PR build logs should be posted in <#{pr_channel}> if reporting bugs or tests**",
+                NoteSeverity.WARNING,
             )
 
-        self._notes = self.__sort_notes()
-        full_game_info = self._game_info
-        full_game_info["notes"] = (
-            "\n".join(self._notes) if len(self._notes) > 0 else "Nothing to note"
-        )
-
-        return {
-            "hardware_info": self._hardware_info,
-            "emu_info": self._emu_info,
-            "game_info": full_game_info,
-            "settings": self._settings,
-        }
+        if self.session_count > 1:
+            notes.add(
+                f"ℹ️ Log contains {self.session_count} game sessions, only the last one is shown",
+                NoteSeverity.INFO,
+            )
 
-    def analyse(self) -> dict[str, Union[dict[str, str], list[str], list[list[str]]]]:
-        self._notes = list(self.__sort_notes())
+        if known_issues is not None and len(known_issues) > 0:
+            macro_keys = self.get_known_issue_macros(known_issues)
+            if len(macro_keys) > 0:
+                notes.add(
+                    "ℹ️ Known issue, see: "
+                    + ", ".join(f"`.macro {key}`" for key in macro_keys),
+                    NoteSeverity.INFO,
+                )
 
-        last_error = self.get_last_error()
-        if last_error is not None:
-            last_error = "\n".join(last_error[:2])
-            self._game_info["errors"] = f"```\n{last_error}\n```"
-        else:
-            self._game_info["errors"] = "No errors found in log"
+        return self.__get_analysed_log(notes)
 
-        return {
-            "hardware_info": self._hardware_info,
-            "emu_info": self._emu_info,
-            "game_info": self._game_info,
-            "notes": self._notes,
-            "errors": self._log_errors,
-            "settings": self._settings,
-            "app_info": self.get_app_info(self._log_text),
-            "paths": list(self.get_filepaths(self._log_text)),
-        }
+    @staticmethod
+    def format_profile(profile: list[dict[str, Union[str, int, float]]]) -> str:
+        lines = [f"{'Stage':<10} {'Time':>11} {'Memory':>11} {'Scanned':>11}"]
+        for stage in profile + [
+            {
+                "stage": "total",
+                "time_ms": sum(x["time_ms"] for x in profile),
+                "peak_memory": max(x["peak_memory"] for x in profile),
+                "scanned_bytes": sum(x["scanned_bytes"] for x in profile),
+            }
+        ]:
+            lines.append(
+                f"{stage['stage']:<10} {stage['time_ms']:>8.2f} ms "
+                f"{stage['peak_memory'] / 1024:>8.0f} KB "
+                f"{stage['scanned_bytes'] / 1024:>8.0f} KB"
+            )
+        return "\n".join(lines)
+
+    def __analyse_profiled(
+        self,
+    ) -> dict[str, Union[dict[str, str], list[str], list[list[str]], list[dict]]]:
+        """
+        Runs every stage again, recording its wall time, peak allocations and the size of the log range
+        it searched.
+        """
+        self._profile = []
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        try:
+            self.__run_stages(self._log_text)
+            result = self.analyse()
+            result["profile"] = self._profile
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+            self._profile = None
+        return result
+
+    def analyse(
+        self, profile: bool = False
+    ) -> dict[str, Union[dict[str, str], list[str], list[list[str]], list[dict]]]:
+        if profile:
+            return self.__analyse_profiled()
+
+        result = self.__get_analysed_log(self._notes).to_dict()
+        result["app_info"] = self.__run_stage(
+            "app_info", lambda: self.get_app_info(self._log_text)
+        )
+        result["paths"] = self.__run_stage(
+            "paths", lambda: list(self.get_filepaths(self._log_text))
+        )
+        result["sessions"] = [session.to_dict() for session in self.get_sessions()]
+        return result
 
 
 if __name__ == "__main__":
     import argparse
     import json
     import os
+    import sys
 
     parser = argparse.ArgumentParser()
     parser.add_argument("log_file", type=str)
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="print the time, memory and scanned log size of every analysis stage",
+    )
 
     args = parser.parse_args()
 
@@ -740,6 +814,8 @@ if __name__ == "__main__":
         text = file.read()
 
     analyser = LogAnalyser(text)
-    result = analyser.analyse()
+    result = analyser.analyse(profile=args.profile)
 
     print(json.dumps(result, indent=2))
+    if args.profile:
+        print(LogAnalyser.format_profile(result["profile"]), file=sys.stderr)
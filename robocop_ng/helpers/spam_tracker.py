@@ -0,0 +1,146 @@
+import re
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Optional
+
+import discord
+
+default_spam_detection = {
+    "window": 10,
+    "history": 10,
+    "messages": 7,
+    "mentions": 10,
+    "attachments": 8,
+    "duplicates": 4,
+    "mute_duration": "10 minutes",
+    "max_users": 10000,
+}
+
+whitespace_regex = re.compile(r"\s+")
+
+
+def get_content_hash(content: str) -> Optional[int]:
+    """
+    Hashes the content of a message, ignoring case and whitespace. Empty messages aren't hashed.
+    """
+    content = whitespace_regex.sub(" ", content).strip().casefold()
+    return hash(content) if len(content) > 0 else None
+
+
+@dataclass(slots=True)
+class MessageRecord:
+    timestamp: float
+    content_hash: Optional[int]
+    mentions: int
+    attachments: int
+
+
+class UserHistory:
+    """
+    The last messages of a user, with running totals of what they contain.
+
+    Messages leave the history once they're older than the window or when it's full,
+    so every message is added and removed once.
+    """
+
+    __slots__ = ("records", "mentions", "attachments", "content_hashes")
+
+    def __init__(self):
+        self.records: deque[MessageRecord] = deque()
+        self.mentions = 0
+        self.attachments = 0
+        self.content_hashes: dict[int, int] = {}
+
+    def __remove_oldest(self):
+        record = self.records.popleft()
+        self.mentions -= record.mentions
+        self.attachments -= record.attachments
+        if record.content_hash is not None:
+            count = self.content_hashes[record.content_hash] - 1
+            if count == 0:
+                del self.content_hashes[record.content_hash]
+            else:
+                self.content_hashes[record.content_hash] = count
+
+    def add(self, record: MessageRecord, window: float, size: int) -> int:
+        """
+        Adds a message and returns how many messages of the history have the same content.
+        """
+        while len(self.records) > 0 and (
+            len(self.records) >= size
+            or record.timestamp - self.records[0].timestamp >= window
+        ):
+            self.__remove_oldest()
+
+        self.records.append(record)
+        self.mentions += record.mentions
+        self.attachments += record.attachments
+        if record.content_hash is None:
+            return 0
+        count = self.content_hashes.get(record.content_hash, 0) + 1
+        self.content_hashes[record.content_hash] = count
+        return count
+
+
+class SpamTracker:
+    """
+    Keeps the recent messages of the most recently active users and finds floods,
+    mention spam and repeated messages in constant time per message.
+
+    Users who stopped posting are dropped first once there are more than max_users of them.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.settings = {
+            **default_spam_detection,
+            **getattr(bot.config, "spam_detection", {}),
+        }
+        self.users: OrderedDict[int, UserHistory] = OrderedDict()
+
+    def get_history(self, user_id: int) -> UserHistory:
+        history = self.users.get(user_id)
+        if history is None:
+            history = UserHistory()
+            self.users[user_id] = history
+            if len(self.users) > self.settings["max_users"]:
+                self.users.popitem(last=False)
+        else:
+            self.users.move_to_end(user_id)
+        return history
+
+    def forget(self, user_id: int):
+        self.users.pop(user_id, None)
+
+    def record_message(
+        self, message: discord.Message, now: Optional[float] = None
+    ) -> Optional[str]:
+        """
+        Adds a message to the history of its author and returns why it's spam, if it is.
+        """
+        now = now if now is not None else time.monotonic()
+        history = self.get_history(message.author.id)
+        duplicates = history.add(
+            MessageRecord(
+                now,
+                get_content_hash(message.content),
+                len(message.raw_mentions)
+                + len(message.raw_role_mentions)
+                + (1 if message.mention_everyone else 0),
+                len(message.attachments),
+            ),
+            self.settings["window"],
+            self.settings["history"],
+        )
+
+        window = self.settings["window"]
+        if len(history.records) >= self.settings["messages"]:
+            return f"{len(history.records)} messages in {window} seconds"
+        if history.mentions >= self.settings["mentions"]:
+            return f"{history.mentions} mentions in {window} seconds"
+        if history.attachments >= self.settings["attachments"]:
+            return f"{history.attachments} attachments in {window} seconds"
+        if duplicates >= self.settings["duplicates"]:
+            return f"{duplicates} identical messages in {window} seconds"
+        return None
@@ -0,0 +1,64 @@
+import tempfile
+from typing import Iterable, Optional
+
+import discord
+
+# Transcripts larger than this are written to disk instead of being kept in memory
+max_memory_size = 1000 * 1000
+max_embed_text_length = 200
+# Room kept for the line noting a truncated transcript
+truncation_note_size = 100
+
+
+def render_message(message: discord.Message) -> str:
+    lines = [
+        f"[{message.created_at.strftime('%Y-%m-%d %H:%M:%S')} UTC] "
+        f"{message.author} ({message.author.id}):"
+    ]
+    if len(message.clean_content) > 0:
+        lines.extend(f"    {line}" for line in message.clean_content.splitlines())
+    for attachment in message.attachments:
+        lines.append(f"    [Attachment] {attachment.filename}: {attachment.url}")
+    for embed in message.embeds:
+        text = " - ".join(
+            x for x in (embed.title, embed.description) if x is not None and x != ""
+        )
+        if len(text) > max_embed_text_length:
+            text = text[: max_embed_text_length - 3] + "..."
+        lines.append(f"    [Embed] {text}")
+    return "\n".join(lines) + "\n"
+
+
+def create_transcript(
+    channel: discord.abc.GuildChannel,
+    messages: Iterable[discord.Message],
+    max_size: Optional[int] = None,
+) -> tempfile.SpooledTemporaryFile:
+    """
+    Writes the messages to a transcript file, one message at a time, and returns it rewound.
+
+    The file only stays in memory while it's small, so large purges don't need the whole
+    transcript in memory. Messages which would make the file larger than max_size are left out,
+    and a line at the end says how many there were.
+    """
+    transcript = tempfile.SpooledTemporaryFile(max_size=max_memory_size)
+    size = transcript.write(
+        f"Transcript of #{channel} ({channel.id})\n\n".encode("UTF-8")
+    )
+    left_out = 0
+    for message in messages:
+        rendered_message = render_message(message).encode("UTF-8")
+        # Once a message is left out, the later ones are too, so the transcript has no gaps
+        if left_out > 0 or (
+            max_size is not None
+            and size + len(rendered_message) > max_size - truncation_note_size
+        ):
+            left_out += 1
+            continue
+        size += transcript.write(rendered_message)
+    if left_out > 0:
+        transcript.write(
+            f"\n{left_out} more messages don't fit in the transcript.\n".encode("UTF-8")
+        )
+    transcript.seek(0)
+    return transcript
@@ -0,0 +1,64 @@
+import re
+from typing import Iterable
+
+
+class WordMatcher:
+    """
+    Finds every occurrence of a set of words in a text with a single compiled pattern.
+
+    The words are compiled into one regex shaped like a trie, so the regex engine only follows the
+    branches matching the text instead of trying each word on its own. The longest word is matched at
+    every position, the other words starting there are its prefixes and are looked up instead.
+    """
+
+    def __init__(self, words: Iterable[str]):
+        self.words = list(dict.fromkeys(word for word in words if len(word) > 0))
+        # Every word mapped to the words it starts with, longest first
+        self._prefixes = {
+            word: sorted(
+                (x for x in self.words if word.startswith(x)), key=len, reverse=True
+            )
+            for word in self.words
+        }
+        trie = {}
+        for word in self.words:
+            node = trie
+            for char in word:
+                node = node.setdefault(char, {})
+            node[""] = {}
+        self._pattern = (
+            re.compile(self.__build_pattern(trie)) if len(self.words) > 0 else None
+        )
+
+    @classmethod
+    def __build_pattern(cls, node: dict) -> str:
+        branches = [
+            re.escape(char) + cls.__build_pattern(child)
+            for char, child in node.items()
+            if char != ""
+        ]
+        if len(branches) == 0:
+            return ""
+        pattern = (
+            branches[0] if len(branches) == 1 else "(?:{})".format("|".join(branches))
+        )
+        if "" in node:
+            # A word ends here, the longer words are optional and tried first
+            pattern = f"(?:{pattern})?" if len(branches) == 1 else f"{pattern}?"
+        return pattern
+
+    def find(self, text: str) -> list[tuple[int, int, str]]:
+        """
+        Returns (start, end, word) for each occurrence, ordered by start and then longest first.
+        """
+        matches = []
+        if self._pattern is None:
+            return matches
+        position = 0
+        while (match := self._pattern.search(text, position)) is not None:
+            start = match.start()
+            for word in self._prefixes[match.group()]:
+                matches.append((start, start + len(word), word))
+            # Words can overlap, so the next one can start inside this one
+            position = start + 1
+        return matches